@@ -1,16 +1,32 @@
 #!/bin/bash
 set -e
 
+# Every django process writes its metrics to this directory, not only the web server
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 # Check if script was called by CMD, can be sh -c 'CMD' or CMD
 if [ "$1" = '/usr/libexec/s2i/run' ] || [ "$3" = '/usr/libexec/s2i/run' ] || [ "$2" = 'runserver' ]; then
     # Wait for the database to be available
     until nc -vzw 2 "$DJANGO_DB_HOST" "$DJANGO_DB_PORT"; do echo "mysql is not available. waiting..." && sleep 2; done
 
+    if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+        echo "Reset prometheus metrics"
+        rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+        mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+    fi
+
     echo "Apply database migrations"
     python ./manage.py migrate
 
     echo "Load fixtures"
     python ./manage.py loaddata blog/fixtures/initial_data.json
+    python ./manage.py reconcile_post_counters
+    python ./manage.py rebuild_search_index
+    python ./manage.py rebuild_feeds
+    python ./manage.py compute_recommendations --full
+    python ./manage.py prune_refresh_tokens
 
     echo "Collect static files"
     python ./manage.py collectstatic --noinput
@@ -76,6 +76,13 @@ EMAIL_FROM = os.getenv('EMAIL_FROM', default='admin@blogapp.com')
 EMAIL_USE_TLS = False
 EMAIL_USE_SSL = False
 
+# emails are queued in the OutgoingEmail table and delivered by the send_queued_emails command
+EMAIL_OUTBOX_SEND_ON_COMMIT = os.getenv('EMAIL_OUTBOX_SEND_ON_COMMIT', default='True') == 'True'
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = timedelta(minutes=1)
+EMAIL_OUTBOX_LEASE = timedelta(minutes=5)
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -185,7 +192,69 @@ GRAPHQL_JWT = {
     'JWT_VERIFY_EXPIRATION': True,
     'JWT_COOKIE_SECURE': True,
     'JWT_LONG_RUNNING_REFRESH_TOKEN': True,
+    # the tokens carry the is_author and verified flags of the user status
+    'JWT_PAYLOAD_HANDLER': 'blog.api.tokens.jwt_payload',
+    'JWT_DECODE_HANDLER': 'blog.api.tokens.jwt_decode',
 }
+# seconds an authenticated user is cached by its token, 0 turns the cache off. Only turn it on with a shared cache
+# backend in CACHES, the default cache is per process and other processes would keep serving a changed user
+PRINCIPAL_CACHE_TIMEOUT = int(os.getenv('PRINCIPAL_CACHE_TIMEOUT', default='0'))
+# the jwt cookie is re-issued by the middleware once it expires within this time
+JWT_COOKIE_REISSUE_THRESHOLD = timedelta(hours=1)
+
+# GraphQL documents
+
+# number of parsed and validated query documents cached per process
+GRAPHQL_DOCUMENT_CACHE_SIZE = int(os.getenv('GRAPHQL_DOCUMENT_CACHE_SIZE', default='250'))
+
+# operations nested deeper or with a higher static cost are rejected
+GRAPHQL_MAX_QUERY_DEPTH = int(os.getenv('GRAPHQL_MAX_QUERY_DEPTH', default='10'))
+GRAPHQL_MAX_QUERY_COST = int(os.getenv('GRAPHQL_MAX_QUERY_COST', default='2000'))
+# number of items the query cost assumes for lists without a known size
+GRAPHQL_DEFAULT_LIST_SIZE = int(os.getenv('GRAPHQL_DEFAULT_LIST_SIZE', default='10'))
+
+# operation names beyond this number are aggregated as 'other' in the operation metrics
+GRAPHQL_METRICS_MAX_OPERATIONS = int(os.getenv('GRAPHQL_METRICS_MAX_OPERATIONS', default='200'))
+# bearer token required to scrape /metrics/, the metrics are public when it is empty
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', default='')
+
+# Persisted queries
+
+# seconds a query registered by a client stays in the cache
+GRAPHQL_PERSISTED_QUERIES_TIMEOUT = int(os.getenv('GRAPHQL_PERSISTED_QUERIES_TIMEOUT', default='86400'))
+# number of persisted queries kept per process
+GRAPHQL_PERSISTED_QUERIES_CACHE_SIZE = int(os.getenv('GRAPHQL_PERSISTED_QUERIES_CACHE_SIZE', default='500'))
+# only execute the queries that have been registered with the register_persisted_queries command
+GRAPHQL_PERSISTED_QUERIES_ALLOWLIST = os.getenv('GRAPHQL_PERSISTED_QUERIES_ALLOWLIST', default='False') == 'True'
+
+# Notifications
+
+NOTIFICATION_FANOUT_CHUNK_SIZE = int(os.getenv('NOTIFICATION_FANOUT_CHUNK_SIZE', default='1000'))
+# authors with more subscribers get their notifications and feed items created by a background worker
+NOTIFICATION_FANOUT_BACKGROUND_THRESHOLD = int(os.getenv('NOTIFICATION_FANOUT_BACKGROUND_THRESHOLD', default='500'))
+
+# Feed
+
+# the posts of authors with more subscribers are merged into the feeds when these are read instead of being written
+# to the feed of each subscriber
+FEED_FANOUT_MAX_SUBSCRIBERS = int(os.getenv('FEED_FANOUT_MAX_SUBSCRIBERS', default='10000'))
+# number of the latest posts of an author added to the feed of a new subscriber
+FEED_BACKFILL_SIZE = int(os.getenv('FEED_BACKFILL_SIZE', default='20'))
+
+# Search
+
+# seconds the number and the average length of the indexed posts are cached for ranking
+SEARCH_STATISTICS_TIMEOUT = int(os.getenv('SEARCH_STATISTICS_TIMEOUT', default='300'))
+
+# Recommendations
+
+# number of similar posts recommended on each post
+RECOMMENDATIONS_PER_POST = int(os.getenv('RECOMMENDATIONS_PER_POST', default='5'))
+
+# Background tasks
+
+BACKGROUND_TASK_WORKERS = int(os.getenv('BACKGROUND_TASK_WORKERS', default='2'))
+BACKGROUND_TASKS_EAGER = False
 
 # Logging
 
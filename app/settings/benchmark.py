@@ -0,0 +1,19 @@
+from .base import *  # noqa: F403
+
+# Benchmarks run against a local sqlite database, see README
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('BENCHMARK_DB_NAME', os.path.join(BASE_DIR, 'benchmark.sqlite3')),  # noqa: F405
+    }
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': True,
+}
+
+BACKGROUND_TASKS_EAGER = True
@@ -11,3 +11,5 @@ LOGGING = {
 MEDIA_ROOT = os.path.join(BASE_DIR, 'blog/tests/media/uploaded_test_files')
 
 TEST = True
+
+BACKGROUND_TASKS_EAGER = True
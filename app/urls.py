@@ -17,13 +17,14 @@ from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from blog import urls as api_urls
-from blog.views import set_csrf
+from blog.views import metrics, set_csrf
 from django.contrib.staticfiles.urls import static, staticfiles_urlpatterns
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('graphql/', include(api_urls)),
     path('ping/', set_csrf),
+    path('metrics/', metrics),
 ]
 
 urlpatterns += staticfiles_urlpatterns()
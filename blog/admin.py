@@ -9,6 +9,8 @@ from blog.models import (
     CommentLike,
     PostLike,
     AuthorRequest,
+    OutgoingEmail,
+    PersistedQuery,
 )
 
 admin.site.register(User, UserAdmin)
@@ -28,8 +30,20 @@ class AuthorRequestAdmin(admin.ModelAdmin):
     list_display = ('user', 'date_opened', 'date_closed', 'status')
 
 
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('to_email', 'subject', 'status', 'attempts', 'next_attempt_at', 'date_sent')
+    list_filter = ('status',)
+
+
+class PersistedQueryAdmin(admin.ModelAdmin):
+    list_display = ('operation_name', 'sha256_hash', 'date_created')
+    search_fields = ('operation_name', 'sha256_hash')
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(AuthorRequest, AuthorRequestAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
+admin.site.register(PersistedQuery, PersistedQueryAdmin)
 
 admin.site.register(Comment)
 admin.site.register(CommentLike)
@@ -11,6 +11,7 @@ from blog.api.inputs import (
     EmailChangeInput,
     UpdateAccountInput,
 )
+from blog.api.tokens import get_claim
 from blog.api.types import (
     RegisterAccountType,
     VerifyAccountType,
@@ -125,7 +126,7 @@ class AuthMutations:
         has_errors = False
 
         user = info.context.request.user
-        if not UserStatus.objects.get(user=user).verified:
+        if not get_claim(info.context.request, 'verified'):
             has_errors = True
             errors.update({'user': 'User not verified'})
 
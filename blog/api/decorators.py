@@ -1,16 +1,18 @@
 import inspect
 from functools import wraps
-from typing import Any, Coroutine
+from typing import Any, Callable, Coroutine
 
 import django
 from django.contrib.auth import get_user_model
 from django.core.handlers.asgi import ASGIRequest
 from strawberry.types import Info
 from strawberry_django.utils import is_async
-from strawberry_django_jwt import signals
+from strawberry_django_jwt import exceptions, signals
 from strawberry_django_jwt.auth import authenticate
 from strawberry_django_jwt.decorators import (
-    user_passes_test,
+    context,
+    dispose_extra_kwargs,
+    with_info,
     on_token_auth_resolve_async,
     setup_jwt_cookie,
     csrf_rotation,
@@ -20,10 +22,38 @@ from strawberry_django_jwt.decorators import (
 from strawberry_django_jwt.utils import get_context, maybe_thenable
 
 from blog.api.exceptions import InvalidCredentials, UnverifiedUser
+from blog.api.tokens import get_claim
 from blog.api.types import User as UserType
-from blog.models import UserStatus
 
-author_permission_required = user_passes_test(lambda u: UserStatus.objects.get(user=u).is_author)
+
+def claim_required(claim: str, exc: Exception = exceptions.PermissionDenied) -> Callable:
+    """
+    Like user_passes_test, but checks a user status flag that is trusted from the jwt claims
+    """
+
+    def decorator(f: Any) -> Any:
+        # get_result is used by strawberry-graphql-django model mutations
+        get_result = getattr(f, 'get_result', None)
+
+        if get_result is not None and callable(get_result):
+            f.get_result = decorator(f.get_result)
+            return f
+
+        f_with_info = with_info(f)
+
+        @wraps(f_with_info)
+        @context
+        def wrapper(request: Any, *args: Any, **kwargs) -> Any:
+            if request and get_claim(request, claim):
+                return dispose_extra_kwargs(f_with_info)(*args, **kwargs)
+            raise exc
+
+        return wrapper
+
+    return decorator
+
+
+author_permission_required = claim_required('is_author')
 
 
 def token_auth(f: Any) -> Coroutine:
@@ -65,9 +95,10 @@ def handle_auth(cls: Any, f: Any, info: Info, user: UserType, **kwargs) -> Any:
     if user is None:
         raise InvalidCredentials
 
-    user_status = UserStatus.objects.get(user=user)
+    # the user status is loaded once, it is used for the token claims as well
+    user_status = getattr(user, 'user_status', None)
 
-    if not user_status.verified:
+    if user_status is None or not user_status.verified:
         raise UnverifiedUser
 
     context.user = user
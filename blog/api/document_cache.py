@@ -0,0 +1,97 @@
+import dataclasses
+import typing
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from graphql import DocumentNode, GraphQLError
+from strawberry.extensions import Extension
+
+from blog.metrics import count_cache_request
+
+
+@dataclasses.dataclass
+class CachedDocument:
+    document: DocumentNode
+    # validation errors by the validation rules they have been found with
+    validation_errors: typing.Dict[typing.Tuple, typing.List[GraphQLError]] = dataclasses.field(default_factory=dict)
+
+
+class DocumentCache:
+    """
+    Bounded LRU cache of parsed documents and their validation results by query text, shared by all
+    requests of the process
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.entries: typing.OrderedDict[str, CachedDocument] = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query: str) -> typing.Optional[CachedDocument]:
+        with self.lock:
+            entry = self.entries.get(query)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(query)
+        count_cache_request('graphql_document', entry is not None)
+        return entry
+
+    def store(self, query: str, document: DocumentNode) -> CachedDocument:
+        with self.lock:
+            entry = self.entries.get(query)
+            if entry is None:
+                entry = self.entries[query] = CachedDocument(document=document)
+            self.entries.move_to_end(query)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            return entry
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def stats(self) -> typing.Dict[str, int]:
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'max_size': self.max_size}
+
+
+document_cache = DocumentCache(settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+
+
+class DocumentCacheExtension(Extension):
+    """
+    Parses and validates every query text once per process
+    """
+
+    entry: typing.Optional[CachedDocument] = None
+
+    def on_parsing_start(self) -> None:
+        self.entry = document_cache.get(self.execution_context.query)
+        if self.entry is not None:
+            self.execution_context.graphql_document = self.entry.document
+
+    def on_parsing_end(self) -> None:
+        # documents with syntax errors are not cached
+        document = self.execution_context.graphql_document
+        if self.entry is None and document is not None:
+            self.entry = document_cache.store(self.execution_context.query, document)
+
+    def on_validation_start(self) -> None:
+        if self.entry is None or self.execution_context.errors is not None:
+            return
+        errors = self.entry.validation_errors.get(tuple(self.execution_context.validation_rules))
+        if errors is not None:
+            self.execution_context.errors = list(errors)
+
+    def on_validation_end(self) -> None:
+        rules = tuple(self.execution_context.validation_rules)
+        if self.entry is not None and rules not in self.entry.validation_errors:
+            self.entry.validation_errors[rules] = list(self.execution_context.errors or [])
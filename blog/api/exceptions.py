@@ -22,3 +22,33 @@ class UnverifiedUser(BlogAppException):
 class SelfReferenceRelation(BlogAppException):
     default_message = ('A post cannot be related to itself',)
     error_code = 'SELF_REFERENCE_RELATION'
+
+
+class InvalidCursor(BlogAppException):
+    default_message = ('The given cursor is not valid',)
+    error_code = 'INVALID_CURSOR'
+
+
+class PersistedQueryError(BlogAppException):
+    error_code = 'PERSISTED_QUERY_ERROR'
+
+
+class PersistedQueryNotFound(PersistedQueryError):
+    # apollo clients resend the query with its text on this exact message
+    default_message = 'PersistedQueryNotFound'
+    error_code = 'PERSISTED_QUERY_NOT_FOUND'
+
+
+class PersistedQueryNotAllowed(PersistedQueryError):
+    default_message = 'Only persisted queries are allowed'
+    error_code = 'PERSISTED_QUERY_NOT_ALLOWED'
+
+
+class PersistedQueryHashMismatch(PersistedQueryError):
+    default_message = 'The sha256 hash does not match the query'
+    error_code = 'PERSISTED_QUERY_HASH_MISMATCH'
+
+
+class QueryCostExceeded(BlogAppException):
+    default_message = 'The query is too expensive'
+    error_code = 'QUERY_COST_EXCEEDED'
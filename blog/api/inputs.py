@@ -47,6 +47,14 @@ class PostStatus(Enum):
     DRAFT = 'DRAFT'
 
 
+@strawberry.enum
+class TagFilterMode(Enum):
+    # posts with at least one of the tags
+    ANY = 'ANY'
+    # posts with every tag
+    ALL = 'ALL'
+
+
 @strawberry.input
 class PostInput:
     slug: Optional[str] = None
@@ -0,0 +1,67 @@
+import json
+import time
+import typing
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from strawberry.extensions import Extension
+
+from blog.metrics import OperationStats
+
+
+class OperationStatsExtension(Extension):
+    """
+    Measures the sql queries, database time and resolver time of an operation. The stats are reported in
+    the response extensions in debug mode, otherwise the view records them in the operation metrics.
+    """
+
+    stats: OperationStats
+    started: float
+    execute_wrapper: typing.Any = None
+
+    def on_request_start(self) -> None:
+        self.stats = OperationStats(operation_name='anonymous')
+        self.started = time.perf_counter()
+        self.execute_wrapper = connection.execute_wrapper(self.record_query)
+        self.execute_wrapper.__enter__()
+
+    def on_request_end(self) -> None:
+        self.execute_wrapper.__exit__(None, None, None)
+        self.stats.total_time = time.perf_counter() - self.started
+        request = getattr(self.execution_context.context, 'request', None)
+        if request is not None:
+            request.operation_stats = self.stats
+
+    def on_parsing_end(self) -> None:
+        if self.execution_context.graphql_document is not None:
+            self.stats.operation_name = self.execution_context.operation_name or 'anonymous'
+
+    def record_query(
+        self, execute: typing.Callable, sql: str, params: typing.Any, many: bool, context: dict
+    ) -> typing.Any:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.stats.sql_queries += 1
+            self.stats.db_time += time.perf_counter() - started
+
+    def resolve(
+        self, _next: typing.Callable, root: typing.Any, info: typing.Any, *args: typing.Any, **kwargs
+    ) -> typing.Any:
+        started = time.perf_counter()
+        try:
+            return _next(root, info, *args, **kwargs)
+        finally:
+            self.stats.resolver_time += time.perf_counter() - started
+
+    def get_results(self) -> typing.Dict[str, typing.Any]:
+        if not settings.DEBUG:
+            return {}
+        self.stats.total_time = time.perf_counter() - self.started
+        stats = self.stats.as_dict()
+        result = self.execution_context.result
+        if result is not None:
+            stats['dataSize'] = len(json.dumps(result.data, cls=DjangoJSONEncoder))
+        return {'stats': stats}
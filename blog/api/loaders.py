@@ -0,0 +1,130 @@
+import typing
+from collections import defaultdict
+from functools import cached_property
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q, QuerySet
+from strawberry.types import Info
+from taggit.models import TaggedItem
+
+from blog.models import Post, PostLike, PostRecommendation, PostRelation, Subscription, User
+
+
+class BatchLoader:
+    """
+    Request scoped, synchronous batch loader. Keys registered with `prime` are loaded together
+    with the first key that misses the cache, so a whole page of posts is resolved in one query.
+    """
+
+    def __init__(self, batch_load: typing.Callable[[typing.List[typing.Any]], typing.Dict]) -> None:
+        self.batch_load = batch_load
+        self.pending = set()
+        self.cache = {}
+
+    def prime(self, keys: typing.Iterable[typing.Any]) -> None:
+        self.pending.update(key for key in keys if key not in self.cache)
+
+    def load(self, key: typing.Any) -> typing.List[typing.Any]:
+        if key not in self.cache:
+            keys = self.pending | {key}
+            self.pending = set()
+            results = self.batch_load(list(keys))
+            for batch_key in keys:
+                self.cache[batch_key] = results.get(batch_key, [])
+        return self.cache[key]
+
+
+def load_post_tags(post_ids: typing.List[int]) -> typing.Dict[int, typing.List]:
+    tags = defaultdict(list)
+    tagged_items = (
+        TaggedItem.objects.filter(content_type=ContentType.objects.get_for_model(Post), object_id__in=post_ids)
+        .select_related('tag')
+        .order_by('id')
+    )
+    for tagged_item in tagged_items:
+        tags[tagged_item.object_id].append(tagged_item.tag)
+    return tags
+
+
+def filter_related_posts(
+    relations: QuerySet, related_field: str, user: typing.Union[User, AnonymousUser]
+) -> QuerySet:
+    # related posts are visible if they are published or owned by the user
+    post_filter = Q(**{f'{related_field}__status': Post.PostStatus.PUBLISHED})
+    if user.is_authenticated:
+        post_filter |= Q(**{f'{related_field}__owner': user})
+    return relations.filter(post_filter)
+
+
+def related_posts_loader(
+    key_field: str, related_field: str, user: typing.Union[User, AnonymousUser]
+) -> typing.Callable[[typing.List[int]], typing.Dict[int, typing.List[Post]]]:
+    def load_related_posts(post_ids: typing.List[int]) -> typing.Dict[int, typing.List[Post]]:
+        related_posts = defaultdict(list)
+        relations = filter_related_posts(
+            PostRelation.objects.filter(**{f'{key_field}__in': post_ids}), related_field, user
+        ).select_related(related_field)
+        for relation in relations.order_by(f'{related_field}_id'):
+            related_posts[getattr(relation, f'{key_field}_id')].append(getattr(relation, related_field))
+        return related_posts
+
+    return load_related_posts
+
+
+def load_recommended_posts(post_ids: typing.List[int]) -> typing.Dict[int, typing.List[Post]]:
+    recommended_posts = defaultdict(list)
+    # posts unpublished since the recommendations were computed are left out
+    recommendations = (
+        PostRecommendation.objects.filter(post_id__in=post_ids, recommended_post__status=Post.PostStatus.PUBLISHED)
+        .select_related('recommended_post')
+        .order_by('post_id', 'rank')
+    )
+    for recommendation in recommendations:
+        recommended_posts[recommendation.post_id].append(recommendation.recommended_post)
+    return recommended_posts
+
+
+class Viewer:
+    """
+    State of the requesting user that is needed by many objects of a response,
+    each loaded at most once per request
+    """
+
+    def __init__(self, user: typing.Union[User, AnonymousUser]) -> None:
+        self.user = user
+
+    @cached_property
+    def liked_post_ids(self) -> typing.Set[int]:
+        if not self.user.is_authenticated:
+            return set()
+        return set(PostLike.objects.filter(user_id=self.user.id).values_list('post_id', flat=True))
+
+    @cached_property
+    def subscribed_author_ids(self) -> typing.Set[int]:
+        if not self.user.is_authenticated:
+            return set()
+        return set(Subscription.objects.filter(subscriber_id=self.user.id).values_list('author_id', flat=True))
+
+
+class Loaders:
+    def __init__(self, user: typing.Union[User, AnonymousUser]) -> None:
+        self.viewer = Viewer(user)
+        self.post_tags = BatchLoader(load_post_tags)
+        self.related_sub_posts = BatchLoader(related_posts_loader('main_post', 'sub_post', user))
+        self.related_main_posts = BatchLoader(related_posts_loader('sub_post', 'main_post', user))
+        self.recommended_posts = BatchLoader(load_recommended_posts)
+
+    def prime_posts(self, posts: typing.Iterable[Post]) -> None:
+        post_ids = [post.id for post in posts]
+        self.post_tags.prime(post_ids)
+        self.related_sub_posts.prime(post_ids)
+        self.related_main_posts.prime(post_ids)
+        self.recommended_posts.prime(post_ids)
+
+
+def get_loaders(info: Info) -> Loaders:
+    request = info.context.request
+    if not hasattr(request, 'loaders'):
+        request.loaders = Loaders(request.user)
+    return request.loaders
@@ -3,6 +3,7 @@ from typing import Union, Optional, Any
 import strawberry
 import strawberry_django_jwt.mutations as jwt_mutations
 from django.db import DatabaseError, transaction
+from django.db.models import F
 from strawberry.types import Info
 from strawberry_django_jwt import exceptions
 from strawberry_django_jwt.decorators import (
@@ -62,6 +63,9 @@ from blog.models import (
     UserProfile,
     Subscription,
     Notification,
+    FeedItem,
+    User,
+    decremented,
 )
 from blog.forms import (
     CategoryForm,
@@ -76,7 +80,6 @@ from blog.forms import (
     PostRelationForm,
     UserProfileForm,
     SubscriptionForm,
-    NotificationForm,
 )
 
 
@@ -254,15 +257,9 @@ class PostMutations:
                                     raise SelfReferenceRelation
                                 PostMutations.create_post_relation(post.id, related_post_id, user)
 
-                        # create notifications
-                        subscriber_ids = Subscription.objects.filter(author=user).values_list('subscriber', flat=True)
-                        for subscriber_id in subscriber_ids:
-                            notification_form = NotificationForm(data={'post': post.id, 'user': subscriber_id})
-                            if not notification_form.is_valid():
-                                has_errors = True
-                                errors.update(notification_form.errors.get_json_data())
-                            if not has_errors:
-                                notification_form.save()
+                        # create notifications and add the post to the feeds of the subscribers
+                        Notification.notify_subscribers(post)
+                        FeedItem.publish(post)
 
             except DatabaseError as e:
                 has_errors = True
@@ -342,6 +339,8 @@ class PostMutations:
         form = UpdatePostStatusForm(instance=post, data=vars(update_post_status_input))
         if form.is_valid():
             post = form.save()
+            if post.status == Post.PostStatus.PUBLISHED:
+                FeedItem.publish(post)
             return UpdatePostStatusType(post=post, success=True, errors=None)
         return UpdatePostStatusType(post=None, success=False, errors=form.errors.get_json_data())
 
@@ -355,7 +354,10 @@ class CommentMutations:
         comment_input.owner = user.id
         form = CreateCommentForm(data=vars(comment_input))
         if form.is_valid():
-            comment = form.save()
+            with transaction.atomic():
+                comment = form.save()
+                Post.objects.filter(pk=comment.post_id).update(comment_count=F('comment_count') + 1)
+                comment.post.refresh_from_db(fields=['comment_count'])
             return comment
         return None
 
@@ -375,7 +377,11 @@ class CommentMutations:
     @strawberry.mutation
     def delete_comment(self, info: Info, comment_id: strawberry.ID) -> bool:
         user = info.context.request.user
-        Comment.objects.filter(pk=comment_id, owner_id=user.id).delete()
+        with transaction.atomic():
+            comment = Comment.objects.filter(pk=comment_id, owner_id=user.id).first()
+            if comment is not None:
+                comment.delete()
+                Post.objects.filter(pk=comment.post_id).update(comment_count=decremented('comment_count', 1))
         return True
 
 
@@ -388,7 +394,10 @@ class PostLikeMutations:
         post_like_input.user = user.id
         form = PostLikeForm(data=vars(post_like_input))
         if form.is_valid():
-            post_like = form.save()
+            with transaction.atomic():
+                post_like = form.save()
+                Post.objects.filter(pk=post_like.post_id).update(like_count=F('like_count') + 1)
+                post_like.post.refresh_from_db(fields=['like_count'])
             return post_like
         return None
 
@@ -396,7 +405,10 @@ class PostLikeMutations:
     @login_required
     def delete_post_like(self, info: Info, post_like_input: PostLikeInput) -> bool:
         user = info.context.request.user
-        PostLike.objects.filter(post=post_like_input.post, user=user.id).delete()
+        with transaction.atomic():
+            deleted, _ = PostLike.objects.filter(post=post_like_input.post, user=user.id).delete()
+            if deleted:
+                Post.objects.filter(pk=post_like_input.post).update(like_count=decremented('like_count', deleted))
         return True
 
 
@@ -416,7 +428,10 @@ class SubscriptionMutations:
             has_errors = True
             errors.update(form.errors.get_json_data())
         if not has_errors:
-            subscription = form.save()
+            with transaction.atomic():
+                subscription = form.save()
+                User.objects.filter(pk=subscription.author_id).update(subscriber_count=F('subscriber_count') + 1)
+                FeedItem.backfill(user.id, subscription.author_id)
 
         return CreateSubscriptionType(
             subscription=subscription, success=not has_errors, errors=errors if errors else None
@@ -426,8 +441,13 @@ class SubscriptionMutations:
     @login_required
     def delete_subscription(self, info: Info, subscription_input: SubscriptionInput) -> bool:
         user = info.context.request.user
-        Subscription.objects.filter(author=subscription_input.author, subscriber=user.id).delete()
+        with transaction.atomic():
+            deleted, _ = Subscription.objects.filter(author=subscription_input.author, subscriber=user.id).delete()
+            if deleted:
+                subscriber_count = decremented('subscriber_count', deleted)
+                User.objects.filter(pk=subscription_input.author).update(subscriber_count=subscriber_count)
         Notification.objects.filter(post__owner_id=subscription_input.author, user_id=user.id).delete()
+        FeedItem.objects.filter(post__owner_id=subscription_input.author, user_id=user.id).delete()
         return True
 
 
@@ -0,0 +1,137 @@
+import dataclasses
+import hashlib
+import json
+import typing
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest
+from strawberry.extensions import Extension
+
+from blog.api.exceptions import PersistedQueryHashMismatch, PersistedQueryNotAllowed, PersistedQueryNotFound
+from blog.models import PersistedQuery
+
+
+def get_query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+def cache_key(query_hash: str) -> str:
+    return f'persisted-query:{query_hash}'
+
+
+@dataclasses.dataclass
+class PersistedQueryEntry:
+    query: str
+    # allow-listed in the database, as opposed to registered by a client
+    allowed: bool
+
+
+class PersistedQueryRegistry:
+    """
+    Queries that clients can send by their sha256 hash. Allow-listed queries are stored in the database,
+    queries registered by clients (automatic persisted queries) in the cache. Each process keeps the most
+    recently used ones, their documents are cached by the DocumentCacheExtension.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.entries: typing.OrderedDict[str, PersistedQueryEntry] = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, query_hash: str) -> typing.Optional[PersistedQueryEntry]:
+        with self.lock:
+            entry = self.entries.get(query_hash)
+            if entry is not None:
+                self.entries.move_to_end(query_hash)
+        if entry is None:
+            entry = self.load(query_hash)
+            if entry is not None:
+                self.store(query_hash, entry)
+        if entry is not None and settings.GRAPHQL_PERSISTED_QUERIES_ALLOWLIST and not entry.allowed:
+            return None
+        return entry
+
+    def register(self, query_hash: str, query: str) -> None:
+        cache.set(cache_key(query_hash), query, settings.GRAPHQL_PERSISTED_QUERIES_TIMEOUT)
+        self.store(query_hash, PersistedQueryEntry(query=query, allowed=False))
+
+    def store(self, query_hash: str, entry: PersistedQueryEntry) -> None:
+        with self.lock:
+            self.entries[query_hash] = entry
+            self.entries.move_to_end(query_hash)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    @staticmethod
+    def load(query_hash: str) -> typing.Optional[PersistedQueryEntry]:
+        query = PersistedQuery.objects.filter(sha256_hash=query_hash).values_list('query', flat=True).first()
+        if query is not None:
+            return PersistedQueryEntry(query=query, allowed=True)
+        if settings.GRAPHQL_PERSISTED_QUERIES_ALLOWLIST:
+            return None
+        query = cache.get(cache_key(query_hash))
+        if query is not None:
+            return PersistedQueryEntry(query=query, allowed=False)
+        return None
+
+
+registry = PersistedQueryRegistry(settings.GRAPHQL_PERSISTED_QUERIES_CACHE_SIZE)
+
+
+def resolve_persisted_query(request: HttpRequest, data: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+    """
+    Replaces the sha256 hash of a persisted query (apollo protocol) with its text. The resolved
+    query is recorded on the request for the PersistedQueryExtension.
+    """
+    extensions = data.get('extensions') or {}
+    # query params of get requests are not decoded
+    if isinstance(extensions, str):
+        extensions = json.loads(extensions)
+    query_hash = (extensions.get('persistedQuery') or {}).get('sha256Hash')
+    query = data.get('query')
+
+    if query_hash is None:
+        if query is None or not settings.GRAPHQL_PERSISTED_QUERIES_ALLOWLIST:
+            return data
+        query_hash = get_query_hash(query)
+        entry = registry.get(query_hash)
+        if entry is None:
+            raise PersistedQueryNotAllowed
+    else:
+        entry = registry.get(query_hash)
+        if query is None:
+            # clients must not retry with the query text if it would not be allowed anyway
+            if entry is None and settings.GRAPHQL_PERSISTED_QUERIES_ALLOWLIST:
+                raise PersistedQueryNotAllowed
+            if entry is None:
+                raise PersistedQueryNotFound
+            data['query'] = entry.query
+        elif get_query_hash(query) != query_hash:
+            raise PersistedQueryHashMismatch
+        elif entry is None and settings.GRAPHQL_PERSISTED_QUERIES_ALLOWLIST:
+            raise PersistedQueryNotAllowed
+
+    request.persisted_query_hash = query_hash
+    request.persisted_query = entry
+    return data
+
+
+class PersistedQueryExtension(Extension):
+    """
+    Registers the queries sent with their hash once they are valid
+    """
+
+    def on_validation_end(self) -> None:
+        request = getattr(self.execution_context.context, 'request', None)
+        query_hash = getattr(request, 'persisted_query_hash', None)
+        if query_hash is None or self.execution_context.errors:
+            return
+        if getattr(request, 'persisted_query', None) is None:
+            registry.register(query_hash, self.execution_context.query)
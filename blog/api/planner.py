@@ -0,0 +1,103 @@
+import typing
+
+from django.db.models import QuerySet
+from strawberry.types import Info
+from strawberry.types.nodes import SelectedField, Selection
+
+# graphql field name -> post column, for fields that are read straight from the post row
+POST_COLUMNS = {
+    'id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'text': 'text',
+    'image': 'image',
+    'dateCreated': 'date_created',
+    'status': 'status',
+    'likeCount': 'like_count',
+    'commentCount': 'comment_count',
+}
+
+
+def flatten_selections(selections: typing.List[Selection]) -> typing.List[SelectedField]:
+    fields = []
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            fields.append(selection)
+        else:
+            # fragment spreads and inline fragments
+            fields.extend(flatten_selections(selection.selections))
+    return fields
+
+
+def find_selections(selections: typing.List[Selection], *path: str) -> typing.List[SelectedField]:
+    fields = flatten_selections(selections)
+    for name in path:
+        fields = flatten_selections([child for field in fields if field.name == name for child in field.selections])
+    return fields
+
+
+class PostQueryPlan:
+    """
+    Collects the select_related / prefetch_related / only calls a post queryset needs
+    to resolve a given graphql selection set
+    """
+
+    def __init__(self) -> None:
+        self.only = {'id', 'owner'}
+        self.select_related = set()
+        self.prefetch_related = set()
+
+    @classmethod
+    def from_info(cls, info: Info, *path: str) -> 'PostQueryPlan':
+        plan = cls()
+        selections = [child for field in flatten_selections(info.selected_fields) for child in field.selections]
+        plan.add_post(find_selections(selections, *path))
+        return plan
+
+    def apply(self, queryset: QuerySet) -> QuerySet:
+        # select_related() without arguments would follow every foreign key
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        return queryset.prefetch_related(*sorted(self.prefetch_related)).only(*sorted(self.only))
+
+    def relate(self, path: str, prefetched: bool) -> None:
+        # foreign keys can be joined as long as we haven't crossed a prefetch boundary
+        if prefetched:
+            self.prefetch_related.add(path)
+        else:
+            self.select_related.add(path)
+            self.only.add(path.split('__')[0])
+
+    def add_post(self, fields: typing.List[SelectedField], prefix: str = '', prefetched: bool = False) -> None:
+        for field in fields:
+            if field.name in POST_COLUMNS:
+                if not prefetched:
+                    self.only.add(POST_COLUMNS[field.name])
+            elif field.name == 'category':
+                self.relate(f'{prefix}category', prefetched)
+            elif field.name == 'owner':
+                self.relate(f'{prefix}owner', prefetched)
+                self.add_user(flatten_selections(field.selections), f'{prefix}owner__', prefetched)
+            elif field.name == 'comments':
+                self.prefetch_related.add(f'{prefix}comments')
+                self.add_comment(flatten_selections(field.selections), f'{prefix}comments__')
+            elif field.name == 'tags' and prefetched:
+                # top level post tags are batched by the post tags loader
+                self.prefetch_related.add(f'{prefix}tags')
+
+    def add_user(self, fields: typing.List[SelectedField], prefix: str, prefetched: bool) -> None:
+        for field in fields:
+            if field.name == 'userStatus':
+                self.relate(f'{prefix}user_status', prefetched)
+            elif field.name == 'profile':
+                self.relate(f'{prefix}profile', prefetched)
+            elif field.name == 'posts':
+                self.prefetch_related.add(f'{prefix}posts')
+                self.add_post(flatten_selections(field.selections), f'{prefix}posts__', prefetched=True)
+
+    def add_comment(self, fields: typing.List[SelectedField], prefix: str) -> None:
+        for field in fields:
+            if field.name == 'owner':
+                self.prefetch_related.add(f'{prefix}owner')
+            elif field.name == 'post':
+                self.prefetch_related.add(f'{prefix}post')
@@ -1,9 +1,11 @@
 import typing
+from datetime import datetime
 from typing import Optional
 
 import strawberry
 from django.core.paginator import Paginator
-from django.db.models import Q, QuerySet
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Q, QuerySet
 from strawberry.types import Info
 from strawberry_django_jwt.decorators import login_required, superuser_required
 
@@ -15,12 +17,36 @@ from blog.api.types import (
     AuthorRequest as AuthorRequestType,
     PaginationAuthorRequests as PaginationAuthorRequestsType,
     PostTitleType,
+    PostTitleSuggestion as PostTitleSuggestionType,
     Subscription as SubscriptionType,
     DetailPost as DetailPostType,
+    PostConnection as PostConnectionType,
+    PaginationSearchResults as PaginationSearchResultsType,
+    SearchResult as SearchResultType,
 )
 
 from taggit.models import Tag, TaggedItem
-from ..models import Category, Post, User, AuthorRequest, Subscription, Notification
+
+from blog.api.exceptions import InvalidCursor
+from blog.api.inputs import TagFilterMode
+from blog.api.loaders import get_loaders
+from blog.api.planner import PostQueryPlan
+from blog.search import query_terms, snippet
+from blog.utils import encode_cursor, decode_cursor
+from ..models import (
+    Category,
+    Post,
+    PostSearchDocument,
+    User,
+    AuthorRequest,
+    Subscription,
+    Notification,
+    FeedItem,
+    title_index,
+)
+
+MAX_CONNECTION_PAGE_SIZE = 50
+MAX_TITLE_SUGGESTIONS = 20
 
 
 @strawberry.type
@@ -71,18 +97,19 @@ class TagQueries:
         self,
         category_slug: Optional[str] = None,
     ) -> typing.List[TagType]:
-        tag_filter = Q()
+        # one aggregated query over the tagged items of published posts
+        post_filter = Q(status=Post.PostStatus.PUBLISHED)
         if category_slug is not None:
-            category_posts = list(
-                Post.objects.select_related('category')
-                .prefetch_related('tags')
-                .filter(category__slug=category_slug)
-                .values_list('id', flat=True)
-            )
-            tag_filter &= Q(object_id__in=category_posts)
+            post_filter &= Q(category__slug=category_slug)
 
-        tags = [obj.tag for obj in TaggedItem.objects.select_related('tag').filter(tag_filter)]
-        return list(set(tags))
+        return (
+            Tag.objects.filter(
+                taggit_taggeditem_items__content_type=ContentType.objects.get_for_model(Post),
+                taggit_taggeditem_items__object_id__in=Post.objects.filter(post_filter).values('id'),
+            )
+            .annotate(post_count=Count('taggit_taggeditem_items', distinct=True))
+            .order_by('name')
+        )
 
 
 @strawberry.type
@@ -96,7 +123,7 @@ class AuthorRequestQueries:
         if status:
             request_filter &= Q(status=status)
 
-        author_requests = AuthorRequest.objects.filter(request_filter)
+        author_requests = AuthorRequest.objects.filter(request_filter).select_related('user')
         if sort:
             author_requests = author_requests.order_by(sort)
         author_requests = list([obj for obj in author_requests])
@@ -129,26 +156,59 @@ class SubscriptionQueries:
 @strawberry.type
 class PostQueries:
     @staticmethod
-    def posts() -> QuerySet:
-        return Post.objects.select_related('category', 'owner').prefetch_related(
-            'tags',
-            'comments',
-            'related_main_posts',
-            'related_sub_posts',
-            'comments__owner',
-            'post_likes',
-            'post_likes__user',
-            'owner__posts',
-            'owner__posts__tags',
-            'owner__posts__category',
-        )
+    def posts(info: Info, *path: str) -> QuerySet:
+        # only load the relations and columns the selection set of the posts at `path` asks for
+        return PostQueryPlan.from_info(info, *path).apply(Post.objects.all())
+
+    @staticmethod
+    def paginate_posts(
+        info: Info,
+        posts: QuerySet,
+        per_page: int,
+        active_page: int,
+        ordering: typing.Tuple[str, ...] = ('date_created', 'id'),
+    ) -> PaginationPostsType:
+        # paginate over distinct ids only, so that joins (e.g. tags) can't duplicate rows and
+        # prefetching is limited to the posts of the requested page
+        post_ids = posts.order_by(*ordering).values_list('id', flat=True).distinct()
+        paginator = Paginator(post_ids, per_page)
+        page_post_ids = list(paginator.page(active_page).object_list)
+        page_posts = list(PostQueries.posts(info, 'posts').filter(id__in=page_post_ids).order_by(*ordering))
+        get_loaders(info).prime_posts(page_posts)
+        return PaginationPostsType(posts=page_posts, num_post_pages=paginator.num_pages)
+
+    @staticmethod
+    def decode_after(after: Optional[str]) -> Optional[typing.Tuple[datetime, int]]:
+        if after is None:
+            return None
+        cursor = decode_cursor(after)
+        if cursor is None:
+            raise InvalidCursor
+        return cursor
 
     @staticmethod
-    def paginate_posts(posts: QuerySet, per_page: int, active_page: int) -> PaginationPostsType:
-        paginator = Paginator(posts, per_page)
-        return PaginationPostsType(posts=paginator.page(active_page), num_post_pages=paginator.num_pages)
+    def post_connection_page(info: Info, post_ids: typing.List[int], first: int) -> PostConnectionType:
+        # post_ids are the ids of up to first + 1 posts, newest first, the extra one tells if there is a next page
+        ordering = ('-date_created', '-id')
+        page_posts = list(PostQueries.posts(info, 'posts').filter(id__in=post_ids[:first]).order_by(*ordering))
+        get_loaders(info).prime_posts(page_posts)
 
-    @strawberry.field
+        end_cursor = encode_cursor(page_posts[-1].date_created, page_posts[-1].id) if page_posts else None
+        return PostConnectionType(posts=page_posts, end_cursor=end_cursor, has_next_page=len(post_ids) > first)
+
+    @staticmethod
+    def paginate_posts_by_cursor(info: Info, posts: QuerySet, first: int, after: Optional[str]) -> PostConnectionType:
+        # keyset pagination on (date_created, id), newest first
+        cursor = PostQueries.decode_after(after)
+        if cursor is not None:
+            date_created, pk = cursor
+            posts = posts.filter(Q(date_created__lt=date_created) | Q(date_created=date_created, id__lt=pk))
+
+        first = max(1, min(first, MAX_CONNECTION_PAGE_SIZE))
+        post_ids = list(posts.order_by('-date_created', '-id').values_list('id', flat=True).distinct()[: first + 1])
+        return PostQueries.post_connection_page(info, post_ids, first)
+
+    @strawberry.field(deprecation_reason='Loads all titles, use postTitleSuggestions')
     def post_titles(self, info: Info) -> typing.List[PostTitleType]:
         user = info.context.request.user
         post_filter = Q(status=Post.PostStatus.PUBLISHED)
@@ -157,44 +217,76 @@ class PostQueries:
         return Post.objects.filter(post_filter).only('title')
 
     @strawberry.field
-    def paginated_posts(
-        self,
-        category_slug: Optional[str] = None,
-        tag_slugs: Optional[str] = None,
-        active_page: Optional[int] = 1,
-    ) -> PaginationPostsType:
+    def post_title_suggestions(self, info: Info, prefix: str, limit: int = 10) -> typing.List[PostTitleSuggestionType]:
+        # served from memory, drafts are only suggested to their owner
+        user = info.context.request.user
+        entries = title_index.suggest(
+            prefix, user.id if user.is_authenticated else None, min(limit, MAX_TITLE_SUGGESTIONS)
+        )
+        return [PostTitleSuggestionType(id=entry.post_id, title=entry.title, slug=entry.slug) for entry in entries]
 
+    @staticmethod
+    def tagged_post_ids(tag_slugs: typing.List[str], tag_mode: TagFilterMode) -> QuerySet:
+        # ids of the tagged posts as a subquery, so that the posts aren't joined with their tags
+        tagged_items = TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(Post), tag__slug__in=tag_slugs
+        ).values('object_id')
+        if tag_mode == TagFilterMode.ALL:
+            # a post is tagged with each tag at most once, so posts with all tags have one item per tag
+            tagged_items = (
+                tagged_items.annotate(tag_count=Count('tag_id')).filter(tag_count=len(tag_slugs)).values('object_id')
+            )
+        return tagged_items
+
+    @staticmethod
+    def published_post_filter(
+        category_slug: Optional[str], tag_slugs: Optional[str], tag_mode: TagFilterMode = TagFilterMode.ANY
+    ) -> Q:
         post_filter = Q()
-        if tag_slugs is not None:
-            tag_slugs_list = tag_slugs.split(',')
-
-            # or
-            for tag in tag_slugs_list:
-                post_filter |= Q(tagged_items__tag__slug__contains=tag)
-
-            # and
-            # tag_filter = Q()
-            # for tag in tag_slugs_list:
-            #     tag_filter |= Q(tag__slug=tag)
-            # tagged_posts = list(
-            #     TaggedItem.objects.select_related('tag')
-            #     .values('object_id')
-            #     .annotate(Count('object_id'))
-            #     .filter(tag_filter)
-            #     .filter(object_id__count=len(tag_slugs_list))
-            #     .values_list('object_id', flat=True)
-            # )
-            # post_filter &= Q(id__in=tagged_posts)
+        # no slugs, e.g. an empty string, don't filter by tags
+        tag_slugs_list = list(dict.fromkeys(slug for slug in (tag_slugs or '').split(',') if slug))
+        if tag_slugs_list:
+            post_filter &= Q(id__in=PostQueries.tagged_post_ids(tag_slugs_list, tag_mode))
 
         if category_slug is not None:
             post_filter &= Q(category__slug=category_slug)
 
         post_filter &= Q(status=Post.PostStatus.PUBLISHED)
+        return post_filter
+
+    @staticmethod
+    def notification_posts(user: UserType) -> QuerySet:
+        notification_post_ids = Notification.objects.filter(user=user).values_list('post_id', flat=True)
+        post_filter = Q(id__in=notification_post_ids)
+        post_filter &= Q(status=Post.PostStatus.PUBLISHED)
+        return Post.objects.filter(post_filter)
+
+    @strawberry.field
+    def paginated_posts(
+        self,
+        info: Info,
+        category_slug: Optional[str] = None,
+        tag_slugs: Optional[str] = None,
+        tag_mode: TagFilterMode = TagFilterMode.ANY,
+        active_page: Optional[int] = 1,
+    ) -> PaginationPostsType:
+        posts = Post.objects.filter(PostQueries.published_post_filter(category_slug, tag_slugs, tag_mode))
 
-        posts = PostQueries.posts().filter(post_filter)
-        posts = list(set([obj for obj in posts]))
+        return PostQueries.paginate_posts(info, posts, 4, active_page)
 
-        return PostQueries.paginate_posts(posts, 4, active_page)
+    @strawberry.field
+    def post_connection(
+        self,
+        info: Info,
+        category_slug: Optional[str] = None,
+        tag_slugs: Optional[str] = None,
+        tag_mode: TagFilterMode = TagFilterMode.ANY,
+        first: int = 4,
+        after: Optional[str] = None,
+    ) -> PostConnectionType:
+        posts = Post.objects.filter(PostQueries.published_post_filter(category_slug, tag_slugs, tag_mode))
+
+        return PostQueries.paginate_posts_by_cursor(info, posts, first, after)
 
     @login_required
     @strawberry.field
@@ -205,10 +297,23 @@ class PostQueries:
     ) -> PaginationPostsType:
         user = info.context.request.user
 
-        posts = PostQueries.posts().filter(owner_id=user).order_by('-id')
-        posts = list([obj for obj in posts])
+        posts = Post.objects.filter(owner_id=user)
+
+        return PostQueries.paginate_posts(info, posts, 6, active_page, ordering=('-id',))
+
+    @login_required
+    @strawberry.field
+    def user_post_connection(
+        self,
+        info: Info,
+        first: int = 6,
+        after: Optional[str] = None,
+    ) -> PostConnectionType:
+        user = info.context.request.user
+
+        posts = Post.objects.filter(owner_id=user)
 
-        return PostQueries.paginate_posts(posts, 6, active_page)
+        return PostQueries.paginate_posts_by_cursor(info, posts, first, after)
 
     @login_required
     @strawberry.field
@@ -219,12 +324,71 @@ class PostQueries:
     ) -> PaginationPostsType:
         user = info.context.request.user
 
-        notification_post_ids = Notification.objects.filter(user=user).values_list('post_id', flat=True)
-        post_filter = Q(id__in=notification_post_ids)
-        post_filter &= Q(status=Post.PostStatus.PUBLISHED)
-        posts = PostQueries.posts().filter(post_filter).order_by('-date_created')
+        posts = PostQueries.notification_posts(user)
+
+        return PostQueries.paginate_posts(info, posts, 4, active_page, ordering=('-date_created', '-id'))
 
-        return PostQueries.paginate_posts(posts, 4, active_page)
+    @login_required
+    @strawberry.field
+    def notification_post_connection(
+        self,
+        info: Info,
+        first: int = 4,
+        after: Optional[str] = None,
+    ) -> PostConnectionType:
+        user = info.context.request.user
+
+        posts = PostQueries.notification_posts(user)
+
+        return PostQueries.paginate_posts_by_cursor(info, posts, first, after)
+
+    @login_required
+    @strawberry.field
+    def feed(
+        self,
+        info: Info,
+        first: int = 10,
+        after: Optional[str] = None,
+    ) -> PostConnectionType:
+        user = info.context.request.user
+
+        # the newest published posts of the authors the user subscribes to, from the feed items written when they
+        # were published, so that the subscriptions aren't joined on each request
+        first = max(1, min(first, MAX_CONNECTION_PAGE_SIZE))
+        keys = FeedItem.newest_posts(user.id, first + 1, PostQueries.decode_after(after))
+
+        return PostQueries.post_connection_page(info, [post_id for _, post_id in keys], first)
+
+    @strawberry.field
+    def search_posts(
+        self,
+        info: Info,
+        query: str,
+        category_slug: Optional[str] = None,
+        tag_slugs: Optional[str] = None,
+        tag_mode: TagFilterMode = TagFilterMode.ANY,
+        active_page: Optional[int] = 1,
+    ) -> PaginationSearchResultsType:
+        terms = query_terms(query)
+        posts = Post.objects.filter(PostQueries.published_post_filter(category_slug, tag_slugs, tag_mode))
+        paginator = Paginator(PostSearchDocument.search(terms, posts), 10)
+        page_hits = list(paginator.page(active_page).object_list)
+
+        plan = PostQueryPlan.from_info(info, 'results', 'post')
+        # the snippets are cut from the text
+        plan.only.add('text')
+        page_posts = plan.apply(Post.objects.all()).in_bulk([hit['document_id'] for hit in page_hits])
+        get_loaders(info).prime_posts(page_posts.values())
+
+        results = [
+            SearchResultType(
+                post=page_posts[hit['document_id']],
+                score=hit['score'],
+                snippet=snippet(page_posts[hit['document_id']].text, terms),
+            )
+            for hit in page_hits
+        ]
+        return PaginationSearchResultsType(results=results, num_pages=paginator.num_pages, total_count=paginator.count)
 
     @strawberry.field
     def post_by_slug(self, info: Info, slug: str) -> Optional[DetailPostType]:
@@ -232,9 +396,9 @@ class PostQueries:
         has_errors = False
         notification_removed = False
         user = info.context.request.user
-        post = Post.objects.get(slug=slug)
+        post = PostQueries.posts(info, 'post').get(slug=slug)
 
-        if not (post.status == Post.PostStatus.PUBLISHED or user.is_authenticated and post.owner == user):
+        if not (post.status == Post.PostStatus.PUBLISHED or user.is_authenticated and post.owner_id == user.id):
             has_errors = True
             errors.update({'post': 'This post is not publicly available'})
 
@@ -0,0 +1,174 @@
+import typing
+
+from django.conf import settings
+from graphql import (
+    ExecutionResult as GraphQLExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLList,
+    GraphQLNamedType,
+    GraphQLObjectType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    SelectionSetNode,
+    get_named_type,
+    get_nullable_type,
+)
+from graphql.execution.values import get_argument_values, get_variable_values
+from graphql.utilities import get_operation_ast
+from strawberry.extensions import Extension
+from strawberry.extensions.query_depth_limiter import create_validator
+from strawberry.types import ExecutionContext
+
+from blog.api.exceptions import QueryCostExceeded
+from blog.api.queries import MAX_CONNECTION_PAGE_SIZE
+
+# estimated number of items of list fields, other lists count as GRAPHQL_DEFAULT_LIST_SIZE items
+LIST_SIZES = {
+    'PaginationPosts.posts': 6,
+    'PaginationAuthorRequests.authorRequests': 8,
+    'PaginationSearchResults.results': 10,
+    'Post.recommendedPosts': settings.RECOMMENDATIONS_PER_POST,
+}
+
+# cost of fields that do more work than loading a related object, e.g. run several queries
+FIELD_WEIGHTS = {
+    'Query.paginatedPosts': 2,
+    'Query.paginatedUserPosts': 2,
+    'Query.paginatedNotificationPosts': 2,
+    'Query.paginatedAuthorRequests': 2,
+    'Query.postBySlug': 2,
+    'Query.searchPosts': 3,
+    'Query.feed': 2,
+}
+
+# writes cost more than reads
+MUTATION_WEIGHT = 10
+
+
+class QueryCost:
+    """
+    Static cost of an operation: each object field costs its weight, lists multiply the cost of their
+    items by their (estimated) size. Lists below a field with a `first` argument have that size.
+    """
+
+    def __init__(
+        self, schema: GraphQLSchema, fragments: typing.Dict[str, FragmentDefinitionNode], variables: dict
+    ) -> None:
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables
+
+    def selection_set_cost(
+        self,
+        parent_type: GraphQLNamedType,
+        selection_set: SelectionSetNode,
+        page_size: typing.Optional[int] = None,
+    ) -> int:
+        cost = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                cost += self.field_cost(parent_type, selection, page_size)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments[selection.name.value]
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+                cost += self.selection_set_cost(fragment_type, fragment.selection_set, page_size)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition is not None:
+                    fragment_type = self.schema.get_type(selection.type_condition.name.value)
+                cost += self.selection_set_cost(fragment_type, selection.selection_set, page_size)
+        return cost
+
+    def field_cost(self, parent_type: GraphQLNamedType, node: FieldNode, page_size: typing.Optional[int]) -> int:
+        # introspection is cheap
+        if not isinstance(parent_type, GraphQLObjectType):
+            return 0
+        field = parent_type.fields.get(node.name.value)
+        if field is None:
+            return 0
+
+        is_mutation = parent_type is self.schema.mutation_type
+        # scalars are loaded with their object, but mutations returning one still write
+        if node.selection_set is None:
+            return MUTATION_WEIGHT if is_mutation else 0
+
+        coordinate = f'{parent_type.name}.{node.name.value}'
+        weight = MUTATION_WEIGHT if is_mutation else FIELD_WEIGHTS.get(coordinate, 1)
+
+        size = 1
+        if isinstance(get_nullable_type(field.type), GraphQLList):
+            size = page_size or LIST_SIZES.get(coordinate, settings.GRAPHQL_DEFAULT_LIST_SIZE)
+
+        first = get_argument_values(field, node, self.variables).get('first') if 'first' in field.args else None
+        child_page_size = max(1, min(first, MAX_CONNECTION_PAGE_SIZE)) if first is not None else None
+
+        item_cost = weight + self.selection_set_cost(get_named_type(field.type), node.selection_set, child_page_size)
+        return size * item_cost
+
+
+def get_query_cost(schema: GraphQLSchema, execution_context: ExecutionContext) -> typing.Optional[int]:
+    document = execution_context.graphql_document
+    operation = get_operation_ast(document, execution_context.operation_name)
+    if operation is None:
+        return None
+    variables = get_variable_values(schema, operation.variable_definitions or [], execution_context.variables or {})
+    # invalid variables are reported by the execution
+    if isinstance(variables, list):
+        return None
+
+    root_type = {
+        'query': schema.query_type,
+        'mutation': schema.mutation_type,
+        'subscription': schema.subscription_type,
+    }[operation.operation.value]
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    return QueryCost(schema, fragments, variables).selection_set_cost(root_type, operation.selection_set)
+
+
+class QueryCostExtension(Extension):
+    """
+    Rejects operations whose static cost exceeds GRAPHQL_MAX_QUERY_COST before they are executed,
+    the cost is reported in the extensions of the response
+    """
+
+    cost: typing.Optional[int] = None
+
+    def on_executing_start(self) -> None:
+        execution_context = self.execution_context
+        try:
+            self.cost = get_query_cost(execution_context.schema._schema, execution_context)
+        except GraphQLError:
+            # e.g. missing arguments, reported by the execution
+            return
+
+        if self.cost is not None and self.cost > settings.GRAPHQL_MAX_QUERY_COST:
+            error = QueryCostExceeded(
+                f'The query cost {self.cost} exceeds the maximum of {settings.GRAPHQL_MAX_QUERY_COST}'
+            )
+            execution_context.result = GraphQLExecutionResult(
+                data=None, errors=[GraphQLError(str(error), original_error=error)]
+            )
+
+    def get_results(self) -> typing.Dict[str, typing.Any]:
+        if self.cost is None:
+            return {}
+        return {'cost': {'requested': self.cost, 'maximum': settings.GRAPHQL_MAX_QUERY_COST}}
+
+
+depth_limit_rule = create_validator(settings.GRAPHQL_MAX_QUERY_DEPTH)
+
+
+class QueryDepthLimitExtension(Extension):
+    """
+    Rejects operations nested deeper than GRAPHQL_MAX_QUERY_DEPTH when they are validated
+    """
+
+    def on_request_start(self) -> None:
+        self.execution_context.validation_rules = self.execution_context.validation_rules + (depth_limit_rule,)
@@ -6,6 +6,10 @@ from strawberry_django_plus.directives import SchemaDirectiveExtension
 from strawberry_django_plus.optimizer import DjangoOptimizerExtension
 from strawberry_django_jwt.middleware import JSONWebTokenMiddleware
 from typing import List, Optional
+from .document_cache import DocumentCacheExtension
+from .instrumentation import OperationStatsExtension
+from .persisted_queries import PersistedQueryExtension
+from .query_cost import QueryCostExtension, QueryDepthLimitExtension
 from .mutations import (
     AuthMutation,
     CategoryMutations,
@@ -63,7 +67,12 @@ schema = Schema(
     query=RootQuery,
     mutation=RootMutation,
     extensions=[
+        OperationStatsExtension,
         JSONWebTokenMiddleware,
+        DocumentCacheExtension,
+        PersistedQueryExtension,
+        QueryDepthLimitExtension,
+        QueryCostExtension,
         SchemaDirectiveExtension,
         DjangoOptimizerExtension,
     ],
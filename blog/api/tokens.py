@@ -0,0 +1,66 @@
+import dataclasses
+import typing
+
+import jwt
+from django.http import HttpRequest
+from strawberry_django_jwt import utils
+from strawberry_django_jwt.object_types import TokenPayloadType
+from strawberry_django_jwt.settings import jwt_settings
+
+from blog.models import User
+
+# user status flags that are carried in the jwt, so permission checks don't need to load the user status
+CLAIMS = ('is_author', 'verified')
+
+
+@dataclasses.dataclass
+class TokenPayload(TokenPayloadType):
+    # None if the token was issued without the claim
+    is_author: typing.Optional[bool] = None
+    verified: typing.Optional[bool] = None
+
+
+def get_status_claims(user: User) -> typing.Dict[str, typing.Optional[bool]]:
+    user_status = getattr(user, 'user_status', None)
+    return {claim: getattr(user_status, claim, None) for claim in CLAIMS}
+
+
+def jwt_payload(user: User, context: typing.Any = None) -> TokenPayload:
+    payload = utils.jwt_payload(user, context)
+    return TokenPayload(**vars(payload), **get_status_claims(user))
+
+
+def jwt_decode(token: str, context: typing.Any = None) -> TokenPayload:
+    return TokenPayload(
+        **jwt.decode(
+            token,
+            jwt_settings.JWT_PUBLIC_KEY or jwt_settings.JWT_SECRET_KEY,
+            options={
+                'verify_exp': jwt_settings.JWT_VERIFY_EXPIRATION,
+                'verify_aud': jwt_settings.JWT_AUDIENCE is not None,
+                'verify_signature': jwt_settings.JWT_VERIFY,
+            },
+            leeway=jwt_settings.JWT_LEEWAY,
+            audience=jwt_settings.JWT_AUDIENCE,
+            issuer=jwt_settings.JWT_ISSUER,
+            algorithms=[jwt_settings.JWT_ALGORITHM],
+        )
+    )
+
+
+def claims_outdated(payload: TokenPayload, user: User) -> bool:
+    # only compared if the user status has already been loaded, e.g. for a user from the principal cache
+    if not User.user_status.related.is_cached(user):
+        return False
+    return any(getattr(payload, claim, None) != value for claim, value in get_status_claims(user).items())
+
+
+def get_claim(request: HttpRequest, claim: str) -> bool:
+    user = request.user
+    if not user.is_authenticated:
+        return False
+    # set by the middleware for users authenticated by an up-to-date jwt
+    value = getattr(getattr(request, 'jwt_payload', None), claim, None)
+    if value is None:
+        return bool(getattr(getattr(user, 'user_status', None), claim, False))
+    return value
@@ -1,7 +1,6 @@
 import typing
 from datetime import datetime
 
-from django.db.models import Q
 from strawberry import auto
 import strawberry
 from strawberry.scalars import JSON
@@ -10,6 +9,7 @@ from strawberry_django_plus import gql
 from taggit.models import Tag as TagModel
 
 from blog.api.inputs import PostStatus, Language
+from blog.api.loaders import get_loaders
 from blog.models import (
     Category as CategoryModel,
     User as UserModel,
@@ -89,6 +89,13 @@ class PostTitleType:
     title: str
 
 
+@strawberry.type
+class PostTitleSuggestion:
+    id: strawberry.ID
+    title: str
+    slug: str
+
+
 @gql.django.type(AuthorRequestModel)
 class AuthorRequest:
     id: strawberry.ID
@@ -116,6 +123,11 @@ class Tag:
     slug: str
     name: str
 
+    @strawberry.field
+    def post_count(self) -> typing.Optional[int]:
+        # only available on tags annotated with their usage, e.g. usedTags
+        return getattr(self, 'post_count', None)
+
 
 @gql.django.type(PostModel)
 class Post:
@@ -129,72 +141,35 @@ class Post:
     owner: 'User'
     date_created: auto
     status: PostStatus
-
-    @staticmethod
-    def filter_related_posts(
-        relation_id_filter: Q, published_filter: Q, post_owner_filter: Q, user: 'User'
-    ) -> typing.List['Post']:
-        post_filter = relation_id_filter
-        if user.is_authenticated:
-            post_filter &= published_filter | post_owner_filter
-        else:
-            post_filter &= published_filter
-        return PostModel.objects.filter(post_filter)
+    like_count: int
+    comment_count: int
 
     @strawberry.field
     def related_sub_posts(self, info: Info) -> typing.List['Post']:
-        user = info.context.request.user
-        return Post.filter_related_posts(
-            Q(related_sub_posts__main_post_id__exact=self.id),
-            Q(related_sub_posts__sub_post__status=PostModel.PostStatus.PUBLISHED),
-            Q(related_sub_posts__sub_post__owner=user),
-            user,
-        )
+        return get_loaders(info).related_sub_posts.load(self.id)
 
     @strawberry.field
     def related_main_posts(self, info: Info) -> typing.List['Post']:
-        user = info.context.request.user
-        return Post.filter_related_posts(
-            Q(related_main_posts__sub_post_id__exact=self.id),
-            Q(related_main_posts__main_post__status=PostModel.PostStatus.PUBLISHED),
-            Q(related_main_posts__main_post__owner=user),
-            user,
-        )
+        return get_loaders(info).related_main_posts.load(self.id)
 
     @strawberry.field
-    def tags(self) -> typing.List[Tag]:
-        return TagModel.objects.filter(taggit_taggeditem_items__object_id__exact=self.id)
+    def recommended_posts(self, info: Info) -> typing.List['Post']:
+        return get_loaders(info).recommended_posts.load(self.id)
 
     @strawberry.field
-    def is_liked(self, info: Info) -> bool:
-        user = info.context.request.user
-        if user.is_authenticated:
-            user_like_count = len(
-                list(
-                    filter(
-                        lambda post_like: post_like.user == user,
-                        self.post_likes.all(),
-                    )
-                )
-            )
-            return user_like_count > 0
-        return False
+    def tags(self, info: Info) -> typing.List[Tag]:
+        prefetched_tags = getattr(self, '_prefetched_objects_cache', {}).get('tags')
+        if prefetched_tags is not None:
+            return list(prefetched_tags)
+        return get_loaders(info).post_tags.load(self.id)
 
     @strawberry.field
-    def is_subscribed(self, info: Info) -> bool:
-        user = info.context.request.user
-        if user.is_authenticated:
-            return user.id in self.owner.subscribers.values_list('subscriber', flat=True)
-
-        return False
-
-    @strawberry.field
-    def like_count(self) -> int:
-        return self.post_likes.count()
+    def is_liked(self, info: Info) -> bool:
+        return self.id in get_loaders(info).viewer.liked_post_ids
 
     @strawberry.field
-    def comment_count(self) -> int:
-        return self.comments.count()
+    def is_subscribed(self, info: Info) -> bool:
+        return self.owner_id in get_loaders(info).viewer.subscribed_author_ids
 
 
 @strawberry.type
@@ -270,11 +245,7 @@ class User:
 
     @strawberry.field
     def is_subscribed(self, info: Info) -> bool:
-        user = info.context.request.user
-        if user.is_authenticated:
-            return user.id in self.subscribers.values_list('subscriber', flat=True)
-
-        return False
+        return self.id in get_loaders(info).viewer.subscribed_author_ids
 
 
 @gql.django.type(PostModel)
@@ -283,6 +254,28 @@ class PaginationPosts:
     num_post_pages: int
 
 
+@strawberry.type
+class SearchResult:
+    post: Post
+    score: float
+    # part of the post text around the first match
+    snippet: str
+
+
+@strawberry.type
+class PaginationSearchResults:
+    results: typing.List[SearchResult]
+    num_pages: int
+    total_count: int
+
+
+@strawberry.type
+class PostConnection:
+    posts: typing.List[Post]
+    end_cursor: typing.Optional[str]
+    has_next_page: bool
+
+
 @gql.django.type(CommentModel)
 class Comment:
     id: strawberry.ID
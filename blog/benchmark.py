@@ -0,0 +1,207 @@
+import dataclasses
+import json
+import math
+import os
+import random
+import re
+import time
+import typing
+
+from django.conf import settings
+from django.db.models import Count
+from django.test import Client
+from strawberry_django_jwt.settings import jwt_settings
+from strawberry_django_jwt.shortcuts import get_token
+from taggit.models import Tag
+
+from blog.dataset import WORDS
+from blog.models import Category, Post, User
+
+# Runs the operations of the frontend against the current database through the whole django stack
+# (middlewares, jwt authentication, graphql extensions) and reports their latency and sql queries.
+
+OPERATIONS_DIR = os.path.join(settings.BASE_DIR, 'blog', 'tests', 'graphql')
+
+
+def read_operation(file_name: str) -> str:
+    """
+    Query of a .graphql file with its #import-ed fragments
+    """
+    path = os.path.join(OPERATIONS_DIR, file_name)
+    if not os.path.exists(path):
+        path = os.path.join(OPERATIONS_DIR, 'fragments', os.path.basename(file_name))
+    with open(path) as file:
+        content = file.read()
+    for import_string, relative_path in re.findall('(#import "(.*)")', content):
+        content = content.replace(import_string, '') + '\n\n' + read_operation(relative_path.removeprefix('./'))
+    return content
+
+
+@dataclasses.dataclass
+class BenchmarkData:
+    viewer: User
+    post_slugs: typing.List[str]
+    category_slugs: typing.List[str]
+    tag_slugs: typing.List[str]
+    post_pages: int
+
+    @staticmethod
+    def load() -> 'BenchmarkData':
+        # the author with the most subscribers and subscriptions sees the most data
+        viewer = (
+            User.objects.filter(user_status__is_author=True)
+            .annotate(subscription_count=Count('subscriptions'))
+            .order_by('-subscription_count', 'id')
+            .first()
+        )
+        if viewer is None:
+            raise ValueError('There are no authors, generate a dataset first')
+        published_posts = Post.objects.filter(status=Post.PostStatus.PUBLISHED)
+        return BenchmarkData(
+            viewer=viewer,
+            post_slugs=list(published_posts.order_by('-date_created').values_list('slug', flat=True)[:1000]),
+            category_slugs=list(Category.objects.values_list('slug', flat=True)),
+            tag_slugs=list(
+                Tag.objects.annotate(post_count=Count('taggit_taggeditem_items'))
+                .order_by('-post_count')
+                .values_list('slug', flat=True)[:100]
+            ),
+            post_pages=max(1, math.ceil(published_posts.count() / 4)),
+        )
+
+
+@dataclasses.dataclass
+class BenchmarkOperation:
+    name: str
+    file_name: str
+    authenticated: bool = False
+    # variables of a run
+    variables: typing.Callable[[BenchmarkData, random.Random], typing.Dict] = lambda data, rng: {}
+
+
+def recent_page(data: BenchmarkData, rng: random.Random) -> int:
+    # most visitors stay on the first pages
+    return min(int(rng.expovariate(1 / 3)) + 1, data.post_pages)
+
+
+OPERATIONS = [
+    BenchmarkOperation(
+        'PaginatedFilteredPosts',
+        'paginatedFilteredPostsQuery.graphql',
+        variables=lambda data, rng: {'activePage': recent_page(data, rng)},
+    ),
+    BenchmarkOperation(
+        'PaginatedFilteredPostsByCategory',
+        'paginatedFilteredPostsQuery.graphql',
+        variables=lambda data, rng: {'categorySlug': rng.choice(data.category_slugs), 'activePage': 1},
+    ),
+    BenchmarkOperation(
+        'PaginatedFilteredPostsByTag',
+        'paginatedFilteredPostsQuery.graphql',
+        variables=lambda data, rng: {'tagSlugs': rng.choice(data.tag_slugs), 'activePage': 1},
+    ),
+    BenchmarkOperation(
+        'PaginatedFilteredPostsByAllTags',
+        'paginatedFilteredPostsQuery.graphql',
+        variables=lambda data, rng: {
+            'tagSlugs': ','.join(rng.sample(data.tag_slugs[:10], min(2, len(data.tag_slugs)))),
+            'tagMode': 'ALL',
+            'activePage': 1,
+        },
+    ),
+    BenchmarkOperation('PostConnection', 'postConnection.graphql', variables=lambda data, rng: {'first': 4}),
+    BenchmarkOperation(
+        'PostBySlug', 'getPostBySlug.graphql', variables=lambda data, rng: {'slug': rng.choice(data.post_slugs)}
+    ),
+    # removes the notifications of the viewer for the post
+    BenchmarkOperation(
+        'PostBySlugAuthenticated',
+        'getPostBySlug.graphql',
+        authenticated=True,
+        variables=lambda data, rng: {'slug': rng.choice(data.post_slugs)},
+    ),
+    BenchmarkOperation(
+        'SearchPosts',
+        'searchPosts.graphql',
+        variables=lambda data, rng: {'query': ' '.join(rng.sample(WORDS, 2)), 'activePage': 1},
+    ),
+    BenchmarkOperation('UsedTags', 'usedTags.graphql'),
+    BenchmarkOperation(
+        'UsedTagsByCategory',
+        'usedTags.graphql',
+        variables=lambda data, rng: {'categorySlug': rng.choice(data.category_slugs)},
+    ),
+    BenchmarkOperation('AllTags', 'allTags.graphql'),
+    BenchmarkOperation('Me', 'me.graphql', authenticated=True),
+    BenchmarkOperation('NotificationPosts', 'getNotificationPosts.graphql', authenticated=True),
+    BenchmarkOperation('Feed', 'feed.graphql', authenticated=True, variables=lambda data, rng: {'first': 10}),
+    BenchmarkOperation('UserPosts', 'getUserPosts.graphql', authenticated=True),
+    BenchmarkOperation('UserSubscriptions', 'getUserSubscriptions.graphql', authenticated=True),
+]
+
+
+def percentile(values: typing.List[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of the values
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+    name: str
+    # seconds
+    durations: typing.List[float] = dataclasses.field(default_factory=list)
+    sql_queries: typing.List[int] = dataclasses.field(default_factory=list)
+    response_sizes: typing.List[int] = dataclasses.field(default_factory=list)
+    errors: int = 0
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            'operation': self.name,
+            'runs': len(self.durations),
+            'errors': self.errors,
+            'p50Ms': round(percentile(self.durations, 50) * 1000, 2),
+            'p90Ms': round(percentile(self.durations, 90) * 1000, 2),
+            'p99Ms': round(percentile(self.durations, 99) * 1000, 2),
+            'maxMs': round(max(self.durations) * 1000, 2),
+            'sqlQueries': round(sum(self.sql_queries) / len(self.sql_queries), 1),
+            'maxSqlQueries': max(self.sql_queries),
+            'responseSize': round(sum(self.response_sizes) / len(self.response_sizes)),
+        }
+
+
+class Benchmark:
+    def __init__(self, iterations: int, warmup: int, seed: int = 0) -> None:
+        self.iterations = iterations
+        self.warmup = warmup
+        self.random = random.Random(seed)
+        self.data = BenchmarkData.load()
+        self.anonymous_client = Client()
+        self.viewer_client = Client()
+        self.viewer_client.cookies[jwt_settings.JWT_COOKIE_NAME] = get_token(self.data.viewer)
+
+    def execute(self, operation: BenchmarkOperation, query: str) -> typing.Tuple[float, int, int, bool]:
+        client = self.viewer_client if operation.authenticated else self.anonymous_client
+        body = {'query': query, 'variables': operation.variables(self.data, self.random)}
+        started = time.perf_counter()
+        response = client.post('/graphql/', data=body, content_type='application/json')
+        duration = time.perf_counter() - started
+        # set by the OperationStatsExtension
+        stats = response.wsgi_request.operation_stats
+        has_errors = response.status_code != 200 or bool(json.loads(response.content).get('errors'))
+        return duration, stats.sql_queries, len(response.content), has_errors
+
+    def run(self, operation: BenchmarkOperation) -> BenchmarkResult:
+        query = read_operation(operation.file_name)
+        result = BenchmarkResult(name=operation.name)
+        for _ in range(self.warmup):
+            self.execute(operation, query)
+        for _ in range(self.iterations):
+            duration, sql_queries, response_size, has_errors = self.execute(operation, query)
+            result.durations.append(duration)
+            result.sql_queries.append(sql_queries)
+            result.response_sizes.append(response_size)
+            result.errors += has_errors
+        return result
@@ -0,0 +1,255 @@
+import dataclasses
+import random
+import typing
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+from taggit.models import Tag, TaggedItem
+
+from blog.models import (
+    Category,
+    Comment,
+    FeedItem,
+    Notification,
+    Post,
+    PostLike,
+    PostRecommendation,
+    PostSearchDocument,
+    Subscription,
+    User,
+    UserProfile,
+    UserStatus,
+    title_index,
+)
+
+# Synthetic data for benchmarks. Authors, tags and posts are picked with a long tailed popularity, like on a real
+# blog a few authors write most posts, a few tags are on most posts and a few posts get most likes and comments.
+
+USERNAME_PREFIX = 'dataset_user'
+PASSWORD = 'dataset_password'
+BATCH_SIZE = 1000
+
+WORDS = (
+    'django python graphql query cache index database server client browser performance latency request '
+    'response design pattern testing deployment docker container cloud security token session cookie '
+    'frontend backend react vue typescript javascript style layout mobile search feed notification email '
+    'travel food music photography garden coffee bicycle mountain river city winter summer autumn spring'
+).split()
+
+CATEGORIES = ('Technology', 'Programming', 'Design', 'Travel', 'Food', 'Music', 'Photography', 'Lifestyle')
+
+
+@dataclasses.dataclass
+class DatasetSize:
+    users: int
+    authors: int
+    tags: int
+    posts: int
+    # averages per post and per user
+    tags_per_post: int
+    comments_per_post: int
+    likes_per_post: int
+    subscriptions_per_user: int
+    # share of the latest posts the subscribers of their authors have not read yet
+    unread_share: float = 0.1
+    published_share: float = 0.9
+
+    @staticmethod
+    def for_scale(scale: int) -> 'DatasetSize':
+        return DatasetSize(
+            users=1000 * scale,
+            authors=50 * scale,
+            tags=200 * scale,
+            posts=2000 * scale,
+            tags_per_post=3,
+            comments_per_post=5,
+            likes_per_post=10,
+            subscriptions_per_user=5,
+        )
+
+
+class DatasetGenerator:
+    def __init__(self, size: DatasetSize, seed: int = 0) -> None:
+        self.size = size
+        self.random = random.Random(seed)
+        self.counts: typing.Dict[str, int] = {}
+        # cumulative weights by population size
+        self.weights: typing.Dict[int, typing.List[float]] = {}
+
+    def pareto_choices(self, population: typing.Sequence, k: int) -> typing.List:
+        """
+        k items of the population, the first items are picked most often
+        """
+        if len(population) not in self.weights:
+            self.weights[len(population)] = list(accumulate(1 / (rank + 1) for rank in range(len(population))))
+        return self.random.choices(population, cum_weights=self.weights[len(population)], k=k)
+
+    def sample_count(self, average: int, maximum: int) -> int:
+        # exponentially distributed around the average
+        return min(int(self.random.expovariate(1 / average)) if average else 0, maximum)
+
+    def sentence(self, words: int) -> str:
+        return ' '.join(self.random.choices(WORDS, k=words))
+
+    def bulk_create(self, model: typing.Type, objects: typing.List, fetch: bool = False) -> typing.List:
+        """
+        Creates the objects, fetch returns them with their ids, which bulk_create only sets on some databases
+        """
+        last_id = model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+        name = str(model._meta.verbose_name_plural)
+        self.counts[name] = self.counts.get(name, 0) + len(objects)
+        return list(model.objects.filter(pk__gt=last_id).order_by('pk')) if fetch else objects
+
+    @transaction.atomic
+    def generate(self) -> typing.Dict[str, int]:
+        categories = self.generate_categories()
+        users = self.generate_users()
+        authors = users[: self.size.authors]
+        tags = self.generate_tags()
+        posts = self.generate_posts(authors, categories)
+        self.generate_tagged_items(posts, tags)
+        published_posts = [post for post in posts if post.status == Post.PostStatus.PUBLISHED]
+        self.generate_comments(published_posts, users)
+        self.generate_likes(published_posts, users)
+        subscriptions = self.generate_subscriptions(users, authors)
+        self.generate_notifications(published_posts, subscriptions)
+        Post.reconcile_counters()
+        User.reconcile_subscriber_counts()
+        FeedItem.rebuild()
+        self.counts['feed items'] = FeedItem.objects.count()
+        # bulk_create doesn't send the signals that index the posts
+        self.counts['post search documents'] = PostSearchDocument.rebuild()
+        PostRecommendation.compute(full=True)
+        self.counts['post recommendations'] = PostRecommendation.objects.count()
+        title_index.invalidate()
+        return self.counts
+
+    def generate_categories(self) -> typing.List[Category]:
+        categories = list(Category.objects.filter(name__in=CATEGORIES))
+        existing = {category.name for category in categories}
+        for name in CATEGORIES:
+            if name not in existing:
+                categories.append(Category.objects.create(name=name))
+        return categories
+
+    def generate_users(self) -> typing.List[User]:
+        first_id = User.objects.filter(username__startswith=USERNAME_PREFIX).count()
+        # hashing is slow on purpose, all users share the same password
+        password = make_password(PASSWORD)
+        users = self.bulk_create(
+            User,
+            [
+                User(
+                    username=f'{USERNAME_PREFIX}{first_id + index}',
+                    email=f'{USERNAME_PREFIX}{first_id + index}@blogapp.lo',
+                    password=password,
+                )
+                for index in range(self.size.users)
+            ],
+            fetch=True,
+        )
+        self.bulk_create(
+            UserStatus,
+            [
+                UserStatus(user=user, verified=True, is_author=index < self.size.authors)
+                for index, user in enumerate(users)
+            ],
+        )
+        self.bulk_create(UserProfile, [UserProfile(user=user) for user in users])
+        return users
+
+    def generate_tags(self) -> typing.List[Tag]:
+        first_id = Tag.objects.count()
+        names = [f'{self.random.choice(WORDS)}-{first_id + index}' for index in range(self.size.tags)]
+        return self.bulk_create(Tag, [Tag(name=name, slug=name) for name in names], fetch=True)
+
+    def generate_posts(self, authors: typing.List[User], categories: typing.List[Category]) -> typing.List[Post]:
+        first_id = Post.objects.count()
+        now = timezone.now()
+        posts = [
+            Post(
+                title=f'{self.sentence(self.random.randint(3, 8)).capitalize()} {first_id + index}',
+                text='\n\n'.join(self.sentence(self.random.randint(40, 120)) for _ in range(self.random.randint(2, 6))),
+                category=self.random.choice(categories),
+                owner=owner,
+                status=(
+                    Post.PostStatus.PUBLISHED
+                    if self.random.random() < self.size.published_share
+                    else Post.PostStatus.DRAFT
+                ),
+            )
+            for index, owner in enumerate(self.pareto_choices(authors, self.size.posts))
+        ]
+        posts = self.bulk_create(Post, posts, fetch=True)
+
+        # spread the posts over the last two years, date_created is set to now on create
+        for index, post in enumerate(posts):
+            post.date_created = now - timedelta(minutes=(len(posts) - index) * 60 * 24 * 730 // len(posts))
+            post.date_updated = post.date_created
+        Post.objects.bulk_update(posts, ['date_created', 'date_updated'], batch_size=BATCH_SIZE)
+        return posts
+
+    def generate_tagged_items(self, posts: typing.List[Post], tags: typing.List[Tag]) -> None:
+        content_type = ContentType.objects.get_for_model(Post)
+        tagged_items = []
+        for post in posts:
+            post_tags = set(self.pareto_choices(tags, self.sample_count(self.size.tags_per_post, len(tags)) + 1))
+            tagged_items.extend(TaggedItem(content_type=content_type, object_id=post.id, tag=tag) for tag in post_tags)
+        self.bulk_create(TaggedItem, tagged_items)
+
+    def generate_comments(self, posts: typing.List[Post], users: typing.List[User]) -> None:
+        # the most commented posts are not the oldest
+        posts = self.random.sample(posts, len(posts))
+        comments = []
+        for post in self.pareto_choices(posts, self.size.comments_per_post * len(posts)):
+            comments.append(
+                Comment(
+                    title=self.sentence(self.random.randint(2, 6)),
+                    text=self.sentence(self.random.randint(5, 60)),
+                    post=post,
+                    owner=self.random.choice(users),
+                )
+            )
+        self.bulk_create(Comment, comments)
+
+    def generate_likes(self, posts: typing.List[Post], users: typing.List[User]) -> None:
+        likes = []
+        for post in posts:
+            likers = self.random.sample(users, self.sample_count(self.size.likes_per_post, len(users)))
+            likes.extend(PostLike(post=post, user=user) for user in likers)
+        self.bulk_create(PostLike, likes)
+
+    def generate_subscriptions(self, users: typing.List[User], authors: typing.List[User]) -> typing.List[Subscription]:
+        subscriptions = []
+        for user in users:
+            subscribed_authors = set(
+                self.pareto_choices(authors, self.sample_count(self.size.subscriptions_per_user, len(authors)))
+            )
+            subscriptions.extend(
+                Subscription(subscriber=user, author=author) for author in subscribed_authors if author != user
+            )
+        return self.bulk_create(Subscription, subscriptions)
+
+    def generate_notifications(self, posts: typing.List[Post], subscriptions: typing.List[Subscription]) -> None:
+        subscribers: typing.Dict[int, typing.List[int]] = {}
+        for subscription in subscriptions:
+            subscribers.setdefault(subscription.author_id, []).append(subscription.subscriber_id)
+
+        unread_posts = posts[len(posts) - int(len(posts) * self.size.unread_share):]
+        self.bulk_create(
+            Notification,
+            [
+                Notification(post=post, user_id=subscriber_id)
+                for post in unread_posts
+                for subscriber_id in subscribers.get(post.owner_id, [])
+            ],
+        )
+
+
+def generate_dataset(size: DatasetSize, seed: int = 0) -> typing.Dict[str, int]:
+    return DatasetGenerator(size, seed).generate()
@@ -0,0 +1,46 @@
+import json
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.test.utils import setup_test_environment
+
+from blog.benchmark import OPERATIONS, Benchmark
+
+COLUMNS = ('operation', 'runs', 'errors', 'p50Ms', 'p90Ms', 'p99Ms', 'maxMs', 'sqlQueries', 'maxSqlQueries')
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs the graphql operations of the frontend against the current database and reports '
+        'their latency percentiles and sql queries'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('operations', nargs='*', help='Names of the operations to run, all by default')
+        parser.add_argument('--iterations', type=int, default=100, help='Measured runs per operation')
+        parser.add_argument('--warmup', type=int, default=10, help='Unmeasured runs per operation')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the random variables')
+        parser.add_argument('--json', action='store_true', help='Print the results as json')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        names = options['operations']
+        operations = [operation for operation in OPERATIONS if not names or operation.name in names]
+        if not operations:
+            raise CommandError(f'Unknown operations, available are {", ".join(o.name for o in OPERATIONS)}')
+
+        # allows the requests of the test client and keeps emails in memory
+        setup_test_environment()
+        try:
+            benchmark = Benchmark(options['iterations'], options['warmup'], options['seed'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        results = [benchmark.run(operation).as_dict() for operation in operations]
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=4))
+            return
+
+        widths = [max(len(column), *(len(str(result[column])) for result in results)) for column in COLUMNS]
+        self.stdout.write('  '.join(column.ljust(width) for column, width in zip(COLUMNS, widths)))
+        for result in results:
+            self.stdout.write('  '.join(str(result[column]).ljust(width) for column, width in zip(COLUMNS, widths)))
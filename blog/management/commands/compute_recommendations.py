@@ -0,0 +1,16 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from blog.models import PostRecommendation
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the recommended posts of the posts that changed since the last run and of the posts they affect'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--full', action='store_true', help='Recompute the recommended posts of all posts')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        computed = PostRecommendation.compute(full=options['full'])
+        self.stdout.write(f'Computed the recommendations of {computed} posts')
@@ -0,0 +1,34 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from blog.dataset import DatasetSize, generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates a synthetic dataset of users, posts, tags, comments, likes, subscriptions and notifications, '
+        'scale 1 creates 1000 users and 2000 posts'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--scale', type=int, default=1, help='Multiplies the number of users, tags and posts')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the random generator')
+        parser.add_argument('--users', type=int, default=None, help='Number of users, overrides the scale')
+        parser.add_argument('--authors', type=int, default=None, help='Number of authors, overrides the scale')
+        parser.add_argument('--tags', type=int, default=None, help='Number of tags, overrides the scale')
+        parser.add_argument('--posts', type=int, default=None, help='Number of posts, overrides the scale')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        size = DatasetSize.for_scale(options['scale'])
+        for field in ('users', 'authors', 'tags', 'posts'):
+            if options[field] is not None:
+                setattr(size, field, options[field])
+        size.authors = min(size.authors, size.users)
+
+        started = time.perf_counter()
+        counts = generate_dataset(size, options['seed'])
+        for name, count in counts.items():
+            self.stdout.write(f'Created {count} {name}')
+        self.stdout.write(f'Generated the dataset in {time.perf_counter() - started:.1f}s')
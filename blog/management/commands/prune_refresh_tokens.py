@@ -0,0 +1,28 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db.models import Q
+from django.utils import timezone
+from strawberry_django_jwt.refresh_token.utils import get_refresh_token_model
+from strawberry_django_jwt.settings import jwt_settings
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired and revoked refresh tokens in batches'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of tokens deleted per query')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        refresh_tokens = get_refresh_token_model().objects
+        expires = timezone.now() - jwt_settings.JWT_REFRESH_EXPIRATION_DELTA
+        prunable = refresh_tokens.filter(Q(revoked__isnull=False) | Q(created__lt=expires))
+
+        # small batches keep the table locks short
+        deleted = 0
+        while True:
+            token_ids = list(prunable.values_list('id', flat=True)[: options['batch_size']])
+            if not token_ids:
+                break
+            deleted += refresh_tokens.filter(id__in=token_ids).delete()[0]
+        self.stdout.write(f'Pruned {deleted} refresh tokens')
@@ -0,0 +1,15 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from blog.models import FeedItem, User
+
+
+class Command(BaseCommand):
+    help = 'Fixes the subscriber counts of the users and adds the latest posts of the authors to the feeds'
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        reconciled = User.reconcile_subscriber_counts()
+        authors = FeedItem.rebuild()
+        self.stdout.write(f'Reconciled the subscriber counts of {reconciled} users')
+        self.stdout.write(f'Rebuilt the feeds of the subscribers of {authors} authors')
@@ -0,0 +1,13 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from blog.models import PostSearchDocument
+
+
+class Command(BaseCommand):
+    help = 'Indexes all published posts for the post search from scratch'
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        indexed = PostSearchDocument.rebuild()
+        self.stdout.write(f'Indexed {indexed} posts')
@@ -0,0 +1,13 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Backfills the like and comment counters of all posts and fixes counters that drifted'
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        reconciled = Post.reconcile_counters()
+        self.stdout.write(f'Reconciled the counters of {reconciled} posts')
@@ -0,0 +1,64 @@
+import os
+from typing import Any, List
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from graphql import GraphQLError, OperationDefinitionNode, parse, validate
+
+from blog.api.persisted_queries import get_query_hash
+from blog.api.schema import schema
+from blog.models import PersistedQuery
+
+
+class Command(BaseCommand):
+    help = (
+        'Adds the queries of .graphql files to the allow-list of persisted queries, '
+        'a query is identified by the sha256 hash of its file content'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('paths', nargs='+', help='.graphql files or directories containing them')
+        parser.add_argument('--replace', action='store_true', help='Remove all queries that are not in the paths')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        hashes = []
+        for path in self.get_files(options['paths']):
+            with open(path) as file:
+                query = file.read()
+            try:
+                document = parse(query)
+            except GraphQLError as error:
+                raise CommandError(f'{path}: {error.message}')
+            errors = validate(schema._schema, document)
+            if errors:
+                raise CommandError(f'{path}: {errors[0].message}')
+
+            operation_names = [
+                definition.name.value
+                for definition in document.definitions
+                if isinstance(definition, OperationDefinitionNode) and definition.name
+            ]
+            query_hash = get_query_hash(query)
+            PersistedQuery.objects.update_or_create(
+                sha256_hash=query_hash,
+                defaults={'query': query, 'operation_name': ', '.join(operation_names)},
+            )
+            hashes.append(query_hash)
+
+        if options['replace']:
+            PersistedQuery.objects.exclude(sha256_hash__in=hashes).delete()
+        self.stdout.write(f'Registered {len(hashes)} persisted queries')
+
+    @staticmethod
+    def get_files(paths: List[str]) -> List[str]:
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend(
+                    os.path.join(root, name)
+                    for root, _, names in sorted(os.walk(path))
+                    for name in sorted(names)
+                    if name.endswith('.graphql')
+                )
+            else:
+                files.append(path)
+        return files
@@ -0,0 +1,23 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from blog.models import OutgoingEmail
+
+
+class Command(BaseCommand):
+    help = 'Sends the queued emails of the outbox in batches, retrying failed emails with an exponential backoff'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=None, help='Number of emails sent per smtp connection')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox instead of exiting')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls when looping')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        while True:
+            sent = OutgoingEmail.send_queued(options['batch_size'])
+            self.stdout.write(f'Sent {sent} queued emails')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,98 @@
+import dataclasses
+import typing
+from collections import defaultdict
+from threading import Lock
+
+from django.conf import settings
+from prometheus_client import Counter, Histogram
+
+# Totals of the graphql operations handled by this process, by operation name. Clients choose the operation
+# names, so operations beyond GRAPHQL_METRICS_MAX_OPERATIONS are counted as 'other'.
+# The same measurements are exported to prometheus at /metrics/, with PROMETHEUS_MULTIPROC_DIR set the
+# prometheus metrics are stored in files of that directory and aggregated across the worker processes.
+
+
+TOTALS = ('count', 'sql_queries', 'db_time', 'resolver_time', 'total_time', 'response_size')
+
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, 10000, float('inf'))
+
+operation_duration = Histogram(
+    'blog_graphql_operation_duration_seconds', 'Duration of the graphql operations', ['operation']
+)
+operation_db_duration = Histogram(
+    'blog_graphql_operation_db_duration_seconds', 'Database time of the graphql operations', ['operation']
+)
+operation_sql_queries = Histogram(
+    'blog_graphql_operation_sql_queries', 'Sql queries of the graphql operations', ['operation'], buckets=COUNT_BUCKETS
+)
+response_size_bytes = Histogram(
+    'blog_graphql_response_size_bytes',
+    'Size of the graphql responses',
+    ['operation'],
+    buckets=(100, 1000, 10000, 100000, 1000000, float('inf')),
+)
+cache_requests = Counter('blog_cache_requests', 'Cache lookups by cache and result (hit or miss)', ['cache', 'result'])
+notification_fanout_size = Histogram(
+    'blog_notification_fanout_size', 'Number of notifications created per published post', buckets=COUNT_BUCKETS
+)
+
+
+def count_cache_request(cache_name: str, hit: bool) -> None:
+    cache_requests.labels(cache=cache_name, result='hit' if hit else 'miss').inc()
+
+
+@dataclasses.dataclass
+class OperationStats:
+    operation_name: str
+    sql_queries: int = 0
+    # seconds
+    db_time: float = 0
+    resolver_time: float = 0
+    total_time: float = 0
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            'operationName': self.operation_name,
+            'sqlQueries': self.sql_queries,
+            'dbTimeMs': round(self.db_time * 1000, 3),
+            'resolverTimeMs': round(self.resolver_time * 1000, 3),
+            'totalTimeMs': round(self.total_time * 1000, 3),
+        }
+
+
+class OperationMetrics:
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.operations: typing.DefaultDict[str, typing.Dict[str, float]] = defaultdict(
+            lambda: dict.fromkeys(TOTALS, 0)
+        )
+
+    def record(self, stats: OperationStats, response_size: int) -> None:
+        with self.lock:
+            operation_name = stats.operation_name
+            is_full = len(self.operations) >= settings.GRAPHQL_METRICS_MAX_OPERATIONS
+            if operation_name not in self.operations and is_full:
+                operation_name = 'other'
+            totals = self.operations[operation_name]
+            totals['count'] += 1
+            totals['sql_queries'] += stats.sql_queries
+            totals['db_time'] += stats.db_time
+            totals['resolver_time'] += stats.resolver_time
+            totals['total_time'] += stats.total_time
+            totals['response_size'] += response_size
+
+        operation_duration.labels(operation=operation_name).observe(stats.total_time)
+        operation_db_duration.labels(operation=operation_name).observe(stats.db_time)
+        operation_sql_queries.labels(operation=operation_name).observe(stats.sql_queries)
+        response_size_bytes.labels(operation=operation_name).observe(response_size)
+
+    def snapshot(self) -> typing.Dict[str, typing.Dict[str, float]]:
+        with self.lock:
+            return {name: dict(totals) for name, totals in self.operations.items()}
+
+    def clear(self) -> None:
+        with self.lock:
+            self.operations.clear()
+
+
+operation_metrics = OperationMetrics()
@@ -1,6 +1,7 @@
+import time
 from datetime import datetime
 from http.client import HTTPResponse
-from typing import Callable, Union
+from typing import Callable, Optional, Union
 
 from django.conf import settings
 from django.contrib.auth import get_user
@@ -9,11 +10,14 @@ from django.core.handlers.wsgi import WSGIRequest
 from django.urls import reverse
 from django.utils.functional import SimpleLazyObject
 from strawberry_django_jwt.exceptions import JSONWebTokenError
+from strawberry_django_jwt.object_types import TokenPayloadType
 from strawberry_django_jwt.refresh_token.shortcuts import create_refresh_token
 from strawberry_django_jwt.settings import jwt_settings
-from strawberry_django_jwt.shortcuts import get_user_by_token, get_token
-from strawberry_django_jwt.utils import get_credentials, delete_cookie
+from strawberry_django_jwt.shortcuts import get_token
+from strawberry_django_jwt.utils import get_credentials, get_payload, delete_cookie
 
+from blog import principals
+from blog.api import tokens
 from blog.models import User
 
 
@@ -26,16 +30,28 @@ class JWTAuthenticationMiddleware:
         self.get_response = get_response
 
     def __call__(self, request: WSGIRequest) -> HTTPResponse:
+        request.is_header_token = False
         request.user = SimpleLazyObject(lambda: self.__class__.get_jwt_user(request))
         response = self.get_response(request)
 
         # flag set by deleteTokenCookie mutation
         delete_jwt_cookie = getattr(request, 'delete_jwt_cookie', False)
 
-        # ensure jwt cookie is set if user has logged in via admin
-        if request.user and request.user.is_authenticated and not delete_jwt_cookie:
-            token = get_token(request.user)
-            if token:
+        # the tokenAuth mutation sets its own cookies
+        has_jwt_cookie = jwt_settings.JWT_COOKIE_NAME in response.cookies
+
+        # ensure jwt cookie is set if user has logged in via admin, the cookie is about to expire
+        # or its claims are outdated (e.g. an author request has been accepted)
+        # clients sending the token in the authorization header don't use the cookies
+        is_cookie_request = request.user and request.user.is_authenticated and not request.is_header_token
+        if is_cookie_request and not delete_jwt_cookie and not has_jwt_cookie:
+            payload = self.__class__.get_cookie_payload(request)
+            is_cookie_user = payload is not None and (
+                jwt_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(payload) == request.user.get_username()
+            )
+            is_current_cookie = is_cookie_user and not self.__class__.expires_soon(payload)
+            if not is_current_cookie or tokens.claims_outdated(payload, request.user):
+                token = get_token(request.user)
                 expires = datetime.utcnow() + jwt_settings.JWT_EXPIRATION_DELTA
                 response.set_cookie(
                     jwt_settings.JWT_COOKIE_NAME,
@@ -45,16 +61,18 @@ class JWTAuthenticationMiddleware:
                     secure=jwt_settings.JWT_COOKIE_SECURE,
                 )
 
-                refresh_token = create_refresh_token(request.user)
-                expires = refresh_token.created + jwt_settings.JWT_REFRESH_EXPIRATION_DELTA
+                # the refresh token cookie stays valid, unless it is missing or belongs to another user
+                if not is_cookie_user or jwt_settings.JWT_REFRESH_TOKEN_COOKIE_NAME not in request.COOKIES:
+                    refresh_token = create_refresh_token(request.user)
+                    expires = refresh_token.created + jwt_settings.JWT_REFRESH_EXPIRATION_DELTA
 
-                response.set_cookie(
-                    jwt_settings.JWT_REFRESH_TOKEN_COOKIE_NAME,
-                    refresh_token.token,
-                    expires=expires,
-                    httponly=True,
-                    secure=jwt_settings.JWT_COOKIE_SECURE,
-                )
+                    response.set_cookie(
+                        jwt_settings.JWT_REFRESH_TOKEN_COOKIE_NAME,
+                        refresh_token.token,
+                        expires=expires,
+                        httponly=True,
+                        secure=jwt_settings.JWT_COOKIE_SECURE,
+                    )
 
         # ensure cookies are deleted
         # jwt cookie needs to be deleted if user has logged out via admin
@@ -65,6 +83,21 @@ class JWTAuthenticationMiddleware:
             delete_cookie(response, settings.SESSION_COOKIE_NAME)
         return response
 
+    @staticmethod
+    def get_cookie_payload(request: WSGIRequest) -> Optional[TokenPayloadType]:
+        token = request.COOKIES.get(jwt_settings.JWT_COOKIE_NAME)
+        if token is None:
+            return None
+        try:
+            return get_payload(token)
+        except JSONWebTokenError:
+            return None
+
+    @staticmethod
+    def expires_soon(payload: TokenPayloadType) -> bool:
+        expires = datetime.utcfromtimestamp(payload.exp)
+        return expires - datetime.utcnow() < settings.JWT_COOKIE_REISSUE_THRESHOLD
+
     @staticmethod
     def get_jwt_user(request: WSGIRequest, **kwargs) -> Union[User, AnonymousUser]:
         user = get_user(request)
@@ -73,9 +106,29 @@ class JWTAuthenticationMiddleware:
         token = get_credentials(request, **kwargs)
         try:
             if token is not None:
-                user = get_user_by_token(token, request)
+                payload = get_payload(token)
+                user = principals.get_cached_user(token) or JWTAuthenticationMiddleware.get_user_by_token(
+                    token, payload
+                )
                 if user is not None:
+                    request.is_header_token = token != request.COOKIES.get(jwt_settings.JWT_COOKIE_NAME)
+                    # permission checks trust the claims, unless they are outdated
+                    if not tokens.claims_outdated(payload, user):
+                        request.jwt_payload = payload
                     return user
         except JSONWebTokenError:
             pass
         return AnonymousUser()
+
+    @staticmethod
+    def get_user_by_token(token: str, payload: TokenPayloadType) -> Optional[User]:
+        username = jwt_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(payload)
+        if not username:
+            raise JSONWebTokenError('Invalid payload')
+        user = User.objects.select_related('user_status').filter(**{User.USERNAME_FIELD: username}).first()
+        if user is None:
+            return None
+        if not user.is_active:
+            raise JSONWebTokenError('User is disabled')
+        principals.cache_user(token, user, payload.exp - time.time())
+        return user
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    PostLike = apps.get_model('blog', 'PostLike')
+    Comment = apps.get_model('blog', 'Comment')
+
+    def count(model):
+        counts = model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(c=Count('id'))
+        return Coalesce(Subquery(counts.values('c')), 0)
+
+    Post.objects.update(like_count=count(PostLike), comment_count=count(Comment))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
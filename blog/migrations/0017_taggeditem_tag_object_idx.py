@@ -0,0 +1,27 @@
+# Generated by Django 4.1.1 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+# taggit's tagged items are filtered by tag and grouped by post when posts are filtered by tags,
+# the index covers these queries
+INDEX = models.Index(fields=['tag', 'content_type', 'object_id'], name='taggeditem_tag_object_idx')
+
+
+def add_index(apps, schema_editor):
+    schema_editor.add_index(apps.get_model('taggit', 'TaggedItem'), INDEX)
+
+
+def remove_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model('taggit', 'TaggedItem'), INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taggit', '0005_auto_20220424_2025'),
+        ('blog', '0016_postsearchdocument_postsearchterm'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def backfill_subscriber_counts(apps, schema_editor):
+    User = apps.get_model('blog', 'User')
+    Subscription = apps.get_model('blog', 'Subscription')
+
+    counts = Subscription.objects.filter(author=OuterRef('pk')).order_by().values('author').annotate(c=Count('id'))
+    User.objects.update(subscriber_count=Coalesce(Subquery(counts.values('c')), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_taggeditem_tag_object_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='subscriber_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_subscriber_counts, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='FeedItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_created', models.DateTimeField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_items', to='blog.post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'post')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feeditem',
+            index=models.Index(fields=['user', 'date_created', 'post'], name='feed_item_user_created_idx'),
+        ),
+    ]
@@ -1,31 +1,106 @@
+import typing
 from datetime import datetime
 
 from django.core.exceptions import ValidationError
 from django.utils.timezone import make_aware
 
 from django.contrib.auth import get_user_model
-from django.core.mail import EmailMessage
-from django.db import models
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, models, transaction
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import AbstractUser
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.template.loader import render_to_string
 from django.utils import timezone
 from taggit.managers import TaggableManager
+from taggit.models import TaggedItem
 from autoslug import AutoSlugField
 from django.conf import settings
+from blog import principals
 from blog.api.inputs import Status
+from blog.metrics import count_cache_request, notification_fanout_size
+from blog.recommendations import SimilarityIndex, most_similar, post_features
+from blog.search import B, K1, inverse_document_frequency, term_frequencies
+from blog.title_index import TitleEntry, TitleIndex
+from blog.tasks import on_commit_once, run_in_background, run_once_in_background
 from blog.utils import TokenAction, get_token, get_token_payload
 
 
-class User(AbstractUser):
+class CounterFieldsMixin:
+    """
+    Leaves the counters that are maintained with F() updates out of full saves of loaded objects, which would
+    write back the values they loaded and lose the increments in between
+    """
+
+    counter_fields: typing.Tuple[str, ...] = ()
+
+    def save(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        is_full_update = kwargs.get('update_fields') is None and not kwargs.get('force_insert')
+        if not self._state.adding and not args and is_full_update:
+            skipped_fields = set(self.counter_fields) | self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in skipped_fields and field.attname not in skipped_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+def decremented(field_name: str, amount: int) -> Case:
+    """
+    Counter less the amount but never below zero, since rows created elsewhere (admin, fixtures) didn't increment
+    it and the unsigned column can't hold, or on MySQL even compute, a negative value
+    """
+    return Case(
+        When(**{f'{field_name}__gte': amount}, then=F(field_name) - amount),
+        default=Value(0),
+        output_field=models.PositiveIntegerField(),
+    )
+
+
+class User(CounterFieldsMixin, AbstractUser):
     email = models.EmailField(unique=True, verbose_name='email address')
     avatar = models.ImageField(upload_to='avatars', null=True)
+    # maintained by the subscription mutations, decides whether the posts of the user are written to the feeds
+    subscriber_count = models.PositiveIntegerField(default=0)
+    counter_fields = ('subscriber_count',)
 
     @property
     def image_url(self) -> str:
         if self.avatar and hasattr(self.avatar, 'url'):
             return self.avatar.url
 
+    @staticmethod
+    def reconcile_subscriber_counts() -> int:
+        counts = Subscription.objects.filter(author=OuterRef('pk')).order_by().values('author').annotate(c=Count('id'))
+        subscriber_count = Coalesce(Subquery(counts.values('c')), 0)
+        drifted_user_ids = list(
+            User.objects.annotate(actual_subscriber_count=subscriber_count)
+            .filter(~Q(subscriber_count=F('actual_subscriber_count')))
+            .values_list('id', flat=True)
+        )
+        if drifted_user_ids:
+            User.objects.filter(id__in=drifted_user_ids).update(subscriber_count=subscriber_count)
+        return len(drifted_user_ids)
+
 
 class UserProfile(models.Model):
     class Language(models.TextChoices):
@@ -39,6 +114,95 @@ class UserProfile(models.Model):
     language = models.CharField(max_length=20, choices=Language.choices, default=Language.EN)
 
 
+class OutgoingEmail(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'PENDING'
+        SENT = 'SENT'
+        FAILED = 'FAILED'
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    to_email = models.EmailField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_sent = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'], name='outgoing_email_due_idx')]
+
+    def __str__(self) -> str:
+        return f'{self.to_email} - {self.subject}'
+
+    @staticmethod
+    def enqueue(subject: str, body: str, to_email: str) -> 'OutgoingEmail':
+        email = OutgoingEmail.objects.create(subject=subject, body=body, to_email=to_email)
+        if settings.EMAIL_OUTBOX_SEND_ON_COMMIT:
+            run_in_background(OutgoingEmail.send_queued)
+        return email
+
+    @staticmethod
+    def claim_batch(batch_size: int) -> typing.List['OutgoingEmail']:
+        # claimed emails are leased, so that concurrent workers skip them and a crashed worker's batch is retried
+        now = timezone.now()
+        skip_locked = connection.features.has_select_for_update_skip_locked
+        with transaction.atomic():
+            emails = list(
+                OutgoingEmail.objects.select_for_update(skip_locked=skip_locked)
+                .filter(status=OutgoingEmail.Status.PENDING, next_attempt_at__lte=now)
+                .order_by('next_attempt_at', 'id')[:batch_size]
+            )
+            OutgoingEmail.objects.filter(id__in=[email.id for email in emails]).update(
+                next_attempt_at=now + settings.EMAIL_OUTBOX_LEASE
+            )
+        return emails
+
+    def to_message(self) -> EmailMessage:
+        message = EmailMessage(subject=self.subject, body=self.body, from_email=settings.EMAIL_FROM, to=[self.to_email])
+        message.content_subtype = 'html'
+        return message
+
+    def mark_sent(self) -> None:
+        self.status = OutgoingEmail.Status.SENT
+        self.attempts += 1
+        self.date_sent = timezone.now()
+        self.last_error = ''
+        self.save(update_fields=['status', 'attempts', 'date_sent', 'last_error'])
+
+    def mark_failed(self, error: Exception) -> None:
+        self.attempts += 1
+        self.last_error = repr(error)
+        if self.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            self.status = OutgoingEmail.Status.FAILED
+        else:
+            # exponential backoff: 1, 2, 4, ... times the retry delay
+            self.next_attempt_at = timezone.now() + settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (self.attempts - 1)
+        self.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at'])
+
+    @staticmethod
+    def send_queued(batch_size: typing.Optional[int] = None) -> int:
+        sent = 0
+        batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        emails = OutgoingEmail.claim_batch(batch_size)
+        while emails:
+            # one smtp connection for the whole batch
+            with get_connection() as mail_connection:
+                for email in emails:
+                    try:
+                        mail_connection.send_messages([email.to_message()])
+                    except Exception as e:
+                        email.mark_failed(e)
+                        # reconnect for the next email in case the connection broke
+                        mail_connection.close()
+                    else:
+                        email.mark_sent()
+                        sent += 1
+            emails = OutgoingEmail.claim_batch(batch_size)
+        return sent
+
+
 class UserStatus(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='user_status')
     verified = models.BooleanField(default=False)
@@ -53,14 +217,11 @@ class UserStatus(models.Model):
         html_message = render_to_string(template_path, email_context)
         subject = render_to_string(subject_path, email_context)
 
-        mail = EmailMessage(
+        OutgoingEmail.enqueue(
             subject=subject,
             body=html_message,
-            from_email=settings.EMAIL_FROM,
-            to=[getattr(self.user, get_user_model().EMAIL_FIELD)],
+            to_email=getattr(self.user, get_user_model().EMAIL_FIELD),
         )
-        mail.content_subtype = 'html'
-        mail.send()
 
     def get_email_context(self, url_path: str, action: TokenAction, **kwargs) -> object:
         token = get_token(self.user, action, **kwargs)
@@ -133,6 +294,15 @@ class AuthorRequest(models.Model):
 post_save.connect(AuthorRequest.post_save, AuthorRequest, dispatch_uid='blog.models.AuthorRequest.post_save')
 
 
+def invalidate_cached_user(instance: typing.Union[User, UserStatus], **kwargs) -> None:
+    principals.invalidate_user(instance.pk if isinstance(instance, User) else instance.user_id)
+
+
+post_save.connect(invalidate_cached_user, User, dispatch_uid='blog.models.User.invalidate_cached_user')
+post_delete.connect(invalidate_cached_user, User, dispatch_uid='blog.models.User.invalidate_cached_user')
+post_save.connect(invalidate_cached_user, UserStatus, dispatch_uid='blog.models.UserStatus.invalidate_cached_user')
+
+
 def slugify(string: str) -> str:
     return string.replace(' ', '-').lower()
 
@@ -162,7 +332,7 @@ class Category(models.Model):
         return self.name
 
 
-class Post(models.Model):
+class Post(CounterFieldsMixin, models.Model):
     class PostStatus(models.TextChoices):
         PUBLISHED = 'PUBLISHED'
         DRAFT = 'DRAFT'
@@ -183,6 +353,15 @@ class Post(models.Model):
     date_updated = models.DateTimeField(auto_now=True, null=True)
     status = models.CharField(max_length=20, choices=PostStatus.choices, default=PostStatus.DRAFT)
     tags = TaggableManager(blank=True)
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    counter_fields = ('like_count', 'comment_count')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'date_created', 'id'], name='post_status_created_idx'),
+            models.Index(fields=['owner', 'date_created', 'id'], name='post_owner_created_idx'),
+        ]
 
     @property
     def image_url(self) -> str:
@@ -192,6 +371,48 @@ class Post(models.Model):
     def __str__(self) -> str:
         return self.title
 
+    @staticmethod
+    def reconcile_counters() -> int:
+        def count(queryset: models.QuerySet) -> Coalesce:
+            counts = queryset.filter(post=OuterRef('pk')).order_by().values('post').annotate(c=Count('id'))
+            return Coalesce(Subquery(counts.values('c')), 0)
+
+        like_count = count(PostLike.objects.all())
+        comment_count = count(Comment.objects.all())
+        drifted_post_ids = list(
+            Post.objects.annotate(actual_like_count=like_count, actual_comment_count=comment_count)
+            .filter(~Q(like_count=F('actual_like_count')) | ~Q(comment_count=F('actual_comment_count')))
+            .values_list('id', flat=True)
+        )
+        if drifted_post_ids:
+            Post.objects.filter(id__in=drifted_post_ids).update(like_count=like_count, comment_count=comment_count)
+        return len(drifted_post_ids)
+
+
+def load_title_entries() -> typing.Iterable[TitleEntry]:
+    for post_id, title, slug, owner_id, status in Post.objects.values_list('id', 'title', 'slug', 'owner_id', 'status'):
+        yield TitleEntry(post_id, title, slug, owner_id, status == Post.PostStatus.PUBLISHED)
+
+
+title_index = TitleIndex(load_title_entries)
+
+
+def update_title_index(instance: Post, **kwargs) -> None:
+    entry = TitleEntry(
+        instance.pk, instance.title, instance.slug, instance.owner_id, instance.status == Post.PostStatus.PUBLISHED
+    )
+    transaction.on_commit(lambda: title_index.update(entry))
+
+
+def remove_from_title_index(instance: Post, **kwargs) -> None:
+    # the primary key of the instance is cleared after the delete
+    post_id = instance.pk
+    transaction.on_commit(lambda: title_index.remove(post_id))
+
+
+post_save.connect(update_title_index, Post, dispatch_uid='blog.models.Post.update_title_index')
+post_delete.connect(remove_from_title_index, Post, dispatch_uid='blog.models.Post.remove_from_title_index')
+
 
 class PostRelation(models.Model):
     main_post = models.ForeignKey('blog.Post', related_name='related_main_posts', on_delete=models.CASCADE)
@@ -226,6 +447,147 @@ class Notification(models.Model):
     class Meta:
         unique_together = ('post', 'user')
 
+    @staticmethod
+    def fan_out(post_id: int, author_id: int) -> None:
+        chunk_size = settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+        subscriptions = Subscription.objects.filter(author_id=author_id).order_by('id')
+        last_id = 0
+        fanout_size = 0
+        while True:
+            chunk = list(subscriptions.filter(id__gt=last_id).values_list('id', 'subscriber_id')[:chunk_size])
+            if not chunk:
+                break
+            Notification.objects.bulk_create(
+                [Notification(post_id=post_id, user_id=subscriber_id) for _, subscriber_id in chunk],
+                ignore_conflicts=True,
+            )
+            last_id = chunk[-1][0]
+            fanout_size += len(chunk)
+        notification_fanout_size.observe(fanout_size)
+
+    @staticmethod
+    def notify_subscribers(post: 'Post') -> None:
+        subscriber_count = Subscription.objects.filter(author_id=post.owner_id).count()
+        if subscriber_count > settings.NOTIFICATION_FANOUT_BACKGROUND_THRESHOLD:
+            run_in_background(Notification.fan_out, post.id, post.owner_id)
+        elif subscriber_count:
+            Notification.fan_out(post.id, post.owner_id)
+
+
+class FeedItem(models.Model):
+    """
+    Published post in the home feed of a subscriber of its author. The posts of authors with more than
+    FEED_FANOUT_MAX_SUBSCRIBERS subscribers are not written to the feeds, they are merged in when a feed is read.
+    """
+
+    user = models.ForeignKey('blog.User', related_name='feed_items', on_delete=models.CASCADE)
+    post = models.ForeignKey('blog.Post', related_name='feed_items', on_delete=models.CASCADE)
+    # copied from the post, so that a page of the feed is read from the index
+    date_created = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [models.Index(fields=['user', 'date_created', 'post'], name='feed_item_user_created_idx')]
+
+    @staticmethod
+    def is_fanned_out(subscriber_count: int) -> bool:
+        return 0 < subscriber_count <= settings.FEED_FANOUT_MAX_SUBSCRIBERS
+
+    @staticmethod
+    def latest_posts(author_id: int) -> typing.List[typing.Tuple[int, datetime]]:
+        posts = Post.objects.filter(owner_id=author_id, status=Post.PostStatus.PUBLISHED)
+        posts = posts.order_by('-date_created', '-id').values_list('id', 'date_created')
+        return list(posts[: settings.FEED_BACKFILL_SIZE])
+
+    @staticmethod
+    def fan_out(author_id: int, posts: typing.List[typing.Tuple[int, datetime]]) -> None:
+        # uses the chunk size of the notifications, both are written once per subscriber
+        chunk_size = settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+        subscriptions = Subscription.objects.filter(author_id=author_id).order_by('id')
+        last_id = 0
+        while True:
+            chunk = list(subscriptions.filter(id__gt=last_id).values_list('id', 'subscriber_id')[:chunk_size])
+            if not chunk:
+                break
+            FeedItem.objects.bulk_create(
+                [
+                    FeedItem(user_id=subscriber_id, post_id=post_id, date_created=date_created)
+                    for _, subscriber_id in chunk
+                    for post_id, date_created in posts
+                ],
+                ignore_conflicts=True,
+            )
+            last_id = chunk[-1][0]
+
+    @staticmethod
+    def publish(post: 'Post') -> None:
+        subscriber_count = User.objects.filter(pk=post.owner_id).values_list('subscriber_count', flat=True).first()
+        if not FeedItem.is_fanned_out(subscriber_count or 0):
+            return
+        posts = [(post.id, post.date_created)]
+        if subscriber_count > settings.NOTIFICATION_FANOUT_BACKGROUND_THRESHOLD:
+            run_in_background(FeedItem.fan_out, post.owner_id, posts)
+        else:
+            FeedItem.fan_out(post.owner_id, posts)
+
+    @staticmethod
+    def backfill(user_id: int, author_id: int) -> None:
+        """
+        Adds the latest posts of the author to the feed of a new subscriber
+        """
+        subscriber_count = User.objects.filter(pk=author_id).values_list('subscriber_count', flat=True).first()
+        if not FeedItem.is_fanned_out(subscriber_count or 0):
+            return
+        FeedItem.objects.bulk_create(
+            [
+                FeedItem(user_id=user_id, post_id=post_id, date_created=date_created)
+                for post_id, date_created in FeedItem.latest_posts(author_id)
+            ],
+            ignore_conflicts=True,
+        )
+
+    @staticmethod
+    def rebuild() -> int:
+        """
+        Adds the latest posts of all authors to the feeds of their subscribers, returns the number of authors
+        """
+        authors = User.objects.filter(
+            subscriber_count__gt=0, subscriber_count__lte=settings.FEED_FANOUT_MAX_SUBSCRIBERS
+        )
+        author_ids = list(authors.order_by('id').values_list('id', flat=True))
+        for author_id in author_ids:
+            FeedItem.fan_out(author_id, FeedItem.latest_posts(author_id))
+        return len(author_ids)
+
+    @staticmethod
+    def newest_posts(
+        user_id: int, limit: int, cursor: typing.Optional[typing.Tuple[datetime, int]] = None
+    ) -> typing.List[typing.Tuple[datetime, int]]:
+        """
+        (date created, id) of the newest published posts in the feed of the user older than the cursor, newest first
+        """
+        timeline = FeedItem.objects.filter(user_id=user_id, post__status=Post.PostStatus.PUBLISHED)
+        if cursor is not None:
+            date_created, pk = cursor
+            timeline = timeline.filter(Q(date_created__lt=date_created) | Q(date_created=date_created, post_id__lt=pk))
+        keys = list(timeline.order_by('-date_created', '-post_id').values_list('date_created', 'post_id')[:limit])
+
+        # fan-out on read for the authors with too many subscribers to write their posts to the feeds
+        author_ids = list(
+            Subscription.objects.filter(
+                subscriber_id=user_id, author__subscriber_count__gt=settings.FEED_FANOUT_MAX_SUBSCRIBERS
+            ).values_list('author_id', flat=True)
+        )
+        if author_ids:
+            posts = Post.objects.filter(owner_id__in=author_ids, status=Post.PostStatus.PUBLISHED)
+            if cursor is not None:
+                date_created, pk = cursor
+                posts = posts.filter(Q(date_created__lt=date_created) | Q(date_created=date_created, id__lt=pk))
+            keys += posts.order_by('-date_created', '-id').values_list('date_created', 'id')[:limit]
+
+        # posts written to the feed before their author passed the threshold are found twice
+        return sorted(set(keys), reverse=True)[:limit]
+
 
 class Comment(models.Model):
     title = models.CharField(max_length=200)
@@ -245,3 +607,307 @@ class PostLike(models.Model):
 
     class Meta:
         unique_together = ('post', 'user')
+
+
+class PersistedQuery(models.Model):
+    """
+    Allow-listed graphql query, that clients can send by the sha256 hash of its text
+    """
+
+    sha256_hash = models.CharField(max_length=64, primary_key=True)
+    query = models.TextField()
+    operation_name = models.CharField(max_length=200, blank=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.operation_name or self.sha256_hash
+
+
+SEARCH_STATISTICS_CACHE_KEY = 'blog:search:statistics'
+
+
+class PostSearchDocument(models.Model):
+    """
+    Published post in the search index, its length is the sum of the weighted frequencies of its terms
+    """
+
+    post = models.OneToOneField('blog.Post', primary_key=True, related_name='search_document', on_delete=models.CASCADE)
+    length = models.PositiveIntegerField()
+
+    @staticmethod
+    def index(post_id: int) -> None:
+        """
+        Brings the index entries of the post up to date, only the terms that changed are written
+        """
+        with transaction.atomic():
+            # locking the post serializes concurrent updates of its entries
+            post = (
+                Post.objects.select_for_update()
+                .filter(pk=post_id, status=Post.PostStatus.PUBLISHED)
+                .only('id', 'title', 'text')
+                .first()
+            )
+            frequencies = term_frequencies(post.title, post.text, post.tags.names()) if post is not None else {}
+            document = PostSearchDocument.objects.filter(post_id=post_id).first()
+            if not frequencies:
+                if document is not None:
+                    document.delete()
+                    cache.delete(SEARCH_STATISTICS_CACHE_KEY)
+                return
+
+            length = sum(frequencies.values())
+            existing_terms = {}
+            if document is None:
+                document = PostSearchDocument.objects.create(post_id=post_id, length=length)
+                cache.delete(SEARCH_STATISTICS_CACHE_KEY)
+            else:
+                if document.length != length:
+                    document.length = length
+                    document.save(update_fields=['length'])
+                    cache.delete(SEARCH_STATISTICS_CACHE_KEY)
+                existing_terms = {term.term: term for term in document.terms.all()}
+
+            removed_terms = [term for term in existing_terms if term not in frequencies]
+            if removed_terms:
+                PostSearchTerm.objects.filter(document=document, term__in=removed_terms).delete()
+            changed_terms = []
+            for term, frequency in frequencies.items():
+                if term in existing_terms and existing_terms[term].frequency != frequency:
+                    existing_terms[term].frequency = frequency
+                    changed_terms.append(existing_terms[term])
+            PostSearchTerm.objects.bulk_update(changed_terms, ['frequency'])
+            PostSearchTerm.objects.bulk_create(
+                [
+                    PostSearchTerm(document=document, term=term, frequency=frequency)
+                    for term, frequency in frequencies.items()
+                    if term not in existing_terms
+                ]
+            )
+
+    @staticmethod
+    def rebuild(batch_size: int = 500) -> int:
+        """
+        Indexes all published posts from scratch, e.g. after posts have been imported without signals
+        """
+        PostSearchTerm.objects.all().delete()
+        PostSearchDocument.objects.all().delete()
+        posts = (
+            Post.objects.filter(status=Post.PostStatus.PUBLISHED)
+            .only('id', 'title', 'text')
+            .prefetch_related('tags')
+            .order_by('id')
+        )
+        indexed = 0
+        last_id = 0
+        while True:
+            chunk = list(posts.filter(id__gt=last_id)[:batch_size])
+            if not chunk:
+                break
+            documents = []
+            terms = []
+            for post in chunk:
+                frequencies = term_frequencies(post.title, post.text, [tag.name for tag in post.tags.all()])
+                if frequencies:
+                    documents.append(PostSearchDocument(post_id=post.id, length=sum(frequencies.values())))
+                    terms.extend(
+                        PostSearchTerm(document_id=post.id, term=term, frequency=frequency)
+                        for term, frequency in frequencies.items()
+                    )
+            PostSearchDocument.objects.bulk_create(documents)
+            PostSearchTerm.objects.bulk_create(terms, batch_size=1000)
+            indexed += len(documents)
+            last_id = chunk[-1].id
+        cache.delete(SEARCH_STATISTICS_CACHE_KEY)
+        return indexed
+
+    @staticmethod
+    def statistics() -> typing.Tuple[int, float]:
+        """
+        Number and average length of the indexed posts
+        """
+        statistics = cache.get(SEARCH_STATISTICS_CACHE_KEY)
+        count_cache_request('search_statistics', statistics is not None)
+        if statistics is None:
+            aggregate = PostSearchDocument.objects.aggregate(documents=Count('pk'), average_length=Avg('length'))
+            statistics = (aggregate['documents'], aggregate['average_length'] or 0)
+            cache.set(SEARCH_STATISTICS_CACHE_KEY, statistics, settings.SEARCH_STATISTICS_TIMEOUT)
+        return statistics
+
+    @staticmethod
+    def search(terms: typing.List[str], posts: models.QuerySet) -> models.QuerySet:
+        """
+        Ids (document_id) and BM25 scores of the posts that contain any of the terms, best matches first
+        """
+        term_documents = dict(
+            PostSearchTerm.objects.filter(term__in=terms)
+            .values('term')
+            .annotate(documents=Count('document'))
+            .values_list('term', 'documents')
+        )
+        documents, average_length = PostSearchDocument.statistics() if term_documents else (0, 0)
+        weight = Case(
+            *[
+                When(term=term, then=Value(inverse_document_frequency(documents, count)))
+                for term, count in term_documents.items()
+            ],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+        # term frequency saturated by K1 and normalized by the length of the post relative to the average
+        normalization = F('frequency') + K1 * (1 - B) + K1 * B / max(average_length, 1) * F('document__length')
+        saturation = ExpressionWrapper(F('frequency') * (K1 + 1) / normalization, output_field=FloatField())
+        return (
+            PostSearchTerm.objects.filter(term__in=list(term_documents), document_id__in=posts.values('id'))
+            .values('document_id')
+            .annotate(score=Sum(weight * saturation, output_field=FloatField()))
+            .order_by('-score', '-document_id')
+        )
+
+
+class PostSearchTerm(models.Model):
+    """
+    Entry of the inverted index: weighted number of occurrences of a term in a post
+    """
+
+    term = models.CharField(max_length=64)
+    document = models.ForeignKey('blog.PostSearchDocument', related_name='terms', on_delete=models.CASCADE)
+    frequency = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ('term', 'document')
+
+
+def index_post(instance: Post, raw: bool = False, **kwargs) -> None:
+    # posts loaded from fixtures are indexed by the rebuild_search_index command
+    if not raw:
+        run_once_in_background(PostSearchDocument.index, instance.pk)
+
+
+def index_tagged_post(instance: object, action: str, **kwargs) -> None:
+    if isinstance(instance, Post) and action in ('post_add', 'post_remove', 'post_clear'):
+        run_once_in_background(PostSearchDocument.index, instance.pk)
+
+
+post_save.connect(index_post, Post, dispatch_uid='blog.models.Post.index_post')
+m2m_changed.connect(index_tagged_post, TaggedItem, dispatch_uid='blog.models.Post.index_tagged_post')
+
+
+class PostRecommendation(models.Model):
+    """
+    Published post recommended on another one by the similarity of their tags, categories and titles, computed by
+    the compute_recommendations command
+    """
+
+    post = models.ForeignKey('blog.Post', related_name='recommendations', on_delete=models.CASCADE)
+    # kept when the post is deleted, so that the posts recommending it are found and recomputed
+    recommended_post = models.ForeignKey(
+        'blog.Post', related_name='+', on_delete=models.DO_NOTHING, db_constraint=False
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('post', 'rank')
+
+    @staticmethod
+    def similarity_index() -> SimilarityIndex:
+        tag_ids = {}
+        tagged_items = TaggedItem.objects.filter(content_type=ContentType.objects.get_for_model(Post))
+        for post_id, tag_id in tagged_items.values_list('object_id', 'tag_id'):
+            tag_ids.setdefault(post_id, []).append(tag_id)
+        posts = Post.objects.filter(status=Post.PostStatus.PUBLISHED).values_list('id', 'title', 'category_id')
+        return SimilarityIndex(
+            {
+                post_id: post_features(title, category_id, tag_ids.get(post_id, []))
+                for post_id, title, category_id in posts
+            }
+        )
+
+    @staticmethod
+    def affected_post_ids(index: SimilarityIndex, changed_post_ids: typing.Set[int]) -> typing.Set[int]:
+        """
+        The changed posts and the posts whose recommendations they enter or leave
+        """
+        post_ids = set(changed_post_ids)
+        recommending = PostRecommendation.objects.filter(recommended_post_id__in=changed_post_ids)
+        post_ids.update(recommending.values_list('post_id', flat=True))
+        # posts with all places taken only change if a changed post scores above their last recommendation
+        lowest_scores = dict(
+            PostRecommendation.objects.values('post_id')
+            .annotate(recommendation_count=Count('id'), lowest_score=Min('score'))
+            .filter(recommendation_count__gte=settings.RECOMMENDATIONS_PER_POST)
+            .values_list('post_id', 'lowest_score')
+        )
+        for changed_post_id in changed_post_ids:
+            for post_id, score in index.scores(changed_post_id).items():
+                if score > lowest_scores.get(post_id, 0):
+                    post_ids.add(post_id)
+        return post_ids
+
+    @staticmethod
+    def save_recommendations(index: SimilarityIndex, post_ids: typing.List[int]) -> None:
+        recommendations = [
+            PostRecommendation(post_id=post_id, recommended_post_id=recommended_post_id, rank=rank, score=score)
+            for post_id in post_ids
+            for rank, (recommended_post_id, score) in enumerate(
+                most_similar(index.scores(post_id), settings.RECOMMENDATIONS_PER_POST)
+            )
+        ]
+        with transaction.atomic():
+            PostRecommendation.objects.filter(post_id__in=post_ids).delete()
+            PostRecommendation.objects.bulk_create(recommendations)
+
+    @staticmethod
+    def compute(full: bool = False, batch_size: int = 500) -> int:
+        """
+        Recomputes the recommendations of the changed posts and of the posts they affect, or of all posts,
+        returns the number of posts
+        """
+        # changes during the computation stay pending for the next run
+        last_pending_id = PendingRecommendation.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        pending = PendingRecommendation.objects.filter(id__lte=last_pending_id)
+        index = PostRecommendation.similarity_index()
+        if full:
+            # and the posts that have been unpublished or deleted
+            post_ids = set(index.vectors) | set(PostRecommendation.objects.values_list('post_id', flat=True))
+        else:
+            post_ids = PostRecommendation.affected_post_ids(index, set(pending.values_list('post_id', flat=True)))
+        post_ids = sorted(post_ids)
+        for start in range(0, len(post_ids), batch_size):
+            PostRecommendation.save_recommendations(index, post_ids[start:start + batch_size])
+        pending.delete()
+        return len(post_ids)
+
+
+class PendingRecommendation(models.Model):
+    """
+    Change of a post that the next run of compute_recommendations applies to the recommendations
+    """
+
+    # kept when the post is deleted, so that it is removed from the recommendations of other posts
+    post = models.ForeignKey('blog.Post', related_name='+', on_delete=models.DO_NOTHING, db_constraint=False)
+
+    @staticmethod
+    def add(post_id: int) -> None:
+        PendingRecommendation.objects.create(post_id=post_id)
+
+
+def recommend_post(instance: Post, raw: bool = False, **kwargs) -> None:
+    # posts loaded from fixtures are picked up by compute_recommendations --full, other posts are marked once per
+    # transaction, as they are usually saved and tagged in the same request
+    if not raw:
+        on_commit_once(PendingRecommendation.add, instance.pk)
+
+
+def recommend_tagged_post(instance: object, action: str, **kwargs) -> None:
+    if isinstance(instance, Post) and action in ('post_add', 'post_remove', 'post_clear'):
+        on_commit_once(PendingRecommendation.add, instance.pk)
+
+
+def remove_from_recommendations(instance: Post, **kwargs) -> None:
+    on_commit_once(PendingRecommendation.add, instance.pk)
+
+
+post_save.connect(recommend_post, Post, dispatch_uid='blog.models.Post.recommend_post')
+m2m_changed.connect(recommend_tagged_post, TaggedItem, dispatch_uid='blog.models.Post.recommend_tagged_post')
+post_delete.connect(remove_from_recommendations, Post, dispatch_uid='blog.models.Post.remove_from_recommendations')
@@ -0,0 +1,48 @@
+import hashlib
+import typing
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from blog.metrics import count_cache_request
+
+# Authenticated users are cached by token, so requests don't need to load the user (and its status) from the database.
+# Every user has a version that is changed whenever the user or its status is saved, which invalidates all its entries.
+
+
+def token_key(token: str) -> str:
+    return f'principal:{hashlib.sha256(token.encode()).hexdigest()}'
+
+
+def version_key(user_id: int) -> str:
+    return f'principal-version:{user_id}'
+
+
+def get_version(user_id: int) -> str:
+    version = cache.get(version_key(user_id))
+    if version is None:
+        cache.add(version_key(user_id), uuid4().hex, None)
+        version = cache.get(version_key(user_id))
+    return version
+
+
+def get_cached_user(token: str) -> typing.Optional[typing.Any]:
+    if settings.PRINCIPAL_CACHE_TIMEOUT <= 0:
+        return None
+    user = None
+    entry = cache.get(token_key(token))
+    if entry is not None and cache.get(version_key(entry[0].id)) == entry[1]:
+        user = entry[0]
+    count_cache_request('principal', user is not None)
+    return user
+
+
+def cache_user(token: str, user: typing.Any, expires_in: float) -> None:
+    timeout = min(settings.PRINCIPAL_CACHE_TIMEOUT, expires_in)
+    if timeout > 0:
+        cache.set(token_key(token), (user, get_version(user.id)), timeout)
+
+
+def invalidate_user(user_id: int) -> None:
+    cache.set(version_key(user_id), uuid4().hex, None)
@@ -0,0 +1,65 @@
+import heapq
+import math
+import typing
+from collections import Counter, defaultdict
+
+from blog.search import tokenize
+
+# Similarity of posts for recommendations. A post is a sparse vector of its tags, its category and its title terms,
+# weighted by tf-idf, so that rare tags and terms count more than common ones, and posts are compared by the cosine
+# of their vectors. The similarities of a post to all others are one row of the product of the post matrix with its
+# transpose, summed up over an inverted index of the features, which only visits the posts sharing a feature.
+
+FEATURE_WEIGHTS = {'tag': 1.0, 'category': 0.5, 'term': 0.75}
+# features on more posts hardly tell posts apart, but make the scoring quadratic
+MAX_FEATURE_POSTS = 2000
+
+
+def post_features(title: str, category_id: int, tag_ids: typing.Iterable[int]) -> typing.Dict[str, float]:
+    features = {f'category:{category_id}': FEATURE_WEIGHTS['category']}
+    for tag_id in tag_ids:
+        features[f'tag:{tag_id}'] = FEATURE_WEIGHTS['tag']
+    for term in tokenize(title):
+        features[f'term:{term}'] = FEATURE_WEIGHTS['term']
+    return features
+
+
+class SimilarityIndex:
+    """
+    Normalized tf-idf vectors of posts and the posts of each feature
+    """
+
+    def __init__(self, features: typing.Dict[int, typing.Dict[str, float]]) -> None:
+        document_frequencies = Counter(feature for post_features in features.values() for feature in post_features)
+        self.vectors: typing.Dict[int, typing.Dict[str, float]] = {}
+        self.postings: typing.Dict[str, typing.List[typing.Tuple[int, float]]] = defaultdict(list)
+        for post_id, weights in features.items():
+            # never zero, unlike log(n / df) for features on all posts
+            vector = {
+                feature: weight * math.log(1 + len(features) / document_frequencies[feature])
+                for feature, weight in weights.items()
+            }
+            norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+            vector = {feature: weight / norm for feature, weight in vector.items()}
+            self.vectors[post_id] = vector
+            for feature, weight in vector.items():
+                self.postings[feature].append((post_id, weight))
+
+    def scores(self, post_id: int) -> typing.Dict[int, float]:
+        """
+        Cosine similarity of the post to each post sharing a feature with it
+        """
+        scores = defaultdict(float)
+        for feature, weight in self.vectors.get(post_id, {}).items():
+            postings = self.postings[feature]
+            if len(postings) > MAX_FEATURE_POSTS:
+                continue
+            for other_id, other_weight in postings:
+                scores[other_id] += weight * other_weight
+        scores.pop(post_id, None)
+        return scores
+
+
+def most_similar(scores: typing.Dict[int, float], k: int) -> typing.List[typing.Tuple[int, float]]:
+    # ties go to the newer post
+    return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], item[0]))
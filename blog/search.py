@@ -0,0 +1,79 @@
+import math
+import re
+import typing
+from collections import Counter
+
+# Text analysis of the post search index. Posts are split into lowercase terms, a term counts more often
+# in the title and the tag names than in the text, and the posts matching a query are ranked with BM25.
+
+TERM_PATTERN = re.compile(r'\w+')
+MAX_TERM_LENGTH = 64
+# terms beyond this number are ignored in queries
+MAX_QUERY_TERMS = 10
+
+STOP_WORDS = frozenset(
+    (
+        'a an and are as at be but by for from has have he her his i if in into is it its me my no not of on or our '
+        'she so than that the their them then there these they this to was we were what when which who will with '
+        'you your'
+    ).split()
+)
+
+FIELD_WEIGHTS = {'title': 3, 'tags': 2, 'text': 1}
+
+# BM25 term frequency saturation and document length normalization
+K1 = 1.2
+B = 0.75
+
+SNIPPET_LENGTH = 200
+
+
+def tokenize(text: str) -> typing.List[str]:
+    return [
+        term[:MAX_TERM_LENGTH]
+        for term in TERM_PATTERN.findall(text.lower())
+        if len(term) > 1 and term not in STOP_WORDS
+    ]
+
+
+def query_terms(query: str) -> typing.List[str]:
+    # distinct terms in the order of the query
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def term_frequencies(title: str, text: str, tag_names: typing.Iterable[str]) -> typing.Dict[str, int]:
+    """
+    Weighted number of occurrences of each term of a post
+    """
+    frequencies = Counter()
+    fields = {'title': title, 'tags': ' '.join(tag_names), 'text': text}
+    for field, value in fields.items():
+        for term in tokenize(value):
+            frequencies[term] += FIELD_WEIGHTS[field]
+    return dict(frequencies)
+
+
+def inverse_document_frequency(documents: int, term_documents: int) -> float:
+    # never negative, unlike the original BM25 idf for terms in more than half of the documents
+    return math.log(1 + (documents - term_documents + 0.5) / (term_documents + 0.5))
+
+
+def snippet(text: str, terms: typing.Iterable[str], length: int = SNIPPET_LENGTH) -> str:
+    """
+    Part of the text around the first occurrence of a term, cut at whitespace
+    """
+    terms = set(terms)
+    start = 0
+    for match in TERM_PATTERN.finditer(text):
+        if match.group().lower()[:MAX_TERM_LENGTH] in terms:
+            # show some words in front of the match
+            start = max(0, match.start() - length // 4)
+            break
+    if start > 0:
+        start = text.find(' ', start) + 1 or start
+    end = start + length
+    if end < len(text):
+        space = text.rfind(' ', start, end)
+        end = space if space > start else end
+    fragment = text[start:end].strip()
+    return f'{"…" if start > 0 else ""}{fragment}{"…" if end < len(text) else ""}'
@@ -0,0 +1,73 @@
+import logging
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(max_workers=settings.BACKGROUND_TASK_WORKERS, thread_name_prefix='blog-tasks')
+
+
+def run_task(task: typing.Callable, *args: typing.Any) -> None:
+    try:
+        task(*args)
+    except Exception:
+        logger.exception('Background task %s failed', task.__qualname__)
+    finally:
+        # worker threads open their own database connections
+        connections.close_all()
+
+
+def submit(task: typing.Callable, *args: typing.Any) -> None:
+    if settings.BACKGROUND_TASKS_EAGER:
+        task(*args)
+    else:
+        executor.submit(run_task, task, *args)
+
+
+def run_in_background(task: typing.Callable, *args: typing.Any) -> None:
+    """
+    Runs the task on a worker thread once the current transaction has been committed,
+    so the task sees the rows the request has written
+    """
+    transaction.on_commit(lambda: submit(task, *args))
+
+
+class OnCommitCallback:
+    """
+    Callback that equals the callbacks of the same function with the same arguments
+    """
+
+    def __init__(self, function: typing.Callable, args: typing.Tuple) -> None:
+        self.function = function
+        self.args = args
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, OnCommitCallback) and (self.function, self.args) == (other.function, other.args)
+
+    def __hash__(self) -> int:
+        return hash((self.function, self.args))
+
+    def __call__(self) -> None:
+        self.function(*self.args)
+
+
+def on_commit_once(function: typing.Callable, *args: typing.Any) -> None:
+    """
+    Calls the function once the current transaction has been committed, at most once per transaction for the same
+    arguments, e.g. when several signals of one request ask for it
+    """
+    callback = OnCommitCallback(function, args)
+    # (savepoint ids, callback) of the pending callbacks, those of rolled back savepoints have already been dropped
+    if any(pending[1] == callback for pending in transaction.get_connection().run_on_commit):
+        return
+    transaction.on_commit(callback)
+
+
+def run_once_in_background(task: typing.Callable, *args: typing.Any) -> None:
+    """
+    Like run_in_background, but runs the task once per transaction for the same arguments
+    """
+    on_commit_once(submit, task, *args)
@@ -1 +1,10 @@
+import pytest
+from django.core.cache import cache
+
 from blog.tests.fixtures import *  # noqa: F403, F401
+
+
+@pytest.fixture(name='clear_cache', autouse=True)
+def fixture_clear_cache() -> None:
+    # the database is flushed between tests without the signals that invalidate cached entries, e.g. cached users
+    cache.clear()
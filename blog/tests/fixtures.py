@@ -296,9 +296,10 @@ def fixture_logout(client_query: Callable, import_query: Callable) -> Callable:
 
 
 @pytest.fixture(name='auto_logout', autouse=True)
-def fixture_auto_logout(logout: Callable) -> None:
-    # automatically logout before each test
-    logout(assert_errors=False)
+def fixture_auto_logout(request: pytest.FixtureRequest, logout: Callable) -> None:
+    # automatically logout before each test, tests without database access have no session
+    if request.node.get_closest_marker('django_db') is not None:
+        logout(assert_errors=False)
 
 
 @pytest.fixture(name='create_users')
@@ -451,3 +452,77 @@ def fixture_create_tags(
         return Tag.objects.all()
 
     return func
+
+
+@pytest.fixture(name='create_search_posts')
+def fixture_create_search_posts(
+    create_users: Callable,
+    create_categories: Callable,
+) -> Callable:
+    def func() -> typing.List[PostType]:
+        users = create_users()
+        categories = create_categories()
+        caching = Post.objects.create(
+            title='Caching graphql queries',
+            text='A cache in front of the database keeps the graphql server fast.',
+            owner=users[1],
+            category=categories[0],
+            status='PUBLISHED',
+        )
+        caching.tags.add('performance')
+        travel = Post.objects.create(
+            title='Travel notes',
+            text='We took the night train to the mountains. ' * 10 + 'On the way back we talked about graphql.',
+            owner=users[1],
+            category=categories[1],
+            status='PUBLISHED',
+        )
+        travel.tags.add('mountains')
+        draft = Post.objects.create(
+            title='Graphql draft', text='Not published yet', owner=users[1], category=categories[0], status='DRAFT'
+        )
+        return [caching, travel, draft]
+
+    return func
+
+
+@pytest.fixture(name='create_feed_posts')
+def fixture_create_feed_posts(
+    create_users: Callable,
+    create_categories: Callable,
+) -> Callable:
+    def func() -> typing.List[PostType]:
+        # posts of the authors 3 and 2, only the published post of 3 goes to the feed of its subscribers
+        users = create_users()
+        categories = create_categories()
+        posts = [
+            Post.objects.create(title='Older', text='text', owner=users[2], category=categories[0], status='PUBLISHED'),
+            Post.objects.create(title='Draft', text='text', owner=users[2], category=categories[0], status='DRAFT'),
+            Post.objects.create(title='Other', text='text', owner=users[1], category=categories[0], status='PUBLISHED'),
+        ]
+        return posts
+
+    return func
+
+
+@pytest.fixture(name='create_similar_posts')
+def fixture_create_similar_posts(
+    create_users: Callable,
+    create_categories: Callable,
+) -> Callable:
+    def func() -> typing.Dict[str, PostType]:
+        users = create_users()
+        categories = create_categories()
+        posts = {}
+        for title, category, tags in [
+            ('Caching graphql queries', categories[0], ['graphql', 'performance']),
+            ('Graphql schema design', categories[0], ['graphql']),
+            ('Database performance', categories[0], ['performance', 'mysql']),
+            ('Night train to the mountains', categories[1], ['travel']),
+        ]:
+            post = Post.objects.create(title=title, text='text', owner=users[1], category=category, status='PUBLISHED')
+            post.tags.add(*tags)
+            posts[title] = post
+        return posts
+
+    return func
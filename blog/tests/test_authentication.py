@@ -1,11 +1,20 @@
+from datetime import timedelta
+from io import StringIO
 from typing import Callable, Dict
 import pytest
 from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+from pytest_django.fixtures import SettingsWrapper
+from strawberry_django_jwt.refresh_token.models import RefreshToken
+from strawberry_django_jwt.settings import jwt_settings
+from strawberry_django_jwt.utils import get_payload
 from django.core.files.uploadedfile import SimpleUploadedFile
 from strawberry.test import Response
 from django.conf import settings
 
-from blog.models import User, UserStatus
+from blog.models import AuthorRequest, User, UserStatus
+from blog.tests.fixtures import graphql_client
 
 
 @pytest.mark.django_db(transaction=True, reset_sequences=True)
@@ -272,3 +281,128 @@ def test_email_change(
     assert errors is None
 
     assert User.objects.get(username='test_user1').email == 'new_email@example.com'
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_jwt_cookie_not_reissued_while_valid(auth: Callable) -> None:
+    auth()
+    assert RefreshToken.objects.count() == 1
+
+    response = graphql_client.raw_query('query { me { username } }')
+
+    assert response.status_code == 200
+    assert jwt_settings.JWT_COOKIE_NAME not in response.cookies
+    assert jwt_settings.JWT_REFRESH_TOKEN_COOKIE_NAME not in response.cookies
+    assert RefreshToken.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_jwt_cookie_reissued_when_expiring(auth: Callable, settings: SettingsWrapper) -> None:
+    auth()
+    settings.JWT_COOKIE_REISSUE_THRESHOLD = jwt_settings.JWT_EXPIRATION_DELTA + timedelta(minutes=1)
+
+    response = graphql_client.raw_query('query { me { username } }')
+
+    # the refresh token cookie is still valid
+    assert jwt_settings.JWT_COOKIE_NAME in response.cookies
+    assert jwt_settings.JWT_REFRESH_TOKEN_COOKIE_NAME not in response.cookies
+    assert RefreshToken.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_jwt_cookie_issued_after_admin_login(create_users: Callable) -> None:
+    create_users()
+    graphql_client.client.cookies.clear()
+    graphql_client.client.force_login(
+        User.objects.get(username='test_user1'), backend='django.contrib.auth.backends.ModelBackend'
+    )
+
+    response = graphql_client.raw_query('query { me { username } }')
+
+    assert jwt_settings.JWT_COOKIE_NAME in response.cookies
+    assert jwt_settings.JWT_REFRESH_TOKEN_COOKIE_NAME in response.cookies
+    assert RefreshToken.objects.count() == 1
+
+    response = graphql_client.raw_query('query { me { username } }')
+
+    assert jwt_settings.JWT_COOKIE_NAME not in response.cookies
+    assert RefreshToken.objects.count() == 1
+    graphql_client.logout()
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_jwt_cookie_not_issued_for_header_token(auth: Callable) -> None:
+    auth()
+    token = graphql_client.client.cookies[jwt_settings.JWT_COOKIE_NAME].value
+    graphql_client.client.cookies.clear()
+    authorization = f'{jwt_settings.JWT_AUTH_HEADER_PREFIX} {token}'
+
+    for _ in range(2):
+        response = graphql_client.client.post(
+            '/graphql/',
+            {'query': 'query { me { username } }'},
+            content_type='application/json',
+            HTTP_AUTHORIZATION=authorization,
+        )
+
+        assert response.json()['data']['me']['username'] == 'jane.doe@blogapp.lo'
+        assert jwt_settings.JWT_COOKIE_NAME not in response.cookies
+        assert jwt_settings.JWT_REFRESH_TOKEN_COOKIE_NAME not in response.cookies
+        assert RefreshToken.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_prune_refresh_tokens(create_users: Callable) -> None:
+    create_users()
+    user = User.objects.get(username='test_user1')
+    RefreshToken.objects.create(user=user)
+    RefreshToken.objects.create(user=user, revoked=timezone.now())
+    expired = RefreshToken.objects.create(user=user)
+    RefreshToken.objects.filter(pk=expired.pk).update(
+        created=timezone.now() - jwt_settings.JWT_REFRESH_EXPIRATION_DELTA - timedelta(minutes=1)
+    )
+
+    out = StringIO()
+    call_command('prune_refresh_tokens', '--batch-size=1', stdout=out)
+
+    assert out.getvalue().strip() == 'Pruned 2 refresh tokens'
+    assert RefreshToken.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_jwt_user_cached_by_token(
+    auth: Callable, django_assert_num_queries: Callable, settings: SettingsWrapper
+) -> None:
+    settings.PRINCIPAL_CACHE_TIMEOUT = 60
+    auth(is_author=False)
+    # authenticate by the jwt cookie only
+    graphql_client.client.cookies.pop(settings.SESSION_COOKIE_NAME)
+    query = 'query { me { username } }'
+    graphql_client.raw_query(query)
+
+    # only the me resolver queries the database
+    with django_assert_num_queries(1):
+        response = graphql_client.raw_query(query)
+    assert response.status_code == 200
+
+    UserStatus.objects.filter(user__username='jane.doe@blogapp.lo').get().save()
+
+    with django_assert_num_queries(2):
+        graphql_client.raw_query(query)
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_jwt_claims_reissued_after_author_request_accepted(auth: Callable) -> None:
+    auth(is_author=False)
+    graphql_client.client.cookies.pop(settings.SESSION_COOKIE_NAME)
+    payload = get_payload(graphql_client.client.cookies[jwt_settings.JWT_COOKIE_NAME].value)
+    assert payload.is_author is False
+    assert payload.verified is True
+
+    user = User.objects.get(username='jane.doe@blogapp.lo')
+    AuthorRequest.objects.create(user=user, status=AuthorRequest.Status.ACCEPTED)
+
+    response = graphql_client.raw_query('query { me { username } }')
+
+    assert jwt_settings.JWT_COOKIE_NAME in response.cookies
+    assert get_payload(response.cookies[jwt_settings.JWT_COOKIE_NAME].value).is_author is True
@@ -0,0 +1,46 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.benchmark import OPERATIONS, Benchmark
+from blog.dataset import DatasetSize, generate_dataset
+from blog.models import Notification, Post, PostLike, Subscription, User
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_generate_dataset() -> None:
+    size = DatasetSize(
+        users=30,
+        authors=5,
+        tags=10,
+        posts=40,
+        tags_per_post=2,
+        comments_per_post=2,
+        likes_per_post=3,
+        subscriptions_per_user=2,
+        unread_share=0.5,
+    )
+    counts = generate_dataset(size, seed=1)
+
+    assert User.objects.count() == 30
+    assert User.objects.filter(user_status__is_author=True).count() == 5
+    assert Post.objects.count() == 40
+    assert counts['subscriptions'] == Subscription.objects.count()
+    assert counts['notifications'] == Notification.objects.count()
+    post = Post.objects.order_by('-like_count').first()
+    assert post.like_count == PostLike.objects.filter(post=post).count() > 0
+    # posts are spread over time
+    assert Post.objects.order_by('date_created').first().id == 1
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_benchmark_operations() -> None:
+    call_command('generate_dataset', '--users=20', '--authors=4', '--tags=10', '--posts=30', stdout=StringIO())
+    benchmark = Benchmark(iterations=2, warmup=0)
+
+    for operation in OPERATIONS:
+        result = benchmark.run(operation).as_dict()
+        assert result['errors'] == 0, operation.name
+        assert result['runs'] == 2
+        assert result['maxSqlQueries'] > 0
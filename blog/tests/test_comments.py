@@ -2,6 +2,8 @@ from typing import Callable, Dict
 import pytest
 from strawberry.test import Response
 
+from blog.models import Post
+
 
 @pytest.mark.django_db
 def test_create_comments(create_comments: Callable) -> None:
@@ -45,6 +47,7 @@ def test_create_comment(
     comment_post: Dict = create_comment.get('post', None)
     assert comment_post is not None
     assert comment_post.get('slug', None) == 'test_post-1'
+    assert Post.objects.get(pk=1).comment_count == 1
 
 
 @pytest.mark.django_db(transaction=True, reset_sequences=True)
@@ -0,0 +1,36 @@
+import json
+from unittest import mock
+
+import pytest
+
+from blog.api.document_cache import document_cache
+from blog.tests.fixtures import graphql_client
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_document_cache() -> None:
+    document_cache.clear()
+    query = 'query CachedTags { tags { name } }'
+
+    graphql_client.raw_query(query)
+    assert document_cache.stats['misses'] == 1
+
+    with mock.patch('strawberry.schema.execute.parse') as parse, mock.patch(
+        'strawberry.schema.execute.validate'
+    ) as validate:
+        response = graphql_client.raw_query(query)
+    assert json.loads(response.content)['data'] == {'tags': []}
+    parse.assert_not_called()
+    validate.assert_not_called()
+    assert document_cache.stats['hits'] == 1
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_document_cache_validation_errors() -> None:
+    document_cache.clear()
+    query = 'query InvalidTags { tags { unknownField } }'
+
+    errors = [json.loads(graphql_client.raw_query(query).content)['errors'] for _ in range(2)]
+
+    assert errors[0] == errors[1]
+    assert document_cache.stats == {'hits': 1, 'misses': 1, 'size': 1, 'max_size': document_cache.max_size}
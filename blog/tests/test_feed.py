@@ -0,0 +1,143 @@
+from io import StringIO
+from typing import Callable, Dict, List, Optional
+
+import pytest
+from django.core.management import call_command
+from pytest_django.fixtures import SettingsWrapper
+from strawberry.test import Response
+
+from blog.models import FeedItem, Post, User
+
+
+def subscribe(import_query: Callable, client_query: Callable, author: int) -> None:
+    response: Response = client_query(
+        import_query('createSubscription.graphql'), {'subscriptionInput': {'subscriber': 1, 'author': author}}
+    )
+    assert response.errors is None
+    assert response.data['createSubscription']['success'] is True
+
+
+def feed(import_query: Callable, client_query: Callable, first: int = 10, after: Optional[str] = None) -> Dict:
+    response: Response = client_query(import_query('feed.graphql'), {'first': first, 'after': after})
+    assert response.errors is None
+    return response.data['feed']
+
+
+def titles(result: Dict) -> List[str]:
+    return [post['title'] for post in result['posts']]
+
+
+def publish(author: User, title: str) -> Post:
+    post = Post.objects.create(title=title, text='text', owner=author, category_id=1, status='PUBLISHED')
+    FeedItem.publish(post)
+    return post
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_feed(
+    auth: Callable, create_feed_posts: Callable, import_query: Callable, client_query: Callable
+) -> None:
+    # the logged in user 1, who subscribes to the author 3
+    auth()
+    create_feed_posts()
+    assert titles(feed(import_query, client_query)) == []
+
+    # the latest posts of the author are added to the feed of a new subscriber
+    subscribe(import_query, client_query, 3)
+    assert User.objects.get(pk=3).subscriber_count == 1
+    assert titles(feed(import_query, client_query)) == ['Older']
+
+    author = User.objects.get(pk=3)
+    publish(author, 'Newer')
+    publish(author, 'Newest')
+    assert FeedItem.objects.filter(user_id=1).count() == 3
+
+    first_page = feed(import_query, client_query, first=2)
+    assert titles(first_page) == ['Newest', 'Newer']
+    assert first_page['hasNextPage'] is True
+    second_page = feed(import_query, client_query, first=2, after=first_page['endCursor'])
+    assert titles(second_page) == ['Older']
+    assert second_page['hasNextPage'] is False
+
+    # unpublished posts leave the feed
+    Post.objects.filter(title='Newest').update(status=Post.PostStatus.DRAFT)
+    assert titles(feed(import_query, client_query)) == ['Newer', 'Older']
+
+    response: Response = client_query(
+        import_query('deleteSubscription.graphql'), {'subscriptionInput': {'subscriber': 1, 'author': 3}}
+    )
+    assert response.errors is None
+    assert User.objects.get(pk=3).subscriber_count == 0
+    assert not FeedItem.objects.filter(user_id=1).exists()
+    assert titles(feed(import_query, client_query)) == []
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_feed_of_authors_over_the_fanout_threshold(
+    auth: Callable,
+    create_feed_posts: Callable,
+    import_query: Callable,
+    client_query: Callable,
+    settings: SettingsWrapper,
+) -> None:
+    auth()
+    create_feed_posts()
+    subscribe(import_query, client_query, 3)
+    publish(User.objects.get(pk=3), 'Before the threshold')
+
+    settings.FEED_FANOUT_MAX_SUBSCRIBERS = 0
+    publish(User.objects.get(pk=3), 'After the threshold')
+
+    # the posts of the author are merged into the feed when it is read, without duplicates
+    assert FeedItem.objects.filter(user_id=1).count() == 2
+    result = feed(import_query, client_query, first=2)
+    assert titles(result) == ['After the threshold', 'Before the threshold']
+    assert titles(feed(import_query, client_query, after=result['endCursor'])) == ['Older']
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_feed_invalid_cursor(
+    auth: Callable, create_feed_posts: Callable, import_query: Callable, client_query: Callable
+) -> None:
+    auth()
+    create_feed_posts()
+
+    response: Response = client_query(import_query('feed.graphql'), {'after': 'invalid'})
+
+    assert response.errors is not None
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_rebuild_feeds(
+    auth: Callable, create_feed_posts: Callable, import_query: Callable, client_query: Callable
+) -> None:
+    auth()
+    create_feed_posts()
+    subscribe(import_query, client_query, 3)
+    FeedItem.objects.all().delete()
+    User.objects.filter(pk=3).update(subscriber_count=5)
+
+    out = StringIO()
+    call_command('rebuild_feeds', stdout=out)
+
+    assert out.getvalue().splitlines() == [
+        'Reconciled the subscriber counts of 1 users',
+        'Rebuilt the feeds of the subscribers of 1 authors',
+    ]
+    assert User.objects.get(pk=3).subscriber_count == 1
+    assert titles(feed(import_query, client_query)) == ['Older']
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_user_save_keeps_subscriber_count(
+    auth: Callable, create_feed_posts: Callable, import_query: Callable, client_query: Callable
+) -> None:
+    auth()
+    create_feed_posts()
+    author = User.objects.get(pk=3)
+    subscribe(import_query, client_query, 3)
+
+    author.first_name = 'Jane'
+    author.save()
+
+    assert User.objects.get(pk=3).subscriber_count == 1
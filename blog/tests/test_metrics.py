@@ -0,0 +1,40 @@
+from typing import Callable
+
+import pytest
+from django.test import Client
+from prometheus_client import REGISTRY
+from pytest_django.fixtures import SettingsWrapper
+
+from blog.models import OutgoingEmail
+from blog.tests.fixtures import graphql_client
+
+QUERY = 'query CategoryNames { categories { name } }'
+
+
+def get_sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_metrics_endpoint(create_categories: Callable) -> None:
+    create_categories()
+    OutgoingEmail.objects.create(subject='Subject', body='Body', to_email='user@blogapp.com')
+    operations = get_sample('blog_graphql_operation_duration_seconds_count', {'operation': 'CategoryNames'})
+
+    graphql_client.raw_query(QUERY)
+
+    assert get_sample('blog_graphql_operation_duration_seconds_count', {'operation': 'CategoryNames'}) == operations + 1
+    response = Client().get('/metrics/')
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert 'blog_graphql_operation_sql_queries_count{operation="CategoryNames"}' in content
+    assert 'blog_email_outbox_emails{status="PENDING"} 1.0' in content
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_metrics_token(settings: SettingsWrapper) -> None:
+    settings.METRICS_TOKEN = 'secret'
+
+    assert Client().get('/metrics/').status_code == 403
+    assert Client().get('/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code == 403
+    assert Client().get('/metrics/', HTTP_AUTHORIZATION='Bearer secret').status_code == 200
@@ -0,0 +1,40 @@
+import json
+from typing import Callable
+
+import pytest
+from pytest_django.fixtures import SettingsWrapper
+
+from blog.metrics import operation_metrics
+from blog.tests.fixtures import graphql_client
+
+QUERY = 'query CategoryNames { categories { name } }'
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_operation_stats_in_debug_extensions(create_categories: Callable, settings: SettingsWrapper) -> None:
+    create_categories()
+    settings.DEBUG = True
+    operation_metrics.clear()
+
+    response = json.loads(graphql_client.raw_query(QUERY).content)
+
+    stats = response['extensions']['stats']
+    assert stats['operationName'] == 'CategoryNames'
+    assert stats['sqlQueries'] >= 1
+    assert stats['dataSize'] == len(json.dumps(response['data']))
+    assert operation_metrics.snapshot() == {}
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_operation_metrics(create_categories: Callable) -> None:
+    create_categories()
+    operation_metrics.clear()
+
+    responses = [graphql_client.raw_query(QUERY) for _ in range(2)]
+
+    assert 'stats' not in json.loads(responses[0].content).get('extensions', {})
+    metrics = operation_metrics.snapshot()['CategoryNames']
+    assert metrics['count'] == 2
+    assert metrics['sql_queries'] >= 2
+    assert metrics['response_size'] == sum(len(response.content) for response in responses)
+    assert metrics['total_time'] >= metrics['resolver_time'] > 0
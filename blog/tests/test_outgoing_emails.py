@@ -0,0 +1,54 @@
+from io import StringIO
+from smtplib import SMTPException
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from pytest_django.fixtures import SettingsWrapper
+
+from blog.models import OutgoingEmail
+
+
+@pytest.mark.django_db
+def test_send_queued_emails(settings: SettingsWrapper) -> None:
+    settings.EMAIL_OUTBOX_SEND_ON_COMMIT = False
+    for i in range(3):
+        OutgoingEmail.enqueue(subject=f'subject {i}', body='<p>body</p>', to_email=f'user{i}@example.com')
+    assert len(mail.outbox) == 0
+
+    out = StringIO()
+    call_command('send_queued_emails', '--batch-size=2', stdout=out)
+
+    assert out.getvalue().strip() == 'Sent 3 queued emails'
+    assert [message.to for message in mail.outbox] == [[f'user{i}@example.com'] for i in range(3)]
+    assert mail.outbox[0].content_subtype == 'html'
+    assert OutgoingEmail.objects.filter(status=OutgoingEmail.Status.SENT).count() == 3
+
+
+@pytest.mark.django_db
+def test_send_queued_emails_retries_with_backoff(settings: SettingsWrapper) -> None:
+    settings.EMAIL_OUTBOX_SEND_ON_COMMIT = False
+    settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+    email = OutgoingEmail.enqueue(subject='subject', body='body', to_email='user@example.com')
+
+    with mock.patch.object(EmailBackend, 'send_messages', side_effect=SMTPException('relay unavailable')):
+        assert OutgoingEmail.send_queued() == 0
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.Status.PENDING
+        assert email.attempts == 1
+        assert 'relay unavailable' in email.last_error
+
+        # not due before the backoff has passed
+        assert OutgoingEmail.send_queued() == 0
+        email.refresh_from_db()
+        assert email.attempts == 1
+
+        OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=email.date_created)
+        assert OutgoingEmail.send_queued() == 0
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.Status.FAILED
+        assert email.attempts == 2
+
+    assert len(mail.outbox) == 0
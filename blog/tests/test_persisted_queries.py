@@ -0,0 +1,90 @@
+import hashlib
+import json
+from io import StringIO
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from pytest_django.fixtures import SettingsWrapper
+
+from blog.api.persisted_queries import registry
+from blog.models import PersistedQuery
+from blog.tests.fixtures import graphql_client
+
+QUERY = 'query CategoryNames { categories { name } }'
+
+
+@pytest.fixture(autouse=True)
+def clear_registry() -> None:
+    cache.clear()
+    registry.clear()
+
+
+def persisted_query(query_hash: str, query: Optional[str] = None) -> Dict:
+    body = {'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': query_hash}}}
+    if query is not None:
+        body['query'] = query
+    return json.loads(graphql_client.request(body).content)
+
+
+def get_error_code(response: Dict) -> str:
+    return response['errors'][0]['extensions']['code']
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_automatic_persisted_query(create_categories: Callable) -> None:
+    create_categories()
+    query_hash = hashlib.sha256(QUERY.encode()).hexdigest()
+
+    response = persisted_query(query_hash)
+    assert response['errors'][0]['message'] == 'PersistedQueryNotFound'
+    assert get_error_code(response) == 'PERSISTED_QUERY_NOT_FOUND'
+
+    response = persisted_query(query_hash, QUERY)
+    assert response.get('errors', None) is None
+    categories = response['data']['categories']
+    assert len(categories) > 0
+
+    response = persisted_query(query_hash)
+    assert response.get('errors', None) is None
+    assert response['data']['categories'] == categories
+
+    # invalid queries are not registered
+    invalid_query = 'query { categories { unknownField } }'
+    invalid_hash = hashlib.sha256(invalid_query.encode()).hexdigest()
+    assert persisted_query(invalid_hash, invalid_query).get('errors', None) is not None
+    assert get_error_code(persisted_query(invalid_hash)) == 'PERSISTED_QUERY_NOT_FOUND'
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_persisted_query_hash_mismatch() -> None:
+    response = persisted_query(hashlib.sha256(b'query { me { username } }').hexdigest(), QUERY)
+    assert get_error_code(response) == 'PERSISTED_QUERY_HASH_MISMATCH'
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_persisted_query_allowlist(create_categories: Callable, settings: SettingsWrapper, tmp_path: Path) -> None:
+    create_categories()
+    settings.GRAPHQL_PERSISTED_QUERIES_ALLOWLIST = True
+    query = 'query CategorySlugs {\n    categories {\n        slug\n    }\n}\n'
+    (tmp_path / 'categorySlugs.graphql').write_text(query)
+
+    response = graphql_client.raw_query(query)
+    assert get_error_code(json.loads(response.content)) == 'PERSISTED_QUERY_NOT_ALLOWED'
+
+    out = StringIO()
+    call_command('register_persisted_queries', str(tmp_path), stdout=out)
+    assert out.getvalue().strip() == 'Registered 1 persisted queries'
+
+    query_hash = hashlib.sha256(query.encode()).hexdigest()
+    assert PersistedQuery.objects.get(sha256_hash=query_hash).query == query
+
+    response = persisted_query(query_hash)
+    assert response.get('errors', None) is None
+    assert len(response['data']['categories']) > 0
+
+    # queries registered by clients are not allowed
+    query_hash = hashlib.sha256(QUERY.encode()).hexdigest()
+    assert get_error_code(persisted_query(query_hash, QUERY)) == 'PERSISTED_QUERY_NOT_ALLOWED'
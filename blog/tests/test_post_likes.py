@@ -1,7 +1,12 @@
+from io import StringIO
 from typing import Callable, Dict
 import pytest
+from django.core.management import call_command
+from django.db.models import F
 from strawberry.test import Response
 
+from blog.models import Comment, Post, PostLike, Subscription
+
 
 @pytest.mark.django_db
 def test_create_post_likes(create_post_likes: Callable) -> None:
@@ -53,3 +58,77 @@ def test_create_and_delete_post_like(
 
     delete_post_like: Dict = response.data.get('deletePostLike', None)
     assert delete_post_like is True
+    assert Post.objects.get(pk=1).like_count == 0
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_viewer_state(
+    create_post_likes: Callable,
+    login: Callable,
+    client_query: Callable,
+) -> None:
+    create_post_likes()
+    Subscription.objects.create(subscriber_id=1, author_id=2)
+    login('test_user1', 'password1')
+    query = 'query { paginatedPosts { posts { title isLiked isSubscribed owner { isSubscribed } } } }'
+
+    response: Response = client_query(query)
+
+    assert response is not None
+    assert response.errors is None
+
+    posts: Dict = response.data.get('paginatedPosts').get('posts')
+    assert [post.get('isLiked') for post in posts] == [False, True]
+    assert [post.get('isSubscribed') for post in posts] == [False, True]
+    assert [post.get('owner').get('isSubscribed') for post in posts] == [False, True]
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_reconcile_post_counters(create_post_likes: Callable) -> None:
+    create_post_likes()
+    Comment.objects.create(title='test_comment', post_id=2, owner_id=1)
+    Post.objects.filter(pk=1).update(like_count=5)
+
+    out = StringIO()
+    call_command('reconcile_post_counters', stdout=out)
+    assert out.getvalue().strip() == 'Reconciled the counters of 2 posts'
+
+    posts = Post.objects.order_by('id')
+    assert [post.like_count for post in posts] == [0, 2, 0]
+    assert [post.comment_count for post in posts] == [0, 1, 0]
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_post_save_keeps_counters(create_post_likes: Callable) -> None:
+    create_post_likes()
+    post = Post.objects.get(pk=2)
+    # a like lands between loading and saving the post
+    Post.objects.filter(pk=2).update(like_count=F('like_count') + 1)
+
+    post.title = 'Renamed'
+    post.save()
+
+    post.refresh_from_db()
+    assert post.title == 'Renamed'
+    assert post.like_count == 1
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_delete_post_like_not_counted(
+    create_post_likes: Callable,
+    login: Callable,
+    import_query: Callable,
+    client_query: Callable,
+) -> None:
+    # the likes of the fixture are created through the orm and didn't increment the counter
+    create_post_likes()
+    login('test_user1', 'password1')
+
+    query: str = import_query('deletePostLike.graphql')
+    response: Response = client_query(query, {'postLikeInput': {'post': 2}})
+
+    assert response is not None
+    assert response.errors is None
+    assert response.data.get('deletePostLike', None) is True
+    assert not PostLike.objects.filter(post_id=2, user__username='test_user1').exists()
+    assert Post.objects.get(pk=2).like_count == 0
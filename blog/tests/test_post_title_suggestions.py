@@ -0,0 +1,67 @@
+from typing import Callable, List
+
+import pytest
+from strawberry.test import Response
+
+from blog.models import Post, title_index
+from blog.title_index import TitleEntry, TitleIndex
+
+QUERY = 'query ($prefix: String!, $limit: Int) { postTitleSuggestions(prefix: $prefix, limit: $limit) { title slug } }'
+
+
+@pytest.fixture(name='reload_title_index', autouse=True)
+def fixture_reload_title_index() -> None:
+    # the database is emptied between tests without signals
+    title_index.invalidate()
+
+
+def suggest(client_query: Callable, prefix: str, limit: int = 10) -> List[str]:
+    response: Response = client_query(QUERY, {'prefix': prefix, 'limit': limit})
+    assert response.errors is None
+    return [suggestion['title'] for suggestion in response.data['postTitleSuggestions']]
+
+
+def test_title_index() -> None:
+    entries = [
+        TitleEntry(1, 'Caching GraphQL queries', 'caching', 1, True),
+        TitleEntry(2, 'GraphQL   basics', 'basics', 1, True),
+        TitleEntry(3, 'Graphs', 'graphs', 2, False),
+    ]
+    index = TitleIndex(lambda: entries)
+
+    assert [entry.post_id for entry in index.suggest(' graph', None, 10)] == [2, 1]
+    assert [entry.post_id for entry in index.suggest('GRAPH', 2, 10)] == [2, 1, 3]
+    assert [entry.post_id for entry in index.suggest('graphql b', None, 10)] == [2]
+    assert index.suggest('graph', None, 1) == [entries[1]]
+    assert index.suggest('', None, 10) == []
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_post_title_suggestions(create_posts: Callable, login: Callable, client_query: Callable) -> None:
+    create_posts()
+
+    assert suggest(client_query, 'test_p') == ['Test_Post 1', 'Test_Post 2']
+    assert suggest(client_query, 'test_post 2') == ['Test_Post 2']
+    assert suggest(client_query, 'test_p', limit=1) == ['Test_Post 1']
+
+    # drafts are suggested to their owner
+    login('test_user2', 'password2')
+    assert suggest(client_query, 'test_p') == ['Test_Post 1', 'Test_Post 2', 'Test_Post 3']
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_post_title_suggestions_updates(create_posts: Callable, client_query: Callable) -> None:
+    create_posts()
+    assert suggest(client_query, 'test_p') == ['Test_Post 1', 'Test_Post 2']
+
+    post = Post.objects.get(title='Test_Post 1')
+    post.title = 'Renamed post'
+    post.save()
+    draft = Post.objects.get(title='Test_Post 3')
+    draft.status = Post.PostStatus.PUBLISHED
+    draft.save()
+    Post.objects.get(title='Test_Post 2').delete()
+
+    assert suggest(client_query, 'test_p') == ['Test_Post 3']
+    # later words of a title match too
+    assert suggest(client_query, 'post') == ['Renamed post']
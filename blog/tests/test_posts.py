@@ -1,8 +1,11 @@
 from typing import Callable, Dict
 import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile
+from pytest_django.fixtures import SettingsWrapper
 from strawberry.test import Response
 
+from blog.models import Notification, Subscription
+
 
 @pytest.mark.django_db
 def test_create_posts(create_posts: Callable) -> None:
@@ -66,6 +69,35 @@ def test_create_post_with_relations(
     assert related_sub_posts[1].get('id', None) == '2'
 
 
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+@pytest.mark.parametrize('background_threshold', [500, 0])
+def test_create_post_notifies_subscribers(
+    auth: Callable,
+    create_posts: Callable,
+    import_query: Callable,
+    query_post: Callable,
+    file_image_jpg: SimpleUploadedFile,
+    settings: SettingsWrapper,
+    background_threshold: int,
+) -> None:
+    settings.NOTIFICATION_FANOUT_CHUNK_SIZE = 1
+    settings.NOTIFICATION_FANOUT_BACKGROUND_THRESHOLD = background_threshold
+    auth()
+    create_posts()
+    Subscription.objects.create(subscriber_id=2, author_id=1)
+    Subscription.objects.create(subscriber_id=3, author_id=1)
+    post_input = {'title': 'test_post', 'text': 'this a test', 'category': 2}
+
+    query: str = import_query('createPost.graphql')
+    response: Dict = query_post(query, post_input, file_image_jpg)
+
+    assert response.get('errors', None) is None
+    assert response.get('data').get('createPost').get('success', None) is True
+
+    notifications = Notification.objects.filter(post__slug='test_post').order_by('user_id')
+    assert list(notifications.values_list('user_id', flat=True)) == [2, 3]
+
+
 @pytest.mark.django_db(transaction=True, reset_sequences=True)
 def test_create_post_not_an_author(
     auth: Callable,
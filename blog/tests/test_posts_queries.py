@@ -1,4 +1,4 @@
-from blog.models import Notification
+from blog.models import Notification, Post
 from typing import Callable, Dict
 import pytest
 from strawberry.test import Response
@@ -157,6 +157,177 @@ def test_query_non_existent_post_by_tag_and_category(
     assert len(posts) == 0
 
 
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_posts_by_multiple_matching_tags(
+    create_tags: Callable,
+    import_query: Callable,
+    client_query: Callable,
+) -> None:
+    create_tags()
+    Post.objects.get(pk=2).tags.add('tag_1')
+    filter_input = {'tagSlugs': 'tag_1_slug,tag_2_slug'}
+
+    query: str = import_query('paginatedFilteredPostsQuery.graphql')
+    response: Response = client_query(query, filter_input)
+
+    assert response is not None
+    assert response.errors is None
+
+    paginated_posts: Dict = response.data.get('paginatedPosts', None)
+    assert paginated_posts is not None
+    assert paginated_posts.get('numPostPages', None) == 1
+
+    posts: Dict = paginated_posts.get('posts', None)
+    assert posts is not None
+    assert [post.get('title', None) for post in posts] == ['Test_Post 1', 'Test_Post 2']
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_posts_with_all_tags(
+    create_tags: Callable,
+    import_query: Callable,
+    client_query: Callable,
+) -> None:
+    create_tags()
+    Post.objects.get(pk=2).tags.add('tag_1')
+    query: str = import_query('paginatedFilteredPostsQuery.graphql')
+
+    response: Response = client_query(query, {'tagSlugs': 'tag_1_slug,tag_2_slug', 'tagMode': 'ALL'})
+    assert response.errors is None
+    assert [post.get('title', None) for post in response.data['paginatedPosts']['posts']] == ['Test_Post 2']
+
+    response = client_query(query, {'tagSlugs': 'tag_1_slug,tag_3_slug', 'tagMode': 'ALL'})
+    assert response.errors is None
+    assert response.data['paginatedPosts']['posts'] == []
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_posts_by_exact_tag_slug(
+    create_tags: Callable,
+    import_query: Callable,
+    client_query: Callable,
+) -> None:
+    create_tags()
+
+    query: str = import_query('paginatedFilteredPostsQuery.graphql')
+    response: Response = client_query(query, {'tagSlugs': 'tag_'})
+
+    assert response.errors is None
+    assert response.data['paginatedPosts']['posts'] == []
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_posts_by_empty_tag_slugs(
+    create_tags: Callable,
+    import_query: Callable,
+    client_query: Callable,
+) -> None:
+    create_tags()
+    query: str = import_query('paginatedFilteredPostsQuery.graphql')
+    unfiltered: Response = client_query(query, {})
+
+    for tag_slugs in ('', ','):
+        response: Response = client_query(query, {'tagSlugs': tag_slugs})
+
+        assert response.errors is None
+        assert response.data['paginatedPosts']['posts'] != []
+        assert response.data['paginatedPosts'] == unfiltered.data['paginatedPosts']
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_posts_loads_only_selected_relations(
+    create_comments: Callable,
+    client_query: Callable,
+    django_assert_num_queries: Callable,
+) -> None:
+    create_comments()
+    query = 'query { paginatedPosts { posts { title image { name } } numPostPages } }'
+
+    # count, page ids and the page itself - no joins or prefetches for unselected relations
+    with django_assert_num_queries(3):
+        response: Response = client_query(query)
+
+    assert response.errors is None
+    posts: Dict = response.data.get('paginatedPosts').get('posts')
+    assert [post.get('title', None) for post in posts] == ['Test_Post 1', 'Test_Post 2']
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_posts_related_posts_visibility(
+    create_posts_with_relations: Callable,
+    login: Callable,
+    client_query: Callable,
+    django_assert_max_num_queries: Callable,
+) -> None:
+    create_posts_with_relations()
+    query = 'query { paginatedPosts { posts { id relatedSubPosts { id } relatedMainPosts { id } } } }'
+
+    # count, page ids, page and one query per relation direction for the whole page
+    with django_assert_max_num_queries(5):
+        response: Response = client_query(query)
+
+    assert response.errors is None
+    posts: Dict = response.data.get('paginatedPosts').get('posts')
+    assert [post.get('relatedSubPosts') for post in posts] == [[{'id': '2'}], []]
+    assert [post.get('relatedMainPosts') for post in posts] == [[], [{'id': '1'}]]
+
+    # the owner of the draft post 3 also sees it as related post
+    login('test_user2', 'password2')
+    response = client_query(query)
+
+    assert response.errors is None
+    posts = response.data.get('paginatedPosts').get('posts')
+    assert [post.get('relatedSubPosts') for post in posts] == [[{'id': '2'}], [{'id': '3'}]]
+    assert [post.get('relatedMainPosts') for post in posts] == [[], [{'id': '1'}, {'id': '3'}]]
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_post_connection(
+    create_posts: Callable,
+    import_query: Callable,
+    client_query: Callable,
+) -> None:
+    create_posts()
+
+    query: str = import_query('postConnection.graphql')
+    response: Response = client_query(query, {'first': 1})
+
+    assert response is not None
+    assert response.errors is None
+
+    post_connection: Dict = response.data.get('postConnection', None)
+    assert post_connection is not None
+    assert post_connection.get('hasNextPage', None) is True
+    posts: Dict = post_connection.get('posts', None)
+    assert [post.get('title', None) for post in posts] == ['Test_Post 2']
+
+    end_cursor = post_connection.get('endCursor', None)
+    assert end_cursor is not None
+    response = client_query(query, {'first': 1, 'after': end_cursor})
+
+    assert response.errors is None
+    post_connection = response.data.get('postConnection', None)
+    assert post_connection.get('hasNextPage', None) is False
+    posts = post_connection.get('posts', None)
+    assert [post.get('title', None) for post in posts] == ['Test_Post 1']
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_post_connection_invalid_cursor(
+    import_query: Callable,
+    client_query: Callable,
+) -> None:
+    query: str = import_query('postConnection.graphql')
+    response: Response = client_query(query, {'after': 'invalid'})
+
+    assert response is not None
+    assert response.data is None
+    assert response.errors is not None
+
+    extensions = response.errors[0].get('extensions', None)
+    assert extensions.get('code', None) == 'INVALID_CURSOR'
+
+
 @pytest.mark.django_db(transaction=True, reset_sequences=True)
 def test_query_notification_posts(
     create_posts: Callable,
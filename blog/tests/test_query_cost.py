@@ -0,0 +1,65 @@
+import json
+from typing import Callable
+
+import pytest
+from pytest_django.fixtures import SettingsWrapper
+
+from blog.api.query_cost import MUTATION_WEIGHT
+from blog.tests.fixtures import graphql_client
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_cost_reported(create_categories: Callable) -> None:
+    create_categories()
+
+    response = json.loads(graphql_client.raw_query('query { categories { name } }').content)
+
+    assert response.get('errors', None) is None
+    assert response['extensions']['cost']['requested'] == 10
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_cost_of_connection_page() -> None:
+    query = 'query ($first: Int!) { postConnection(first: $first) { posts { owner { username } } } }'
+
+    response = json.loads(graphql_client.raw_query(query, {'first': 3}).content)
+
+    # connection + 3 posts with their owner
+    assert response['extensions']['cost']['requested'] == 1 + 3 * 2
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_cost_exceeded(create_posts: Callable, settings: SettingsWrapper) -> None:
+    create_posts()
+    query = 'query { users { posts { comments { owner { posts { comments { title } } } } } } }'
+
+    response = json.loads(graphql_client.raw_query(query).content)
+
+    assert response['data'] is None
+    assert response['errors'][0]['extensions']['code'] == 'QUERY_COST_EXCEEDED'
+    assert response['extensions']['cost']['requested'] > settings.GRAPHQL_MAX_QUERY_COST
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_scalar_mutations_cost_exceeded(create_comments: Callable, settings: SettingsWrapper) -> None:
+    create_comments()
+    count = settings.GRAPHQL_MAX_QUERY_COST // MUTATION_WEIGHT + 1
+    mutations = ' '.join(f'delete{index}: deleteComment(commentId: 1)' for index in range(count))
+
+    response = json.loads(graphql_client.raw_query(f'mutation {{ {mutations} }}').content)
+
+    assert response['data'] is None
+    assert response['errors'][0]['extensions']['code'] == 'QUERY_COST_EXCEEDED'
+    assert response['extensions']['cost']['requested'] == count * MUTATION_WEIGHT
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_depth_exceeded() -> None:
+    query = 'query { users { posts { owner { posts { owner { posts { id } } } } } } }'
+    for _ in range(3):
+        query = query.replace('posts { id }', 'posts { owner { posts { id } } }')
+
+    response = json.loads(graphql_client.raw_query(query).content)
+
+    assert response['data'] is None
+    assert 'exceeds maximum operation depth' in response['errors'][0]['message']
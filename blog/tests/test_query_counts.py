@@ -0,0 +1,576 @@
+import dataclasses
+import json
+import os
+from typing import Callable, Dict, List, Optional
+
+import pytest
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import Count
+from django.http import HttpResponse
+from django.test import Client
+from strawberry_django_jwt.refresh_token.shortcuts import create_refresh_token
+from strawberry_django_jwt.settings import jwt_settings
+from strawberry_django_jwt.shortcuts import get_token as get_jwt
+from taggit.models import Tag
+
+from blog.dataset import PASSWORD, DatasetSize, generate_dataset
+from blog.models import (
+    AuthorRequest,
+    Category,
+    Comment,
+    FeedItem,
+    Notification,
+    OutgoingEmail,
+    Post,
+    PostLike,
+    Subscription,
+    User,
+    UserStatus,
+)
+from blog.utils import TokenAction, get_token
+
+# Every query and mutation runs against a small and a large dataset. The sql queries of an operation must stay
+# within its budget and must not grow with the dataset, which catches resolvers that query once per item (N+1).
+# The counts of the cases were measured on the small dataset with sqlite; lower one whenever an operation gets
+# cheaper. The budget adds some headroom, since mysql may run a few more or fewer queries, e.g. savepoints or bulk
+# inserts that can't return the ids.
+
+SMALL = DatasetSize(
+    users=12,
+    authors=4,
+    tags=10,
+    posts=24,
+    tags_per_post=2,
+    comments_per_post=2,
+    likes_per_post=3,
+    subscriptions_per_user=2,
+    unread_share=1,
+)
+LARGE = DatasetSize(
+    users=48,
+    authors=12,
+    tags=40,
+    posts=64,
+    tags_per_post=4,
+    comments_per_post=4,
+    likes_per_post=8,
+    subscriptions_per_user=4,
+    unread_share=1,
+)
+
+POST_FIELDS = """
+    id
+    title
+    slug
+    likeCount
+    commentCount
+    isLiked
+    isSubscribed
+    owner { username isSubscribed }
+    category { slug }
+    tags { name slug }
+    comments { title owner { username } }
+    relatedSubPosts { id }
+    relatedMainPosts { id }
+"""
+
+
+@dataclasses.dataclass
+class Dataset:
+    # superuser and author with subscribers, subscribed to all other authors but `author`
+    viewer: User
+    author: User
+    # published post of another author with comments, not liked by the viewer
+    post: Post
+    liked_post: Post
+    own_post: Post
+    comment: Comment
+    # unverified user with a pending author request
+    user: User
+    category: Category
+
+
+@dataclasses.dataclass
+class Case:
+    name: str
+    query: str
+    measured_queries: int
+    variables: Callable[[Dataset], Dict] = lambda dataset: {}
+    authenticated: bool = True
+    # variable of an uploaded image
+    upload: Optional[str] = None
+
+
+def clear_dataset() -> None:
+    User.objects.all().delete()
+    Category.objects.all().delete()
+    Tag.objects.all().delete()
+    OutgoingEmail.objects.all().delete()
+
+
+def create_dataset(size: DatasetSize) -> Dataset:
+    generate_dataset(size)
+    authors = list(
+        User.objects.filter(user_status__is_author=True)
+        .annotate(post_count=Count('posts'))
+        .order_by('-post_count', 'id')
+    )
+    viewer, subscribed_authors, author = authors[0], authors[1:-1], authors[-1]
+    User.objects.filter(pk=viewer.pk).update(is_superuser=True)
+    viewer.refresh_from_db()
+
+    Subscription.objects.filter(subscriber=viewer).delete()
+    Subscription.objects.bulk_create([Subscription(subscriber=viewer, author=author) for author in subscribed_authors])
+    published_posts = Post.objects.filter(status=Post.PostStatus.PUBLISHED)
+    Notification.objects.filter(user=viewer).delete()
+    Notification.objects.bulk_create(
+        [Notification(post=post, user=viewer) for post in published_posts.filter(owner__in=subscribed_authors)]
+    )
+
+    post, liked_post = published_posts.filter(owner__in=subscribed_authors).annotate(
+        comment_total=Count('comments')
+    ).order_by('-comment_total', 'id')[:2]
+    PostLike.objects.filter(post=post, user=viewer).delete()
+    PostLike.objects.get_or_create(post=liked_post, user=viewer)
+    own_post = Post.objects.filter(owner=viewer).order_by('id').first()
+    Post.objects.filter(pk=own_post.pk).update(status=Post.PostStatus.PUBLISHED)
+    comment = Comment.objects.create(title='Comment', text='Text', post=post, owner=viewer)
+
+    users = User.objects.filter(user_status__is_author=False).order_by('id')
+    AuthorRequest.objects.bulk_create([AuthorRequest(user=user) for user in users])
+    # posts of the viewer are fanned out to its subscribers
+    Subscription.objects.bulk_create(
+        [Subscription(subscriber=user, author=viewer) for user in users], ignore_conflicts=True
+    )
+    User.reconcile_subscriber_counts()
+    FeedItem.rebuild()
+    user = users.first()
+    UserStatus.objects.filter(user=user).update(verified=False)
+
+    return Dataset(
+        viewer=viewer,
+        author=author,
+        post=post,
+        liked_post=liked_post,
+        own_post=own_post,
+        comment=comment,
+        user=user,
+        category=Category.objects.order_by('id').first(),
+    )
+
+
+def image_file() -> SimpleUploadedFile:
+    with open(os.path.join(settings.BASE_DIR, 'blog', 'tests', 'media', 'image.png'), 'rb') as file:
+        return SimpleUploadedFile(name='image.png', content=file.read(), content_type='image/png')
+
+
+def execute(case: Case, dataset: Dataset) -> HttpResponse:
+    client = Client()
+    if case.authenticated:
+        client.cookies[jwt_settings.JWT_COOKIE_NAME] = get_jwt(dataset.viewer)
+    operation = {'query': case.query, 'variables': case.variables(dataset)}
+    if case.upload is None:
+        return client.post('/graphql/', operation, content_type='application/json')
+    data = {
+        'operations': json.dumps(operation),
+        '1': image_file(),
+        'map': json.dumps({'1': [f'variables.{case.upload}']}),
+    }
+    return client.post('/graphql/', data)
+
+
+def count_queries(case: Case, size: DatasetSize) -> int:
+    clear_dataset()
+    dataset = create_dataset(size)
+    response = execute(case, dataset)
+    assert json.loads(response.content).get('errors', None) is None, response.content
+    # set by the OperationStatsExtension
+    return response.wsgi_request.operation_stats.sql_queries
+
+
+QUERIES: List[Case] = [
+    Case('me', '{ me { id username userStatus { isAuthor } profile { language } } }', 4),
+    Case(
+        'users',
+        '{ users { id username isSubscribed userStatus { isAuthor } profile { language } posts { slug likeCount } } }',
+        4,
+    ),
+    Case('user', '{ user { id username notificationCount userStatus { verified } } }', 3),
+    Case(
+        'userByUsername',
+        'query ($username: String!) { userByUsername(username: $username) { username posts { slug } } }',
+        4,
+        lambda dataset: {'username': dataset.author.username},
+        authenticated=False,
+    ),
+    Case('categories', '{ categories { id name slug } }', 1, authenticated=False),
+    Case(
+        'categoryById',
+        'query ($id: ID!) { categoryById(id: $id) { id name slug } }',
+        1,
+        lambda dataset: {'id': dataset.category.id},
+        authenticated=False,
+    ),
+    Case('tags', '{ tags { name slug postCount } }', 1, authenticated=False),
+    Case('usedTags', '{ usedTags { name slug postCount } }', 1, authenticated=False),
+    Case(
+        'usedTagsByCategory',
+        'query ($categorySlug: String) { usedTags(categorySlug: $categorySlug) { name slug postCount } }',
+        1,
+        lambda dataset: {'categorySlug': dataset.category.slug},
+        authenticated=False,
+    ),
+    Case(
+        'paginatedAuthorRequests',
+        '{ paginatedAuthorRequests { authorRequests { id status user { username } } numPages } }',
+        2,
+    ),
+    Case('authorRequestByUser', '{ authorRequestByUser { id status user { username } } }', 2),
+    Case(
+        'userSubscriptions',
+        '{ userSubscriptions { dateCreated author { username isSubscribed posts { slug } } subscriber { username } } }',
+        4,
+    ),
+    Case('postTitles', '{ postTitles { id title } }', 2),
+    Case(
+        'postTitleSuggestions',
+        'query ($prefix: String!) { postTitleSuggestions(prefix: $prefix) { id title slug } }',
+        2,
+        lambda dataset: {'prefix': dataset.post.title[:3]},
+    ),
+    Case(
+        'paginatedPosts',
+        'query ($activePage: Int) { paginatedPosts(activePage: $activePage) '
+        f'{{ posts {{ {POST_FIELDS} }} numPostPages }} }}',
+        11,
+        lambda dataset: {'activePage': 2},
+    ),
+    Case(
+        'paginatedPostsByCategoryAndTag',
+        'query ($categorySlug: String, $tagSlugs: String) { paginatedPosts(categorySlug: $categorySlug, '
+        f'tagSlugs: $tagSlugs) {{ posts {{ {POST_FIELDS} }} numPostPages }} }}',
+        11,
+        lambda dataset: {
+            'categorySlug': dataset.post.category.slug,
+            'tagSlugs': ','.join(dataset.post.tags.values_list('slug', flat=True)),
+        },
+    ),
+    Case(
+        'paginatedPostsByAllTags',
+        'query ($tagSlugs: String) { paginatedPosts(tagSlugs: $tagSlugs, tagMode: ALL) '
+        f'{{ posts {{ {POST_FIELDS} }} numPostPages }} }}',
+        11,
+        lambda dataset: {'tagSlugs': ','.join(dataset.post.tags.values_list('slug', flat=True))},
+    ),
+    Case(
+        'postConnection',
+        f'{{ postConnection(first: 8) {{ posts {{ {POST_FIELDS} }} endCursor hasNextPage }} }}',
+        8,
+        authenticated=False,
+    ),
+    Case(
+        'postConnectionWithRecommendations',
+        f'{{ postConnection(first: 8) {{ posts {{ {POST_FIELDS} recommendedPosts {{ id title slug }} }} }} }}',
+        9,
+        authenticated=False,
+    ),
+    Case(
+        'paginatedUserPosts',
+        f'{{ paginatedUserPosts {{ posts {{ {POST_FIELDS} }} numPostPages }} }}',
+        11,
+    ),
+    Case(
+        'userPostConnection',
+        f'{{ userPostConnection {{ posts {{ {POST_FIELDS} }} endCursor hasNextPage }} }}',
+        11,
+    ),
+    Case(
+        'paginatedNotificationPosts',
+        f'{{ paginatedNotificationPosts {{ posts {{ {POST_FIELDS} }} numPostPages }} }}',
+        11,
+    ),
+    Case(
+        'notificationPostConnection',
+        f'{{ notificationPostConnection(first: 8) {{ posts {{ {POST_FIELDS} }} endCursor hasNextPage }} }}',
+        11,
+    ),
+    Case(
+        'feed',
+        f'{{ feed(first: 8) {{ posts {{ {POST_FIELDS} }} endCursor hasNextPage }} }}',
+        12,
+    ),
+    Case(
+        'searchPosts',
+        'query ($query: String!) { searchPosts(query: $query) '
+        f'{{ results {{ post {{ {POST_FIELDS} }} score snippet }} numPages totalCount }} }}',
+        13,
+        lambda dataset: {'query': 'graphql database performance'},
+    ),
+    Case(
+        'postBySlug',
+        f'query ($slug: String!) {{ postBySlug(slug: $slug) {{ post {{ {POST_FIELDS} }} notificationRemoved }} }}',
+        12,
+        lambda dataset: {'slug': dataset.post.slug},
+    ),
+]
+
+POST_INPUT_FIELDS = """
+    success
+    errors
+    post { id slug owner { username } category { slug } tags { slug } relatedSubPosts { id } }
+"""
+
+MUTATIONS: List[Case] = [
+    Case(
+        'tokenAuth',
+        'mutation ($username: String!, $password: String!) { tokenAuth(username: $username, password: $password) '
+        '{ token refreshToken payload { username } } }',
+        3,
+        lambda dataset: {'username': dataset.viewer.username, 'password': PASSWORD},
+        authenticated=False,
+    ),
+    Case(
+        'verifyToken',
+        'mutation ($token: String!) { verifyToken(token: $token) { payload { username } } }',
+        0,
+        lambda dataset: {'token': get_jwt(dataset.viewer)},
+        authenticated=False,
+    ),
+    Case(
+        'refreshToken',
+        'mutation ($refreshToken: String!) { refreshToken(refreshToken: $refreshToken) { token refreshToken } }',
+        4,
+        lambda dataset: {'refreshToken': create_refresh_token(dataset.viewer).get_token()},
+        authenticated=False,
+    ),
+    Case('deleteTokenCookie', 'mutation { deleteTokenCookie { deleted } }', 1),
+    Case('deleteRefreshTokenCookie', 'mutation { deleteRefreshTokenCookie { deleted } }', 1),
+    Case(
+        'register',
+        'mutation ($input: UserRegistrationInput!) { register(userRegistrationInput: $input) { success errors } }',
+        12,
+        lambda dataset: {
+            'input': {
+                'email': 'new.user@blogapp.lo',
+                'username': 'new_user',
+                'password1': 'Registration_password_1',
+                'password2': 'Registration_password_1',
+                'avatar': None,
+            }
+        },
+        authenticated=False,
+        upload='input.avatar',
+    ),
+    Case(
+        'resendActivationEmail',
+        'mutation ($email: String!) { resendActivationEmail(email: $email) { success errors } }',
+        10,
+        lambda dataset: {'email': dataset.user.email},
+        authenticated=False,
+    ),
+    Case(
+        'verifyAccount',
+        'mutation ($token: String!) { verifyAccount(token: $token) { success } }',
+        3,
+        lambda dataset: {'token': get_token(dataset.user, TokenAction.ACTIVATION)},
+        authenticated=False,
+    ),
+    Case(
+        'passwordChange',
+        'mutation ($input: PasswordChangeInput!) { passwordChange(passwordChangeInput: $input) { success errors } }',
+        2,
+        lambda dataset: {
+            'input': {
+                'oldPassword': PASSWORD,
+                'newPassword1': 'Changed_password_1',
+                'newPassword2': 'Changed_password_1',
+            }
+        },
+    ),
+    Case(
+        'sendPasswordResetEmail',
+        'mutation ($email: String!) { sendPasswordResetEmail(email: $email) { success } }',
+        10,
+        lambda dataset: {'email': dataset.viewer.email},
+        authenticated=False,
+    ),
+    Case(
+        'passwordReset',
+        'mutation ($input: PasswordResetInput!) { passwordReset(passwordResetInput: $input) { success errors } }',
+        2,
+        lambda dataset: {
+            'input': {
+                'token': get_token(dataset.viewer, TokenAction.PASSWORD_RESET),
+                'newPassword1': 'Reset_password_1',
+                'newPassword2': 'Reset_password_1',
+            }
+        },
+        authenticated=False,
+    ),
+    Case(
+        'updateAccount',
+        'mutation ($input: UpdateAccountInput!) { updateAccount(updateAccountInput: $input) { success errors } }',
+        2,
+        lambda dataset: {'input': {'firstName': 'Jane', 'lastName': 'Doe'}},
+    ),
+    Case(
+        'sendEmailChangeEmail',
+        'mutation ($email: String!) { sendEmailChangeEmail(email: $email) { success } }',
+        10,
+        lambda dataset: {'email': dataset.viewer.email},
+        authenticated=False,
+    ),
+    Case(
+        'emailChange',
+        'mutation ($input: EmailChangeInput!) { emailChange(emailChangeInput: $input) '
+        '{ success errors user { email } } }',
+        3,
+        lambda dataset: {
+            'input': {
+                'token': get_token(dataset.viewer, TokenAction.EMAIL_CHANGE),
+                'newEmail1': 'changed@blogapp.lo',
+                'newEmail2': 'changed@blogapp.lo',
+            }
+        },
+        authenticated=False,
+    ),
+    Case(
+        'createCategory',
+        'mutation ($input: CategoryInput!) { createCategory(categoryInput: $input) { id slug } }',
+        2,
+        lambda dataset: {'input': {'name': 'New category'}},
+        authenticated=False,
+    ),
+    Case(
+        'updateCategory',
+        'mutation ($input: CategoryInput!) { updateCategory(categoryInput: $input) { id slug } }',
+        3,
+        lambda dataset: {'input': {'id': dataset.category.id, 'name': 'Renamed category'}},
+        authenticated=False,
+    ),
+    Case(
+        'createAuthorRequest',
+        'mutation { createAuthorRequest { success errors authorRequest { id status user { username } } } }',
+        8,
+    ),
+    Case(
+        'updateAuthorRequest',
+        'mutation ($input: AuthorRequestInput!) { updateAuthorRequest(authorRequestInput: $input) '
+        '{ success errors authorRequest { id status user { username } } } }',
+        7,
+        lambda dataset: {'input': {'status': 'ACCEPTED', 'user': dataset.user.id}},
+    ),
+    Case(
+        'createPost',
+        f'mutation ($input: PostInput!) {{ createPost(postInput: $input) {{ {POST_INPUT_FIELDS} }} }}',
+        70,
+        lambda dataset: {
+            'input': {
+                'title': 'New post',
+                'text': 'Text',
+                'category': dataset.category.id,
+                'tags': 'new-tag,other-tag',
+                'relatedPosts': [dataset.post.id, dataset.liked_post.id],
+                'image': None,
+            }
+        },
+        upload='input.image',
+    ),
+    Case(
+        'updatePost',
+        f'mutation ($input: PostInput!) {{ updatePost(postInput: $input) {{ {POST_INPUT_FIELDS} }} }}',
+        68,
+        lambda dataset: {
+            'input': {
+                'slug': dataset.own_post.slug,
+                'title': 'Updated post',
+                'text': 'Text',
+                'category': dataset.category.id,
+                'tags': 'new-tag,other-tag',
+                'relatedPosts': [dataset.post.id, dataset.liked_post.id],
+            }
+        },
+    ),
+    Case(
+        'updatePostStatus',
+        'mutation ($input: UpdatePostStatusInput!) { updatePostStatus(updatePostStatusInput: $input) '
+        f'{{ {POST_INPUT_FIELDS} }} }}',
+        14,
+        lambda dataset: {'input': {'postSlug': dataset.own_post.slug, 'status': 'DRAFT'}},
+    ),
+    Case(
+        'createComment',
+        'mutation ($input: CommentInput!) { createComment(commentInput: $input) '
+        '{ title post { slug commentCount } owner { username } } }',
+        9,
+        lambda dataset: {'input': {'title': 'New comment', 'text': 'Text', 'post': dataset.post.id}},
+    ),
+    Case(
+        'updateComment',
+        'mutation ($input: CommentInput!) { updateComment(commentInput: $input) '
+        '{ title post { slug } owner { username } } }',
+        5,
+        lambda dataset: {'input': {'id': dataset.comment.id, 'title': 'Updated comment', 'text': 'Text'}},
+    ),
+    Case(
+        'deleteComment',
+        'mutation ($commentId: ID!) { deleteComment(commentId: $commentId) }',
+        6,
+        lambda dataset: {'commentId': dataset.comment.id},
+    ),
+    Case(
+        'createPostLike',
+        'mutation ($input: PostLikeInput!) { createPostLike(postLikeInput: $input) '
+        '{ id post { id likeCount } user { username } } }',
+        10,
+        lambda dataset: {'input': {'post': dataset.post.id}},
+    ),
+    Case(
+        'deletePostLike',
+        'mutation ($input: PostLikeInput!) { deletePostLike(postLikeInput: $input) }',
+        4,
+        lambda dataset: {'input': {'post': dataset.liked_post.id}},
+    ),
+    Case(
+        'createSubscription',
+        'mutation ($input: SubscriptionInput!) { createSubscription(subscriptionInput: $input) '
+        '{ success errors subscription { author { username posts { slug } } subscriber { username } } } }',
+        13,
+        lambda dataset: {'input': {'subscriber': dataset.viewer.id, 'author': dataset.author.id}},
+    ),
+    Case(
+        'deleteSubscription',
+        'mutation ($input: SubscriptionInput!) { deleteSubscription(subscriptionInput: $input) }',
+        8,
+        lambda dataset: {'input': {'subscriber': dataset.viewer.id, 'author': dataset.post.owner_id}},
+    ),
+    Case(
+        'updateUserProfile',
+        'mutation ($input: UserProfileInput!) { updateUserProfile(userProfileInput: $input) '
+        '{ success errors profile { darkThemeActive language } } }',
+        3,
+        lambda dataset: {
+            'input': {
+                'darkThemeActive': True,
+                'commentSectionCollapsed': False,
+                'relatedPostsCollapsed': True,
+                'language': 'DE',
+            }
+        },
+    ),
+]
+
+
+def query_budget(case: Case) -> int:
+    return case.measured_queries + max(2, case.measured_queries // 10)
+
+
+@pytest.mark.parametrize('case', QUERIES + MUTATIONS, ids=lambda case: case.name)
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_query_count(case: Case) -> None:
+    small_queries = count_queries(case, SMALL)
+    large_queries = count_queries(case, LARGE)
+
+    assert small_queries <= query_budget(case), f'{case.name} runs {small_queries} sql queries'
+    assert large_queries <= small_queries, f'{case.name} runs {small_queries} and then {large_queries} sql queries'
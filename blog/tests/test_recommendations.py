@@ -0,0 +1,102 @@
+from io import StringIO
+from typing import Callable, List
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from strawberry.test import Response
+
+from blog.models import PendingRecommendation, Post, PostRecommendation
+from blog.recommendations import SimilarityIndex, most_similar, post_features
+
+QUERY = 'query ($slug: String!) { postBySlug(slug: $slug) { post { recommendedPosts { title } } } }'
+
+
+def recommended_titles(client_query: Callable, post: Post) -> List[str]:
+    response: Response = client_query(QUERY, {'slug': post.slug})
+    assert response.errors is None
+    return [recommended['title'] for recommended in response.data['postBySlug']['post']['recommendedPosts']]
+
+
+def test_similarity_index() -> None:
+    index = SimilarityIndex(
+        {
+            1: post_features('Caching graphql', 1, [1, 2]),
+            2: post_features('Graphql schemas', 1, [1]),
+            3: post_features('Mountains', 2, [3]),
+        }
+    )
+
+    scores = index.scores(1)
+    assert set(scores) == {2}
+    assert 0 < scores[2] < 1
+    assert index.scores(3) == {}
+    assert most_similar({4: 0.5, 5: 0.9, 6: 0.5}, 2) == [(5, 0.9), (6, 0.5)]
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_recommended_posts(create_similar_posts: Callable, client_query: Callable) -> None:
+    posts = create_similar_posts()
+    assert recommended_titles(client_query, posts['Caching graphql queries']) == []
+
+    PostRecommendation.compute(full=True)
+
+    # shared tags and title terms count most, posts without anything in common aren't recommended
+    assert recommended_titles(client_query, posts['Caching graphql queries']) == [
+        'Graphql schema design',
+        'Database performance',
+    ]
+    assert recommended_titles(client_query, posts['Night train to the mountains']) == []
+    assert not PendingRecommendation.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_recommendations_are_updated_incrementally(create_similar_posts: Callable, client_query: Callable) -> None:
+    posts = create_similar_posts()
+    PostRecommendation.compute(full=True)
+
+    travel = posts['Night train to the mountains']
+    travel.title = 'Graphql on the night train'
+    travel.category_id = posts['Caching graphql queries'].category_id
+    travel.save()
+    travel.tags.add('graphql')
+    draft = posts['Database performance']
+    draft.status = Post.PostStatus.DRAFT
+    draft.save()
+
+    # the changed posts, the posts recommending them and the posts they now score for
+    assert PostRecommendation.compute() == 4
+    assert recommended_titles(client_query, posts['Caching graphql queries']) == [
+        'Graphql schema design',
+        'Graphql on the night train',
+    ]
+    assert 'Caching graphql queries' in recommended_titles(client_query, travel)
+    assert not PostRecommendation.objects.filter(post=draft).exists()
+
+    posts['Graphql schema design'].delete()
+    PostRecommendation.compute()
+    assert recommended_titles(client_query, posts['Caching graphql queries']) == ['Graphql on the night train']
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_compute_recommendations_command(create_similar_posts: Callable) -> None:
+    create_similar_posts()
+
+    out = StringIO()
+    call_command('compute_recommendations', '--full', stdout=out)
+
+    assert out.getvalue().strip() == 'Computed the recommendations of 4 posts'
+    assert PostRecommendation.objects.filter(rank=0).count() == 3
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_changes_marked_once_per_transaction(create_similar_posts: Callable) -> None:
+    post = create_similar_posts()['Graphql schema design']
+    PendingRecommendation.objects.all().delete()
+
+    with transaction.atomic():
+        post.save()
+        post.tags.add('design')
+        post.save()
+
+    assert list(PendingRecommendation.objects.values_list('post_id', flat=True)) == [post.pk]
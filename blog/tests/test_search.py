@@ -0,0 +1,112 @@
+from io import StringIO
+from typing import Callable, Dict
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from strawberry.test import Response
+
+from blog.models import Post, PostSearchDocument, PostSearchTerm
+from blog.search import snippet, term_frequencies, tokenize
+
+
+def search(import_query: Callable, client_query: Callable, variables: Dict) -> Dict:
+    response: Response = client_query(import_query('searchPosts.graphql'), variables)
+    assert response.errors is None
+    return response.data['searchPosts']
+
+
+def test_tokenize() -> None:
+    assert tokenize('The GraphQL server, and a cache!') == ['graphql', 'server', 'cache']
+    assert term_frequencies('Graphql cache', 'cache', ['graphql']) == {'graphql': 5, 'cache': 4}
+
+
+def test_snippet() -> None:
+    text = 'word ' * 100 + 'graphql ' + 'word ' * 100
+    result = snippet(text, ['graphql'], length=60)
+    assert 'graphql' in result
+    assert result.startswith('…') and result.endswith('…')
+    assert snippet('Short text', ['graphql']) == 'Short text'
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_search_posts(create_search_posts: Callable, import_query: Callable, client_query: Callable) -> None:
+    create_search_posts()
+
+    result = search(import_query, client_query, {'query': 'GraphQL'})
+
+    assert result['totalCount'] == 2
+    assert result['numPages'] == 1
+    titles = [hit['post']['title'] for hit in result['results']]
+    # a match in the title counts more than a match in a long text, drafts are not found
+    assert titles == ['Caching graphql queries', 'Travel notes']
+    assert result['results'][0]['score'] > result['results'][1]['score'] > 0
+    assert 'graphql' in result['results'][1]['snippet']
+    assert search(import_query, client_query, {'query': 'the of'})['results'] == []
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_search_posts_filters(create_search_posts: Callable, import_query: Callable, client_query: Callable) -> None:
+    create_search_posts()
+
+    by_category = search(import_query, client_query, {'query': 'graphql', 'categorySlug': 'test_category2'})
+    by_tag = search(import_query, client_query, {'query': 'graphql', 'tagSlugs': 'performance'})
+
+    assert [hit['post']['title'] for hit in by_category['results']] == ['Travel notes']
+    assert [hit['post']['title'] for hit in by_tag['results']] == ['Caching graphql queries']
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_search_index_updates(create_search_posts: Callable, import_query: Callable, client_query: Callable) -> None:
+    caching, travel, draft = create_search_posts()
+
+    # tag names are indexed
+    assert search(import_query, client_query, {'query': 'mountains performance'})['totalCount'] == 2
+
+    draft.status = Post.PostStatus.PUBLISHED
+    draft.save()
+    caching.status = Post.PostStatus.DRAFT
+    caching.save()
+    travel.tags.set(['trains'])
+    travel.title = 'Rail notes'
+    travel.save()
+
+    assert [hit['post']['title'] for hit in search(import_query, client_query, {'query': 'graphql'})['results']] == [
+        'Graphql draft',
+        'Rail notes',
+    ]
+    assert search(import_query, client_query, {'query': 'trains'})['totalCount'] == 1
+    assert search(import_query, client_query, {'query': 'travel performance'})['totalCount'] == 0
+    assert not PostSearchDocument.objects.filter(post=caching).exists()
+
+    draft.delete()
+    assert search(import_query, client_query, {'query': 'draft'})['totalCount'] == 0
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_rebuild_search_index(create_search_posts: Callable) -> None:
+    create_search_posts()
+    PostSearchDocument.objects.all().delete()
+
+    out = StringIO()
+    call_command('rebuild_search_index', stdout=out)
+
+    assert out.getvalue().strip() == 'Indexed 2 posts'
+    assert PostSearchDocument.objects.count() == 2
+    assert PostSearchTerm.objects.filter(term='mountains', document__post__title='Travel notes').exists()
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_search_index_updated_once_per_transaction(
+    create_search_posts: Callable, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    caching = create_search_posts()[0]
+    indexed = []
+    monkeypatch.setattr(PostSearchDocument, 'index', indexed.append)
+
+    with transaction.atomic():
+        caching.save()
+        caching.tags.add('graphql')
+        caching.save()
+
+    assert indexed == [caching.pk]
@@ -2,6 +2,8 @@ from typing import Callable, Dict
 import pytest
 from strawberry.test import Response
 
+from blog.models import Post
+
 
 @pytest.mark.django_db
 def test_create_tags(create_tags: Callable) -> None:
@@ -83,3 +85,45 @@ def test_get_used_tags_in_category(
     tag1_slug = tags[0].get('slug', None)
     assert tag1_slug is not None
     assert tag1_slug == 'tag_2_slug'
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_get_post_tags_batched(
+    create_tags: Callable,
+    client_query: Callable,
+    django_assert_max_num_queries: Callable,
+) -> None:
+    create_tags()
+    query = 'query { paginatedPosts { posts { title tags { slug } } } }'
+
+    # count, page ids, page, content type and a single query for the tags of all posts
+    with django_assert_max_num_queries(5):
+        response: Response = client_query(query)
+
+    assert response is not None
+    assert response.errors is None
+
+    posts: Dict = response.data.get('paginatedPosts').get('posts')
+    assert [[tag.get('slug') for tag in post.get('tags')] for post in posts] == [['tag_1_slug'], ['tag_2_slug']]
+
+
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_get_used_tags_with_post_count(
+    create_tags: Callable,
+    client_query: Callable,
+    django_assert_max_num_queries: Callable,
+) -> None:
+    create_tags()
+    Post.objects.get(pk=2).tags.add('tag_1')
+    Post.objects.get(pk=3).tags.add('tag_1', 'tag_3')
+    query = 'query { usedTags { slug postCount } }'
+
+    with django_assert_max_num_queries(2):
+        response: Response = client_query(query)
+
+    assert response is not None
+    assert response.errors is None
+
+    # the draft post 3 is not counted
+    tags: Dict = response.data.get('usedTags', None)
+    assert tags == [{'slug': 'tag_1_slug', 'postCount': 2}, {'slug': 'tag_2_slug', 'postCount': 1}]
@@ -0,0 +1,129 @@
+import bisect
+import dataclasses
+import typing
+from threading import Lock
+
+from django.core.cache import cache
+
+# Post titles for typeahead suggestions, kept in memory by each process. Changes are applied to the index of the
+# process that made them and increment a version in the cache, the other processes reload their index once they
+# see a newer version. Set a shared cache backend in CACHES so that all processes see the same version.
+
+VERSION_KEY = 'blog:title_index:version'
+
+
+@dataclasses.dataclass(frozen=True)
+class TitleEntry:
+    post_id: int
+    title: str
+    slug: str
+    owner_id: int
+    published: bool
+
+
+def normalize(text: str) -> str:
+    return ' '.join(text.lower().split())
+
+
+def index_keys(title: str) -> typing.List[str]:
+    # the title from each of its words on, so that prefixes of later words match too
+    words = normalize(title).split()
+    return [' '.join(words[index:]) for index in range(len(words))]
+
+
+class TitleIndex:
+    """
+    Sorted (key, post id) pairs, the titles matching a prefix are found by bisection
+    """
+
+    def __init__(self, load: typing.Callable[[], typing.Iterable[TitleEntry]]) -> None:
+        self.load = load
+        self.lock = Lock()
+        self.keys: typing.List[typing.Tuple[str, int]] = []
+        self.entries: typing.Dict[int, TitleEntry] = {}
+        # version of the cache the index is up to date with, None until it is loaded
+        self.version: typing.Optional[int] = None
+
+    @staticmethod
+    def current_version() -> int:
+        cache.add(VERSION_KEY, 0, None)
+        return cache.get(VERSION_KEY, 0)
+
+    @staticmethod
+    def next_version() -> int:
+        cache.add(VERSION_KEY, 0, None)
+        try:
+            return cache.incr(VERSION_KEY)
+        except ValueError:
+            # evicted in between
+            cache.add(VERSION_KEY, 1, None)
+            return cache.get(VERSION_KEY, 1)
+
+    def ensure_loaded(self) -> None:
+        version = self.current_version()
+        if version == self.version:
+            return
+        # changes after reading the version increment it again, so they are loaded by the next lookup
+        entries = list(self.load())
+        keys = sorted((key, entry.post_id) for entry in entries for key in index_keys(entry.title))
+        with self.lock:
+            self.entries = {entry.post_id: entry for entry in entries}
+            self.keys = keys
+            self.version = version
+
+    def suggest(self, prefix: str, user_id: typing.Optional[int], limit: int) -> typing.List[TitleEntry]:
+        """
+        Published posts and drafts of the user with a title word starting with the prefix, by title
+        """
+        prefix = normalize(prefix)
+        if not prefix or limit < 1:
+            return []
+        self.ensure_loaded()
+        suggestions = []
+        seen = set()
+        with self.lock:
+            for index in range(bisect.bisect_left(self.keys, (prefix,)), len(self.keys)):
+                key, post_id = self.keys[index]
+                if not key.startswith(prefix):
+                    break
+                entry = self.entries[post_id]
+                if post_id in seen or not (entry.published or entry.owner_id == user_id):
+                    continue
+                seen.add(post_id)
+                suggestions.append(entry)
+                if len(suggestions) == limit:
+                    break
+        return suggestions
+
+    def remove_keys(self, post_id: int) -> None:
+        entry = self.entries.pop(post_id, None)
+        if entry is not None:
+            for key in index_keys(entry.title):
+                index = bisect.bisect_left(self.keys, (key, post_id))
+                if index < len(self.keys) and self.keys[index] == (key, post_id):
+                    del self.keys[index]
+
+    def apply(self, post_id: int, entry: typing.Optional[TitleEntry]) -> None:
+        version = self.next_version()
+        with self.lock:
+            # another process changed posts since the index was loaded, it is reloaded on the next lookup
+            if self.version is None or version != self.version + 1:
+                return
+            self.remove_keys(post_id)
+            if entry is not None:
+                self.entries[post_id] = entry
+                for key in index_keys(entry.title):
+                    bisect.insort(self.keys, (key, post_id))
+            self.version = version
+
+    def update(self, entry: TitleEntry) -> None:
+        self.apply(entry.post_id, entry)
+
+    def remove(self, post_id: int) -> None:
+        self.apply(post_id, None)
+
+    def invalidate(self) -> None:
+        """
+        Reloads the indexes of all processes, e.g. after posts have been changed without signals
+        """
+        self.next_version()
@@ -1,3 +1,8 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+
 from django.core import signing
 
 
@@ -28,3 +33,16 @@ def get_token_payload(token: str, action: TokenAction, exp: any = None) -> any:
     if _action != action:
         return False
     return payload
+
+
+def encode_cursor(date_created: datetime, pk: int) -> str:
+    value = f'{date_created.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    try:
+        date_created, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(date_created), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
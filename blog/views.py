@@ -1,9 +1,96 @@
+import os
+from typing import Any, Dict, Iterator
+
+from django.conf import settings
 from django.core.handlers.wsgi import WSGIRequest
-from django.http import HttpResponse
+from django.db.models import Count
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
+from django.views.decorators.http import require_GET
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from strawberry.django.views import GraphQLView as BaseGraphQLView
+
+from blog.api.exceptions import PersistedQueryError
+from blog.api.persisted_queries import resolve_persisted_query
+from blog.metrics import operation_metrics
+from blog.models import OutgoingEmail
 
 
 @csrf_exempt
 @ensure_csrf_cookie
 def set_csrf(request: WSGIRequest) -> HttpResponse:
     return HttpResponse(status=204)
+
+
+class GraphQLView(BaseGraphQLView):
+    """
+    GraphQL view that accepts persisted queries by their sha256 hash
+    """
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request: WSGIRequest, *args: Any, **kwargs) -> HttpResponse:
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except PersistedQueryError as error:
+            return JsonResponse(
+                {'data': None, 'errors': [{'message': str(error), 'extensions': {'code': error.error_code}}]}
+            )
+
+        # set by the OperationStatsExtension, debug responses report the stats themselves
+        stats = getattr(request, 'operation_stats', None)
+        if stats is not None and not settings.DEBUG:
+            operation_metrics.record(stats, len(response.content))
+        return response
+
+    def parse_body(self, request: WSGIRequest) -> Dict[str, Any]:
+        return resolve_persisted_query(request, super().parse_body(request))
+
+
+class OutboxCollector:
+    """
+    Number of queued and failed emails, read from the database when the metrics are scraped
+    """
+
+    @staticmethod
+    def metric() -> GaugeMetricFamily:
+        return GaugeMetricFamily(
+            'blog_email_outbox_emails', 'Emails in the outbox that are not sent', labels=['status']
+        )
+
+    def describe(self) -> Iterator[GaugeMetricFamily]:
+        # registering the collector describes it, which must not query the database at import time
+        yield self.metric()
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        depth = self.metric()
+        counts = dict(
+            OutgoingEmail.objects.exclude(status=OutgoingEmail.Status.SENT)
+            .values_list('status')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        for status in (OutgoingEmail.Status.PENDING, OutgoingEmail.Status.FAILED):
+            depth.add_metric([status.value], counts.get(status.value, 0))
+        yield depth
+
+
+outbox_registry = CollectorRegistry()
+outbox_registry.register(OutboxCollector())
+
+
+@require_GET
+def metrics(request: WSGIRequest) -> HttpResponse:
+    if settings.METRICS_TOKEN:
+        authorization = request.META.get('HTTP_AUTHORIZATION', '')
+        if not constant_time_compare(authorization, f'Bearer {settings.METRICS_TOKEN}'):
+            return HttpResponse(status=403)
+
+    registry = REGISTRY
+    # the metrics of all worker processes are stored in files of the multiprocess directory
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry) + generate_latest(outbox_registry), content_type=CONTENT_TYPE_LATEST)